@@ -49,6 +49,7 @@ options:
   wait_timeout:
     description:
       - how long before wait gives up, in seconds
+      - the image is checked more and more seldom, from every 2 to every 30 seconds
     required: false
     default: 1200
   tags:
@@ -80,6 +81,7 @@ EXAMPLES = '''
 
 import sys
 import time
+import random
 
 try:
     import boto
@@ -92,6 +94,8 @@ except ImportError:
 if not HAS_BOTO:
     module.fail_json(msg='boto required for this module')
 
+THROTTLING_ERRORS = ('Throttling', 'RequestLimitExceeded')
+
 def copy_image(module, ec2):
     """
     Copies an AMI
@@ -119,13 +123,17 @@ def copy_image(module, ec2):
     except boto.exception.BotoServerError, e:
         module.fail_json(msg="%s: %s" % (e.error_code, e.error_message))
 
-    img = wait_until_image_is_recognized(module, ec2, wait_timeout, image_id, wait)
-
-    img = wait_until_image_is_copied(module, ec2, wait_timeout, img, image_id, wait)
+    result = {}
+    if wait:
+        img, result['wait'] = wait_until_image_is_copied(module, ec2, wait_timeout, image_id)
+    else:
+        img = get_copied_image(module, ec2, image_id)
+        if img is None:
+            module.fail_json(msg="Error while trying to find the new image. Using wait=yes and/or a longer wait_timeout may help")
 
     register_tags_if_any(module, ec2, tags, image_id)
 
-    module.exit_json(msg="AMI copy operation complete", image_id=image_id, state=img.state, changed=True)
+    module.exit_json(msg="AMI copy operation complete", image_id=image_id, state=img.state, changed=True, **result)
 
 
 # register tags to the copied AMI in dest_region
@@ -137,34 +145,61 @@ def register_tags_if_any(module, ec2, tags, image_id):
             module.fail_json(msg=str(e))
 
 
-# wait here until the image is copied (i.e. the state becomes available
-def wait_until_image_is_copied(module, ec2, wait_timeout, img, image_id, wait):
-    wait_timeout = time.time() + wait_timeout
-    while wait and wait_timeout > time.time() and (img is None or img.state != 'available'):
-        img = ec2.get_image(image_id)
-        time.sleep(3)
-    if wait and wait_timeout <= time.time():
-        # waiting took too long
-        module.fail_json(msg="timed out waiting for image to be copied")
-    return img
-
+def wait_for(check, timeout, delay=2, max_delay=30):
+    """
+    Calls check until it returns something, for at most timeout seconds.
 
-# wait until the image is recognized.
-def wait_until_image_is_recognized(module, ec2, wait_timeout, image_id, wait):
-    for i in range(wait_timeout):
+    Polls are spaced with an exponential backoff with jitter, throttled
+    calls count as a poll without result. Returns the last result of
+    check, None on timeout, and the number of attempts and time spent.
+    """
+    start = time.time()
+    deadline = start + timeout
+    attempts = 0
+    while True:
+        attempts += 1
         try:
-            return ec2.get_image(image_id)
-        except boto.exception.EC2ResponseError, e:
-            # This exception we expect initially right after registering the copy with EC2 API
-            if 'InvalidAMIID.NotFound' in e.error_code and wait:
-                time.sleep(1)
-            else:
-                # On any other exception we should fail
-                module.fail_json(
-                    msg="Error while trying to find the new image. Using wait=yes and/or a longer wait_timeout may help: " + str(
-                        e))
-    else:
-        module.fail_json(msg="timed out waiting for image to be recognized")
+            result = check()
+        except boto.exception.BotoServerError, e:
+            if e.error_code not in THROTTLING_ERRORS:
+                raise
+            result = None
+        remaining = deadline - time.time()
+        if result is not None or remaining <= 0:
+            return result, dict(attempts=attempts, elapsed=round(time.time() - start, 1))
+        time.sleep(min(delay * random.uniform(0.5, 1.5), remaining))
+        delay = min(delay * 2, max_delay)
+
+
+# the copy is only known to EC2 some time after copy_image returned
+def get_copied_image(module, ec2, image_id):
+    try:
+        return ec2.get_image(image_id)
+    except boto.exception.EC2ResponseError, e:
+        # This exception we expect initially right after registering the copy with EC2 API
+        if 'InvalidAMIID.NotFound' in e.error_code:
+            return None
+        if e.error_code in THROTTLING_ERRORS:
+            raise
+        # On any other exception we should fail
+        module.fail_json(msg="Error while trying to find the new image: " + str(e))
+
+
+# wait here until the image is copied (i.e. the state becomes available)
+def wait_until_image_is_copied(module, ec2, wait_timeout, image_id):
+    def copied():
+        img = get_copied_image(module, ec2, image_id)
+        if img is not None and img.state in ('available', 'failed'):
+            return img
+        return None
+
+    img, waited = wait_for(copied, wait_timeout)
+    if img is None:
+        # waiting took too long
+        module.fail_json(msg="timed out waiting for image to be copied", wait=waited)
+    if img.state == 'failed':
+        module.fail_json(msg="image copy failed", image_id=image_id, state=img.state, wait=waited)
+    return img, waited
 
 
 def main():
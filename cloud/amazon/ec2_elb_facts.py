@@ -28,6 +28,36 @@ options:
     required: false
     default: null
     aliases: ['elb_ids', 'ec2_elbs']
+  fields:
+    description:
+      - List of keys to return for each ELB, e.g. C(name), C(dns_name), C(instances). By default every key is returned.
+    required: false
+    default: null
+    version_added: "2.1"
+  compact:
+    description:
+      - Only return the name, dns_name, scheme and vpc_id of each ELB. Ignored when fields is given.
+    required: false
+    default: false
+    version_added: "2.1"
+  attributes:
+    description:
+      - Also return the attributes of each ELB (cross zone load balancing, connection draining, idle timeout and access log). They take one extra request per ELB, made concurrently.
+    required: false
+    default: false
+    version_added: "2.1"
+  instance_health:
+    description:
+      - Also return the health of the instances behind each ELB, one extra request per ELB made concurrently.
+    required: false
+    default: false
+    version_added: "2.1"
+  concurrency:
+    description:
+      - Number of ELBs whose attributes or instance health are fetched in parallel.
+    required: false
+    default: 8
+    version_added: "2.1"
 extends_documentation_fragment:
     - aws
     - ec2
@@ -70,9 +100,19 @@ EXAMPLES = '''
     msg: "{{ item.dns_name }}"
   with_items: elb_facts.elbs
 
+# Gather the names and instance health of every ELB
+- action:
+    module: ec2_elb_facts
+    fields: [name, instances]
+    instance_health: yes
+    concurrency: 16
+  register: elb_facts
+
 '''
 
 import xml.etree.ElementTree as ET
+import threading
+import Queue
 
 try:
     import boto.ec2.elb
@@ -149,28 +189,144 @@ def get_elb_info(elb):
     return elb_info
 
 
+def get_compact_elb_info(elb):
+    return {
+        'name': elb.name,
+        'dns_name': elb.dns_name,
+        'scheme': elb.scheme,
+        'vpc_id': elb.vpc_id,
+    }
+
+
+def get_elb_details(connection, name, attributes, instance_health):
+    details = {}
+    if attributes:
+        attrs = connection.get_all_lb_attributes(name)
+        details['attributes'] = {
+            'cross_zone_load_balancing': attrs.cross_zone_load_balancing.enabled,
+            'connection_draining': {
+                'enabled': attrs.connection_draining.enabled,
+                'timeout': attrs.connection_draining.timeout,
+            },
+            'idle_timeout': attrs.connecting_settings.idle_timeout,
+            'access_log': {
+                'enabled': attrs.access_log.enabled,
+                's3_bucket_name': attrs.access_log.s3_bucket_name,
+                's3_bucket_prefix': attrs.access_log.s3_bucket_prefix,
+                'emit_interval': attrs.access_log.emit_interval,
+            },
+        }
+    if instance_health:
+        details['instance_health'] = [{
+            'instance_id': state.instance_id,
+            'state': state.state,
+            'reason_code': state.reason_code,
+            'description': state.description,
+        } for state in connection.describe_instance_health(name)]
+    return details
+
+
+def iter_load_balancers(connection, elb_names):
+    # follow NextMarker, converting one page of load balancers at a time
+    marker = None
+    while True:
+        page = connection.get_all_load_balancers(elb_names, marker=marker)
+        for elb in page:
+            yield elb
+        marker = getattr(page, 'next_marker', None)
+        if not marker:
+            return
+
+
+def add_elb_details(module, elb_array):
+    """
+    Fetch the attributes and instance health of the ELBs with a bounded
+    pool of threads, each with its own connection, and merge them into
+    the facts.
+    """
+    pending = Queue.Queue()
+    for elb_info in elb_array:
+        pending.put(elb_info)
+    errors = []
+
+    def worker(connection):
+        while True:
+            try:
+                elb_info = pending.get_nowait()
+            except Queue.Empty:
+                return
+            try:
+                elb_info.update(get_elb_details(connection, elb_info['_name'],
+                                                module.params.get('attributes'),
+                                                module.params.get('instance_health')))
+            except BotoServerError as e:
+                errors.append('%s: %s' % (elb_info['_name'], get_error_message(e.args[2])))
+            except Exception as e:
+                errors.append('%s: %s' % (elb_info['_name'], e))
+
+    count = max(1, min(module.params.get('concurrency'), len(elb_array)))
+    threads = [threading.Thread(target=worker, args=(elb_connect(module),)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        module.fail_json(msg='; '.join(errors))
+
+
 def list_elb(connection, module):
     elb_names = module.params.get("names")
     if not elb_names:
         elb_names = None
+    fields = module.params.get("fields")
 
+    if module.params.get("compact") and not fields:
+        info = get_compact_elb_info
+    elif fields:
+        info = lambda elb: dict((k, v) for k, v in get_elb_info(elb).items() if k in fields)
+    else:
+        info = get_elb_info
+
+    elb_array = []
     try:
-        all_elbs = connection.get_all_load_balancers(elb_names)
+        for elb in iter_load_balancers(connection, elb_names):
+            elb_info = info(elb)
+            elb_info['_name'] = elb.name
+            elb_array.append(elb_info)
     except BotoServerError as e:
         module.fail_json(msg=get_error_message(e.args[2]))
 
-    elb_array = []
-    for elb in all_elbs:
-        elb_array.append(get_elb_info(elb))
+    if elb_array and (module.params.get('attributes') or module.params.get('instance_health')):
+        add_elb_details(module, elb_array)
+    for elb_info in elb_array:
+        del elb_info['_name']
 
     module.exit_json(elbs=elb_array)
 
 
+def elb_connect(module):
+    region, ec2_url, aws_connect_params = get_aws_connection_info(module)
+
+    if region:
+        try:
+            connection = connect_to_aws(boto.ec2.elb, region, **aws_connect_params)
+        except (boto.exception.NoAuthHandlerFound, StandardError), e:
+            module.fail_json(msg=str(e))
+    else:
+        module.fail_json(msg="region must be specified")
+    return connection
+
+
 def main():
     argument_spec = ec2_argument_spec()
     argument_spec.update(
         dict(
-            names={'default': None, 'type': 'list'}
+            names={'default': None, 'type': 'list'},
+            fields={'default': None, 'type': 'list'},
+            compact={'default': False, 'type': 'bool'},
+            attributes={'default': False, 'type': 'bool'},
+            instance_health={'default': False, 'type': 'bool'},
+            concurrency={'default': 8, 'type': 'int'}
         )
     )
 
@@ -179,17 +335,7 @@ def main():
     if not HAS_BOTO:
         module.fail_json(msg='boto required for this module')
 
-    region, ec2_url, aws_connect_params = get_aws_connection_info(module)
-
-    if region:
-        try:
-            connection = connect_to_aws(boto.ec2.elb, region, **aws_connect_params)
-        except (boto.exception.NoAuthHandlerFound, StandardError), e:
-            module.fail_json(msg=str(e))
-    else:
-        module.fail_json(msg="region must be specified")
-
-    list_elb(connection, module)
+    list_elb(elb_connect(module), module)
 
 from ansible.module_utils.basic import *
 from ansible.module_utils.ec2 import *
@@ -133,6 +133,7 @@ EXAMPLES = '''
 '''
 
 import time
+import random
 import xml.etree.ElementTree as ET
 import re
 
@@ -176,19 +177,51 @@ def get_eni_info(interface):
     
     return interface_info
     
-def wait_for_eni(eni, status):
-    
+# Attaching or detaching usually takes a few seconds, give up after this
+ENI_WAIT_TIMEOUT = 300
+THROTTLING_ERRORS = ('Throttling', 'RequestLimitExceeded')
+
+
+def wait_for_eni(eni, status, timeout=ENI_WAIT_TIMEOUT):
+    """
+    Poll the interface until its attachment reaches status. The first check
+    is immediate, then they back off exponentially, with jitter, from half
+    a second to 15 seconds; a throttled update counts as a check. Returns
+    the interface, or None after timeout seconds, and the number of
+    attempts and the elapsed time.
+    """
+    start = time.time()
+    delay = 0.5
+    attempts = 0
     while True:
-        time.sleep(3)
-        eni.update()
-        # If the status is detached we just need attachment to disappear
-        if eni.attachment is None:
-            if status == "detached":
-                break
-        else:
-            if status == "attached" and eni.attachment.status == "attached":
-                break
-        
+        attempts += 1
+        reached = False
+        try:
+            eni.update()
+            # If the status is detached we just need attachment to disappear
+            if eni.attachment is None:
+                reached = status == "detached"
+            else:
+                reached = status == "attached" and eni.attachment.status == "attached"
+        except BotoServerError as e:
+            if e.error_code not in THROTTLING_ERRORS:
+                raise
+        remaining = start + timeout - time.time()
+        if reached or remaining <= 0:
+            waited = dict(attempts=attempts, elapsed=round(time.time() - start, 1))
+            if reached:
+                return eni, waited
+            return None, waited
+        time.sleep(min(delay * random.uniform(0.5, 1.5), remaining))
+        delay = min(delay * 2, 15)
+
+
+def wait_for_eni_or_fail(module, eni, status):
+    reached, waited = wait_for_eni(eni, status)
+    if reached is None:
+        module.fail_json(msg="Timeout waiting for interface %s to be %s" % (eni.id, status), wait=waited)
+    return waited
+
     
 def create_eni(connection, module):
     
@@ -204,6 +237,7 @@ def create_eni(connection, module):
     description = module.params.get('description')
     security_groups = module.params.get('security_groups')
     changed = False
+    waited = None
     
     try:
         eni = compare_eni(connection, module)
@@ -216,14 +250,13 @@ def create_eni(connection, module):
                     eni.delete()
                     raise
                 # Wait to allow creation / attachment to finish
-                wait_for_eni(eni, "attached")
-                eni.update()
+                waited = wait_for_eni_or_fail(module, eni, "attached")
             changed = True
             
     except BotoServerError as e:
         module.fail_json(msg=get_error_message(e.args[2]))
                 
-    module.exit_json(changed=changed, interface=get_eni_info(eni))
+    module.exit_json(changed=changed, interface=get_eni_info(eni), wait=waited)
     
 
 def modify_eni(connection, module):
@@ -244,6 +277,7 @@ def modify_eni(connection, module):
     source_dest_check = module.params.get("source_dest_check")
     delete_on_termination = module.params.get("delete_on_termination")
     changed = False
+    waited = None
 
     
     try:
@@ -271,12 +305,12 @@ def modify_eni(connection, module):
                 module.fail_json(msg="Can not modify delete_on_termination as the interface is not attached")
         if eni.attachment is not None and instance_id is None and do_detach is True:
             eni.detach(force_detach)
-            wait_for_eni(eni, "detached")
+            waited = wait_for_eni_or_fail(module, eni, "detached")
             changed = True
         else:
             if instance_id is not None:
                 eni.attach(instance_id, device_index)
-                wait_for_eni(eni, "attached")
+                waited = wait_for_eni_or_fail(module, eni, "attached")
                 changed = True
 
     except BotoServerError as e:
@@ -284,7 +318,7 @@ def modify_eni(connection, module):
         module.fail_json(msg=get_error_message(e.args[2]))
                 
     eni.update()
-    module.exit_json(changed=changed, interface=get_eni_info(eni))
+    module.exit_json(changed=changed, interface=get_eni_info(eni), wait=waited)
     
     
 def delete_eni(connection, module):
@@ -300,8 +334,7 @@ def delete_eni(connection, module):
             if eni.attachment is not None:
                 eni.detach(force_detach)
                 # Wait to allow detachment to finish
-                wait_for_eni(eni, "detached")
-                eni.update()
+                wait_for_eni_or_fail(module, eni, "detached")
             eni.delete()
             changed = True
         else:
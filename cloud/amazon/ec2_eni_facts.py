@@ -27,6 +27,24 @@ options:
       - The ID of the ENI. Pass this option to gather facts about a particular ENI, otherwise, all ENIs are returned.
     required: false
     default: null
+  filters:
+    description:
+      - A dict of filters to apply. Each dict item consists of a filter key and a filter value. See U(http://docs.aws.amazon.com/AWSEC2/latest/APIReference/API_DescribeNetworkInterfaces.html) for possible filters.
+    required: false
+    default: null
+    version_added: "2.1"
+  fields:
+    description:
+      - List of keys to return for each ENI, e.g. C(id), C(private_ip_address), C(attachment). By default every key is returned.
+    required: false
+    default: null
+    version_added: "2.1"
+  compact:
+    description:
+      - Only return the id, subnet_id, private_ip_address, status and attached instance_id of each ENI. Ignored when fields is given.
+    required: false
+    default: false
+    version_added: "2.1"
 extends_documentation_fragment:
     - aws
     - ec2
@@ -42,6 +60,12 @@ EXAMPLES = '''
 - ec2_eni_facts:
     eni_id: eni-xxxxxxx
 
+# Gather the addresses of the ENIs of one VPC
+- ec2_eni_facts:
+    filters:
+      vpc-id: vpc-abcdef00
+    fields: [id, private_ip_address]
+
 '''
 
 import xml.etree.ElementTree as ET
@@ -87,19 +111,36 @@ def get_eni_info(interface):
     return interface_info
 
 
+def get_compact_eni_info(interface):
+
+    return {'id': interface.id,
+            'subnet_id': interface.subnet_id,
+            'private_ip_address': interface.private_ip_address,
+            'status': interface.status,
+            'instance_id': interface.attachment is not None and interface.attachment.instance_id or None,
+            }
+
+
 def list_eni(connection, module):
 
     eni_id = module.params.get("eni_id")
+    fields = module.params.get("fields")
     interface_dict_array = []
 
+    if module.params.get("compact") and not fields:
+        info = get_compact_eni_info
+    elif fields:
+        info = lambda interface: dict((k, v) for k, v in get_eni_info(interface).items() if k in fields)
+    else:
+        info = get_eni_info
+
     try:
-        all_eni = connection.get_all_network_interfaces(eni_id)
+        all_eni = connection.get_all_network_interfaces(eni_id, filters=module.params.get("filters"))
+        for interface in all_eni:
+            interface_dict_array.append(info(interface))
     except BotoServerError as e:
         module.fail_json(msg=get_error_message(e.args[2]))
 
-    for interface in all_eni:
-        interface_dict_array.append(get_eni_info(interface))
-
     module.exit_json(interfaces=interface_dict_array)
 
 
@@ -107,7 +148,10 @@ def main():
     argument_spec = ec2_argument_spec()
     argument_spec.update(
         dict(
-            eni_id = dict(default=None)
+            eni_id = dict(default=None),
+            filters = dict(default=None, type='dict'),
+            fields = dict(default=None, type='list'),
+            compact = dict(default=False, type='bool')
         )
     )
 
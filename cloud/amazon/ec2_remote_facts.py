@@ -38,14 +38,36 @@ options:
     default: tags
   region:
     description:
-      - EC2 region that it should look for tags in
+      - EC2 region that it should look for tags in. When not set, all the
+        regions are searched concurrently.
     required: false
     default: All Regions
   ignore_state:
     description:
       - instance state that should be ignored such as terminated.
+      - Can be a list of states, they are filtered out by EC2.
     required: false
     default: terminated
+  vpc_id:
+    description:
+      - only return the instances of this VPC
+    required: false
+    default: null
+    version_added: "2.1"
+  filters:
+    description:
+      - additional filters passed to EC2, a dict of filter names and values,
+        see U(http://docs.aws.amazon.com/AWSEC2/latest/APIReference/API_DescribeInstances.html)
+    required: false
+    default: null
+    version_added: "2.1"
+  fields:
+    description:
+      - list of instance attributes to return, e.g. C(id), C(private_ip_address),
+        C(tags). By default every attribute is returned.
+    required: false
+    default: null
+    version_added: "2.1"
 author:
     - "Michael Schuett (@michaeljs1990)"
 extends_documentation_fragment: aws
@@ -59,6 +81,15 @@ EXAMPLES = '''
     key: mykey
     value: myvalue
   register: servers
+
+# Addresses of the running web servers of a VPC in every region
+- ec2_remote_facts:
+    key: role
+    value: web
+    vpc_id: vpc-123456
+    ignore_state: [pending, shutting-down, terminated, stopping, stopped]
+    fields: [id, private_ip_address, placement]
+  register: servers
 '''
 try:
     import boto
@@ -67,6 +98,10 @@ try:
 except ImportError:
     HAS_BOTO = False
 
+import threading
+
+INSTANCE_STATES = ['pending', 'running', 'shutting-down', 'terminated', 'stopping', 'stopped']
+
 def todict(obj, classkey=None):
     if isinstance(obj, dict):
         data = {}
@@ -94,54 +129,107 @@ def get_all_ec2_regions(module):
     try:
         regions = boto.ec2.regions()
     except Exception, e:
-        module.fail_json('Boto authentication issue: %s' % e)
+        module.fail_json(msg='Boto authentication issue: %s' % e)
 
     return regions
 
 # Connect to ec2 region
-def connect_to_region(region, module):
+def connect_to_region(region, module, aws_connect_params):
     try:
-        conn = boto.ec2.connect_to_region(region.name)
+        conn = connect_to_aws(boto.ec2, region.name, **aws_connect_params)
     except Exception, e:
-        print module.jsonify('error connecting to region: ' + region.name)
         conn = None
     # connect_to_region will fail "silently" by returning
     # None if the region name is wrong or not supported
     return conn
 
+def build_filters(module):
+    filters = dict(module.params.get('filters') or {})
+    # Run when looking up by tag names
+    if module.params.get('lookup') == 'tags':
+        if module.params.get('value') is not None:
+            filters['tag:' + module.params.get('key')] = module.params.get('value')
+        else:
+            filters['tag-key'] = module.params.get('key')
+    states = [s for s in INSTANCE_STATES if s not in module.params.get('ignore_state')]
+    if len(states) < len(INSTANCE_STATES):
+        filters['instance-state-name'] = states
+    if module.params.get('vpc_id'):
+        filters['vpc-id'] = module.params.get('vpc_id')
+    return filters
+
+def instance_info(instance, fields):
+    if instance.private_ip_address != None:
+        instance.hostname = 'ip-' + instance.private_ip_address.replace('.', '-')
+    if not fields:
+        return todict(instance)
+    # only walk the requested attributes
+    return dict((field, todict(getattr(instance, field, None))) for field in fields)
+
+def search_region(region, module, aws_connect_params, filters):
+    """ Return the matching instances of one region, and an error if any """
+    conn = connect_to_region(region, module, aws_connect_params)
+    if conn is None:
+        return [], 'error connecting to region: ' + region.name
+    try:
+        reservations = conn.get_all_instances(filters=filters)
+    except Exception, e:
+        return [], 'error getting instances from: %s: %s' % (region.name, e)
+    return [instance_info(instance, module.params.get('fields'))
+            for r in reservations for instance in r.instances], None
+
+def search_regions(regions, module, aws_connect_params, filters):
+    """ Search all the regions at once, one thread and connection per region """
+    results = {}
+
+    def worker(region):
+        results[region.name] = search_region(region, module, aws_connect_params, filters)
+
+    threads = [threading.Thread(target=worker, args=(region,)) for region in regions]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return [results[region.name] for region in regions]
+
 def main():
-    module = AnsibleModule(
-        argument_spec = dict(
+    argument_spec = ec2_argument_spec()
+    argument_spec.update(
+        dict(
             key = dict(default='Name'),
             value = dict(),
             lookup = dict(default='tags'),
-            ignore_state = dict(default='terminated'),
-            region = dict(),
+            ignore_state = dict(default=['terminated'], type='list'),
+            vpc_id = dict(),
+            filters = dict(type='dict'),
+            fields = dict(type='list'),
         )
     )
+    module = AnsibleModule(argument_spec=argument_spec)
 
     if not HAS_BOTO:
         module.fail_json(msg='boto required for this module')
 
-    server_info = list()
+    region, ec2_url, aws_connect_params = get_aws_connection_info(module)
+    filters = build_filters(module)
 
-    for region in get_all_ec2_regions(module):
-        conn = connect_to_region(region, module)
-        try:
-            # Run when looking up by tag names, only returning hostname currently
-            if module.params.get('lookup') == 'tags':
-                ec2_key = 'tag:' + module.params.get('key')
-                ec2_value = module.params.get('value')
-                reservations = conn.get_all_instances(filters={ec2_key : ec2_value})
-                for instance in [i for r in reservations for i in r.instances]:
-                    if instance.private_ip_address != None:
-                        instance.hostname = 'ip-' + instance.private_ip_address.replace('.', '-')
-                    if instance._state.name not in module.params.get('ignore_state'):
-                        server_info.append(todict(instance))
-        except:
-            print module.jsonify('error getting instances from: ' + region.name)
+    if module.params.get('region'):
+        regions = [r for r in get_all_ec2_regions(module) if r.name == module.params.get('region')]
+        if not regions:
+            module.fail_json(msg='unknown region: %s' % module.params.get('region'))
+    else:
+        regions = get_all_ec2_regions(module)
+
+    server_info = list()
+    errors = list()
+    for instances, error in search_regions(regions, module, aws_connect_params, filters):
+        server_info.extend(instances)
+        if error:
+            errors.append(error)
 
     ec2_facts_result = dict(changed=True, ec2=server_info)
+    if errors:
+        ec2_facts_result['region_errors'] = errors
 
     module.exit_json(**ec2_facts_result)
 
@@ -61,6 +61,19 @@ options:
     description:
       - "VPC ID of the VPC in which to create the route table."
     required: true
+  route_tables:
+    description:
+      - "List of route tables of the VPC to manage at once, each a dict with the keys 'route_table_id' or 'tags' to identify it, and optionally 'routes', 'subnets', 'propagating_vgw_ids' and 'state', with the same meaning as the options of the same name. Tags are only added, and subnets of another listed table are moved with one association replacement."
+      - "The VPC is read once, all the changes are planned before any is made, and the tables are then changed in parallel. Tables with state 'absent' are deleted last. In check mode the planned actions are returned."
+    required: false
+    default: null
+    version_added: "2.1"
+  concurrency:
+    description:
+      - "How many route tables are changed at the same time when route_tables is used. Throttled calls are retried with an exponential backoff."
+    required: false
+    default: 4
+    version_added: "2.1"
 extends_documentation_fragment:
     - aws
     - ec2
@@ -99,17 +112,43 @@ EXAMPLES = '''
       - dest: 0.0.0.0/0
         instance_id: "{{ nat.instance_id }}"
   register: nat_route_table
+
+- name: Set up all the route tables of a VPC
+  ec2_vpc_route_table:
+    vpc_id: vpc-1245678
+    region: us-west-1
+    route_tables:
+      - tags:
+          Name: Public
+        subnets: [ 'Jumpbox Subnet', 'Frontend Subnet' ]
+        routes:
+          - dest: 0.0.0.0/0
+            gateway_id: igw
+      - tags:
+          Name: Internal
+        subnets: [ 'Database Subnet', '10.0.2.0/24' ]
+        routes:
+          - dest: 0.0.0.0/0
+            instance_id: "{{ nat.instance_id }}"
+      - tags:
+          Name: Legacy
+        state: absent
+  register: route_tables
   
 '''
 
 
 import sys  # noqa
 import re
+import time
+import random
+import threading
+import Queue
 
 try:
     import boto.ec2
     import boto.vpc
-    from boto.exception import EC2ResponseError
+    from boto.exception import BotoServerError, EC2ResponseError
     HAS_BOTO = True
 except ImportError:
     HAS_BOTO = False
@@ -137,88 +176,118 @@ SUBNET_RE = re.compile('^subnet-[A-z0-9]+$')
 ROUTE_TABLE_RE = re.compile('^rtb-[A-z0-9]+$')
 
 
-def find_subnets(vpc_conn, vpc_id, identified_subnets):
+class VpcResources(object):
     """
-    Finds a list of subnets, each identified either by a raw ID, a unique
-    'Name' tag, or a CIDR such as 10.0.0.0/8.
+    Route tables, subnets and the Internet gateway of one VPC.
 
-    Note that this function is duplicated in other ec2 modules, and should
-    potentially be moved into potentially be moved into a shared module_utils
+    Each kind of resource is read with a single describe call the first
+    time it is needed. EC2 returns the tags with the resources, so tag
+    matching and subnet lookups are answered from memory instead of with
+    one get_all_tags call per resource.
     """
-    subnet_ids = []
-    subnet_names = []
-    subnet_cidrs = []
-    for subnet in (identified_subnets or []):
-        if re.match(SUBNET_RE, subnet):
-            subnet_ids.append(subnet)
-        elif re.match(CIDR_RE, subnet):
-            subnet_cidrs.append(subnet)
-        else:
-            subnet_names.append(subnet)
-
-    subnets_by_id = []
-    if subnet_ids:
-        subnets_by_id = vpc_conn.get_all_subnets(
-            subnet_ids, filters={'vpc_id': vpc_id})
-
-        for subnet_id in subnet_ids:
-            if not any(s.id == subnet_id for s in subnets_by_id):
-                raise AnsibleSubnetSearchException(
-                    'Subnet ID "{0}" does not exist'.format(subnet_id))
-
-    subnets_by_cidr = []
-    if subnet_cidrs:
-        subnets_by_cidr = vpc_conn.get_all_subnets(
-            filters={'vpc_id': vpc_id, 'cidr': subnet_cidrs})
-
-        for cidr in subnet_cidrs:
-            if not any(s.cidr_block == cidr for s in subnets_by_cidr):
-                raise AnsibleSubnetSearchException(
-                    'Subnet CIDR "{0}" does not exist'.format(subnet_cidr))
-
-    subnets_by_name = []
-    if subnet_names:
-        subnets_by_name = vpc_conn.get_all_subnets(
-            filters={'vpc_id': vpc_id, 'tag:Name': subnet_names})
-
-        for name in subnet_names:
-            matching = [s.tags.get('Name') == name for s in subnets_by_name]
-            if len(matching) == 0:
-                raise AnsibleSubnetSearchException(
-                    'Subnet named "{0}" does not exist'.format(name))
-            elif len(matching) > 1:
-                raise AnsibleSubnetSearchException(
-                    'Multiple subnets named "{0}"'.format(name))
-
-    return subnets_by_id + subnets_by_cidr + subnets_by_name
-
-
-def find_igw(vpc_conn, vpc_id):
-    """
-    Finds the Internet gateway for the given VPC ID.
-
-    Raises an AnsibleIgwSearchException if either no IGW can be found, or more
-    than one found for the given VPC.
-
-    Note that this function is duplicated in other ec2 modules, and should
-    potentially be moved into potentially be moved into a shared module_utils
-    """
-    igw = vpc_conn.get_all_internet_gateways(
-        filters={'attachment.vpc-id': vpc_id})
-
-    if not igw:
-        raise AnsibleIgwSearchException('No IGW found for VPC {0}'.
-                                         format(vpc_id))
-    elif len(igw) == 1:
-        return igw[0].id
-    else:
-        raise AnsibleIgwSearchException('Multiple IGWs found for VPC {0}'.
-                                        format(vpc_id))
 
-
-def get_resource_tags(vpc_conn, resource_id):
-    return dict((t.name, t.value) for t in
-                vpc_conn.get_all_tags(filters={'resource-id': resource_id}))
+    def __init__(self, vpc_conn, vpc_id):
+        self.vpc_conn = vpc_conn
+        self.vpc_id = vpc_id
+        self._route_tables = None
+        self._subnets = None
+        self._igws = None
+
+    @property
+    def route_tables(self):
+        if self._route_tables is None:
+            self._route_tables = dict(
+                (table.id, table) for table in
+                self.vpc_conn.get_all_route_tables(filters={'vpc_id': self.vpc_id}))
+        return self._route_tables
+
+    @property
+    def subnets(self):
+        if self._subnets is None:
+            self._subnets = self.vpc_conn.get_all_subnets(filters={'vpc_id': self.vpc_id})
+            self._subnets_by_id = dict((s.id, s) for s in self._subnets)
+            self._subnets_by_cidr = dict((s.cidr_block, s) for s in self._subnets)
+            self._subnets_by_name = {}
+            for subnet in self._subnets:
+                name = (subnet.tags or {}).get('Name')
+                if name is not None:
+                    self._subnets_by_name.setdefault(name, []).append(subnet)
+        return self._subnets
+
+    def add_route_table(self, route_table):
+        if route_table.tags is None:
+            route_table.tags = {}
+        self.route_tables[route_table.id] = route_table
+
+    def route_table_by_id(self, route_table_id):
+        return self.route_tables.get(route_table_id)
+
+    def route_table_by_tags(self, tags):
+        matching = [table for table in self.route_tables.values()
+                    if tags_match(tags, table.tags or {})]
+        if len(matching) > 1:
+            raise RuntimeError("Tags provided do not identify a unique route table")
+        return matching and matching[0] or None
+
+    def subnet_association(self, subnet_id):
+        """ Return the route table a subnet is explicitly associated with, and the association """
+        for route_table in self.route_tables.values():
+            for association in route_table.associations:
+                if association.subnet_id == subnet_id:
+                    return route_table, association
+        return None, None
+
+    def find_subnets(self, identified_subnets):
+        """
+        Finds a list of subnets, each identified either by a raw ID, a unique
+        'Name' tag, or a CIDR such as 10.0.0.0/8.
+        """
+        if not identified_subnets:
+            return []
+        # reading the subnets builds the id, CIDR and name indexes
+        self.subnets
+        found = []
+        for subnet in (identified_subnets or []):
+            if re.match(SUBNET_RE, subnet):
+                if subnet not in self._subnets_by_id:
+                    raise AnsibleSubnetSearchException(
+                        'Subnet ID "{0}" does not exist'.format(subnet))
+                found.append(self._subnets_by_id[subnet])
+            elif re.match(CIDR_RE, subnet):
+                if subnet not in self._subnets_by_cidr:
+                    raise AnsibleSubnetSearchException(
+                        'Subnet CIDR "{0}" does not exist'.format(subnet))
+                found.append(self._subnets_by_cidr[subnet])
+            else:
+                matching = self._subnets_by_name.get(subnet, [])
+                if len(matching) == 0:
+                    raise AnsibleSubnetSearchException(
+                        'Subnet named "{0}" does not exist'.format(subnet))
+                elif len(matching) > 1:
+                    raise AnsibleSubnetSearchException(
+                        'Multiple subnets named "{0}"'.format(subnet))
+                found.append(matching[0])
+        return found
+
+    def find_igw(self):
+        """
+        Finds the Internet gateway of the VPC.
+
+        Raises an AnsibleIgwSearchException if either no IGW can be found, or more
+        than one found for the VPC.
+        """
+        if self._igws is None:
+            self._igws = self.vpc_conn.get_all_internet_gateways(
+                filters={'attachment.vpc-id': self.vpc_id})
+
+        if not self._igws:
+            raise AnsibleIgwSearchException('No IGW found for VPC {0}'.
+                                             format(self.vpc_id))
+        elif len(self._igws) == 1:
+            return self._igws[0].id
+        else:
+            raise AnsibleIgwSearchException('Multiple IGWs found for VPC {0}'.
+                                            format(self.vpc_id))
 
 
 def tags_match(match_tags, candidate_tags):
@@ -226,51 +295,31 @@ def tags_match(match_tags, candidate_tags):
                 for k, v in match_tags.iteritems()))
 
 
-def ensure_tags(vpc_conn, resource_id, tags, add_only, check_mode):
+def ensure_tags(vpc_conn, resource, tags, add_only, check_mode):
     try:
-        cur_tags = get_resource_tags(vpc_conn, resource_id)
+        cur_tags = resource.tags or {}
         if tags == cur_tags:
             return {'changed': False, 'tags': cur_tags}
 
+        latest_tags = dict(cur_tags)
         to_delete = dict((k, cur_tags[k]) for k in cur_tags if k not in tags)
         if to_delete and not add_only:
-            vpc_conn.delete_tags(resource_id, to_delete, dry_run=check_mode)
+            vpc_conn.delete_tags(resource.id, to_delete, dry_run=check_mode)
+            for k in to_delete:
+                del latest_tags[k]
+        else:
+            to_delete = {}
 
-        to_add = dict((k, tags[k]) for k in tags if k not in cur_tags)
+        to_add = dict((k, tags[k]) for k in tags if cur_tags.get(k) != tags[k])
         if to_add:
-            vpc_conn.create_tags(resource_id, to_add, dry_run=check_mode)
+            vpc_conn.create_tags(resource.id, to_add, dry_run=check_mode)
+            latest_tags.update(to_add)
 
-        latest_tags = get_resource_tags(vpc_conn, resource_id)
-        return {'changed': True, 'tags': latest_tags}
+        resource.tags = latest_tags
+        return {'changed': bool(to_delete or to_add), 'tags': latest_tags}
     except EC2ResponseError as e:
         raise AnsibleTagCreationException(
-            'Unable to update tags for {0}, error: {1}'.format(resource_id, e))
-
-
-def get_route_table_by_id(vpc_conn, vpc_id, route_table_id):
-
-    route_table = None
-    route_tables = vpc_conn.get_all_route_tables(route_table_ids=[route_table_id], filters={'vpc_id': vpc_id})
-    if route_tables:
-        route_table = route_tables[0]
-    
-    return route_table
-    
-def get_route_table_by_tags(vpc_conn, vpc_id, tags):
-    
-    count = 0
-    route_table = None 
-    route_tables = vpc_conn.get_all_route_tables(filters={'vpc_id': vpc_id})
-    for table in route_tables:
-        this_tags = get_resource_tags(vpc_conn, table.id)
-        if tags_match(tags, this_tags):
-            route_table = table
-            count +=1
-    
-    if count > 1:
-        raise RuntimeError("Tags provided do not identify a unique route table")
-    else:        
-        return route_table
+            'Unable to update tags for {0}, error: {1}'.format(resource.id, e))
 
 
 def route_spec_matches_route(route_spec, route):
@@ -293,22 +342,24 @@ def rename_key(d, old_key, new_key):
     del d[old_key]
 
 
-def index_of_matching_route(route_spec, routes_to_match):
-    for i, route in enumerate(routes_to_match):
-        if route_spec_matches_route(route_spec, route):
-            return i
-
+def plan_routes(routes, route_specs, propagating_vgw_ids):
+    """
+    Compare the routes of a table with the wanted ones, indexed by
+    destination, which is unique within a route table.
 
-def ensure_routes(vpc_conn, route_table, route_specs, propagating_vgw_ids,
-                  check_mode):
-    routes_to_match = list(route_table.routes)
+    Returns the route specs to create, the route specs whose target must be
+    replaced and the routes to delete.
+    """
+    existing = dict((r.destination_cidr_block, r) for r in routes
+                    if r.destination_cidr_block is not None)
     route_specs_to_create = []
+    route_specs_to_replace = []
     for route_spec in route_specs:
-        i = index_of_matching_route(route_spec, routes_to_match)
-        if i is None:
+        route = existing.pop(route_spec['destination_cidr_block'], None)
+        if route is None:
             route_specs_to_create.append(route_spec)
-        else:
-            del routes_to_match[i]
+        elif not route_spec_matches_route(route_spec, route):
+            route_specs_to_replace.append(route_spec)
 
     # NOTE: As of boto==2.38.0, the origin of a route is not available
     # (for example, whether it came from a gateway with route propagation
@@ -316,17 +367,29 @@ def ensure_routes(vpc_conn, route_table, route_specs, propagating_vgw_ids,
     # correct than checking whether the route uses a propagating VGW.
     # The current logic will leave non-propagated routes using propagating
     # VGWs in place.
-    routes_to_delete = [r for r in routes_to_match
+    routes_to_delete = [r for r in existing.values()
                         if r.gateway_id != 'local'
                         and r.gateway_id not in propagating_vgw_ids]
+    return route_specs_to_create, route_specs_to_replace, routes_to_delete
 
-    changed = routes_to_delete or route_specs_to_create
+
+def ensure_routes(vpc_conn, route_table, route_specs, propagating_vgw_ids,
+                  check_mode):
+    route_specs_to_create, route_specs_to_replace, routes_to_delete = \
+        plan_routes(route_table.routes, route_specs, propagating_vgw_ids or [])
+
+    changed = bool(routes_to_delete or route_specs_to_create or route_specs_to_replace)
     if changed:
         for route_spec in route_specs_to_create:
             vpc_conn.create_route(route_table.id,
                                   dry_run=check_mode,
                                   **route_spec)
 
+        for route_spec in route_specs_to_replace:
+            vpc_conn.replace_route(route_table.id,
+                                   dry_run=check_mode,
+                                   **route_spec)
+
         for route in routes_to_delete:
             vpc_conn.delete_route(route_table.id,
                                   route.destination_cidr_block,
@@ -334,35 +397,30 @@ def ensure_routes(vpc_conn, route_table, route_specs, propagating_vgw_ids,
     return {'changed': changed}
 
 
-def ensure_subnet_association(vpc_conn, vpc_id, route_table_id, subnet_id,
+def ensure_subnet_association(vpc_conn, resources, route_table_id, subnet_id,
                               check_mode):
-    route_tables = vpc_conn.get_all_route_tables(
-        filters={'association.subnet_id': subnet_id, 'vpc_id': vpc_id}
-    )
-    for route_table in route_tables:
-        if route_table.id is None:
-            continue
-        for a in route_table.associations:
-            if a.subnet_id == subnet_id:
-                if route_table.id == route_table_id:
-                    return {'changed': False, 'association_id': a.id}
-                else:
-                    if check_mode:
-                        return {'changed': True}
-                    vpc_conn.disassociate_route_table(a.id)
+    route_table, a = resources.subnet_association(subnet_id)
+    if route_table is not None:
+        if route_table.id == route_table_id:
+            return {'changed': False, 'association_id': a.id}
+        else:
+            if check_mode:
+                return {'changed': True}
+            vpc_conn.disassociate_route_table(a.id)
+            route_table.associations.remove(a)
 
     association_id = vpc_conn.associate_route_table(route_table_id, subnet_id)
     return {'changed': True, 'association_id': association_id}
 
 
-def ensure_subnet_associations(vpc_conn, vpc_id, route_table, subnets,
+def ensure_subnet_associations(vpc_conn, resources, route_table, subnets,
                                check_mode):
     current_association_ids = [a.id for a in route_table.associations]
     new_association_ids = []
     changed = False
     for subnet in subnets:
         result = ensure_subnet_association(
-            vpc_conn, vpc_id, route_table.id, subnet.id, check_mode)
+            vpc_conn, resources, route_table.id, subnet.id, check_mode)
         changed = changed or result['changed']
         if changed and check_mode:
             return {'changed': True}
@@ -407,11 +465,12 @@ def ensure_route_table_absent(connection, module):
     tags = module.params.get('tags')
     vpc_id = module.params.get('vpc_id')
     check_mode = module.params.get('check_mode')
+    resources = VpcResources(connection, vpc_id)
 
     if lookup == 'tag':
         if tags is not None:
             try:
-                route_table = get_route_table_by_tags(connection, vpc_id, tags)
+                route_table = resources.route_table_by_tags(tags)
             except EC2ResponseError as e:
                 module.fail_json(msg=e.message)
             except RuntimeError as e:
@@ -420,7 +479,7 @@ def ensure_route_table_absent(connection, module):
             route_table = None
     elif lookup == 'id':
         try:
-            route_table = get_route_table_by_id(connection, vpc_id, route_table_id)
+            route_table = resources.route_table_by_id(route_table_id)
         except EC2ResponseError as e:
             module.fail_json(msg=e.message)
 
@@ -450,14 +509,14 @@ def get_route_table_info(route_table):
 
     return route_table_info
 
-def create_route_spec(connection, routes, vpc_id):
+def create_route_spec(resources, routes):
 
     for route_spec in routes:
         rename_key(route_spec, 'dest', 'destination_cidr_block')
 
         if 'gateway_id' in route_spec and route_spec['gateway_id'] and \
                 route_spec['gateway_id'].lower() == 'igw':
-            igw = find_igw(connection, vpc_id)
+            igw = resources.find_igw()
             route_spec['gateway_id'] = igw
 
     return routes
@@ -471,8 +530,9 @@ def ensure_route_table_present(connection, module):
     tags = module.params.get('tags')
     vpc_id = module.params.get('vpc_id')
     check_mode = module.params.get('check_mode')
+    resources = VpcResources(connection, vpc_id)
     try:
-        routes = create_route_spec(connection, module.params.get('routes'), vpc_id)
+        routes = create_route_spec(resources, module.params.get('routes'))
     except AnsibleIgwSearchException as e:
         module.fail_json(msg=e[0])
     
@@ -482,7 +542,7 @@ def ensure_route_table_present(connection, module):
     if lookup == 'tag':
         if tags is not None:
             try:
-                route_table = get_route_table_by_tags(connection, vpc_id, tags)
+                route_table = resources.route_table_by_tags(tags)
             except EC2ResponseError as e:
                 module.fail_json(msg=e.message)
             except RuntimeError as e:
@@ -491,7 +551,7 @@ def ensure_route_table_present(connection, module):
             route_table = None
     elif lookup == 'id':
         try:
-            route_table = get_route_table_by_id(connection, vpc_id, route_table_id)
+            route_table = resources.route_table_by_id(route_table_id)
         except EC2ResponseError as e:
             module.fail_json(msg=e.message)
         
@@ -499,6 +559,7 @@ def ensure_route_table_present(connection, module):
     if route_table is None:
         try:
             route_table = connection.create_route_table(vpc_id, check_mode)
+            resources.add_route_table(route_table)
             changed = True
         except EC2ResponseError, e:
             module.fail_json(msg=e.message)
@@ -517,14 +578,14 @@ def ensure_route_table_present(connection, module):
         changed = changed or result['changed']
 
     if not tags_valid and tags is not None:
-        result = ensure_tags(connection, route_table.id, tags,
+        result = ensure_tags(connection, route_table, tags,
                              add_only=True, check_mode=check_mode)
         changed = changed or result['changed']
 
     if subnets:
         associated_subnets = []
         try:
-            associated_subnets = find_subnets(connection, vpc_id, subnets)
+            associated_subnets = resources.find_subnets(subnets)
         except EC2ResponseError as e:
             raise AnsibleRouteTableException(
                 'Unable to find subnets for route table {0}, error: {1}'
@@ -532,7 +593,7 @@ def ensure_route_table_present(connection, module):
             )
 
         try:
-            result = ensure_subnet_associations(connection, vpc_id, route_table, associated_subnets, check_mode)
+            result = ensure_subnet_associations(connection, resources, route_table, associated_subnets, check_mode)
             changed = changed or result['changed']
         except EC2ResponseError as e:
             raise AnsibleRouteTableException(
@@ -543,6 +604,229 @@ def ensure_route_table_present(connection, module):
     module.exit_json(changed=changed, route_table=get_route_table_info(route_table))
 
 
+THROTTLING_ERRORS = ('RequestLimitExceeded', 'Throttling')
+MAX_ATTEMPTS = 6
+
+
+def call_with_retry(func, *args, **kwargs):
+    """ Call an EC2 API, backing off with jitter while the calls are throttled """
+    delay = 0.5
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            return func(*args, **kwargs)
+        except EC2ResponseError as e:
+            if e.error_code not in THROTTLING_ERRORS or attempt == MAX_ATTEMPTS:
+                raise
+        time.sleep(delay * random.uniform(0.5, 1.5))
+        delay = min(delay * 2, 20)
+
+
+def plan_route_tables(resources, entries):
+    """
+    Compute the changes needed to reach the wanted route tables, from the
+    state read once through resources.
+
+    Returns one plan per entry, each a dict of the operations to run.
+    """
+    plans = []
+    wanted_subnets = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            raise AnsibleRouteTableException(
+                'Every entry of route_tables must be a dict, got {0}'.format(entry))
+        for route in entry.get('routes') or []:
+            if 'dest' not in route:
+                raise AnsibleRouteTableException('Route {0} has no dest'.format(route))
+        route_table_id = entry.get('route_table_id')
+        tags = entry.get('tags') or {}
+        if route_table_id:
+            route_table = resources.route_table_by_id(route_table_id)
+            if route_table is None:
+                raise AnsibleRouteTableException(
+                    'Route table {0} does not exist in {1}'.format(route_table_id, resources.vpc_id))
+        elif tags:
+            route_table = resources.route_table_by_tags(tags)
+        else:
+            raise AnsibleRouteTableException(
+                'Every route table needs either a route_table_id or tags, got {0}'.format(entry))
+
+        plan = {'entry': entry, 'route_table': route_table, 'actions': []}
+        plans.append(plan)
+        if entry.get('state', 'present') == 'absent':
+            if route_table is not None:
+                plan['delete'] = True
+                plan['actions'].append('delete route table')
+            continue
+
+        if route_table is None:
+            plan['create'] = True
+            plan['actions'].append('create route table')
+        current_routes = route_table and route_table.routes or []
+        current_tags = route_table and route_table.tags or {}
+
+        propagating_vgw_ids = entry.get('propagating_vgw_ids') or []
+        route_specs = create_route_spec(resources, [dict(r) for r in entry.get('routes') or []])
+        plan['routes'] = plan_routes(current_routes, route_specs, propagating_vgw_ids)
+        for verb, routes in zip(('create', 'replace'), plan['routes'][:2]):
+            for route_spec in routes:
+                plan['actions'].append('{0} route {1}'.format(verb, route_spec['destination_cidr_block']))
+        for route in plan['routes'][2]:
+            plan['actions'].append('delete route {0}'.format(route.destination_cidr_block))
+
+        gateways = set(r.gateway_id for r in current_routes)
+        plan['propagate'] = [vgw_id for vgw_id in propagating_vgw_ids if vgw_id not in gateways]
+        for vgw_id in plan['propagate']:
+            plan['actions'].append('enable propagation from {0}'.format(vgw_id))
+
+        plan['tags'] = dict((k, v) for k, v in tags.iteritems() if current_tags.get(k) != v)
+        if plan['tags']:
+            plan['actions'].append('tag {0}'.format(', '.join(sorted(plan['tags']))))
+
+        plan['associate'] = []
+        plan['move'] = []
+        if entry.get('subnets'):
+            for subnet in resources.find_subnets(entry['subnets']):
+                if subnet.id in wanted_subnets and wanted_subnets[subnet.id] is not plan:
+                    raise AnsibleRouteTableException(
+                        'Subnet {0} is wanted in more than one route table'.format(subnet.id))
+                wanted_subnets[subnet.id] = plan
+                current_table, association = resources.subnet_association(subnet.id)
+                if current_table is None:
+                    plan['associate'].append(subnet.id)
+                    plan['actions'].append('associate {0}'.format(subnet.id))
+                elif route_table is None or current_table.id != route_table.id:
+                    plan['move'].append((association.id, subnet.id))
+                    plan['actions'].append('move {0} from {1}'.format(subnet.id, current_table.id))
+
+    # associations left on the tables are removed, unless the subnet was
+    # moved to another table
+    for plan in plans:
+        route_table = plan['route_table']
+        plan['disassociate'] = []
+        if route_table is None or (not plan.get('delete') and plan['entry'].get('subnets') is None):
+            continue
+        for association in route_table.associations:
+            if association.subnet_id and association.subnet_id not in wanted_subnets:
+                plan['disassociate'].append(association.id)
+                plan['actions'].append('disassociate {0}'.format(association.subnet_id))
+    return plans
+
+
+def apply_route_table_plan(vpc_conn, vpc_id, plan):
+    route_table = plan['route_table']
+    if plan.get('delete'):
+        for association_id in plan['disassociate']:
+            call_with_retry(vpc_conn.disassociate_route_table, association_id)
+        call_with_retry(vpc_conn.delete_route_table, route_table.id)
+        return None
+
+    if plan.get('create'):
+        route_table = call_with_retry(vpc_conn.create_route_table, vpc_id)
+        if route_table.tags is None:
+            route_table.tags = {}
+    if plan['tags']:
+        call_with_retry(vpc_conn.create_tags, route_table.id, plan['tags'])
+        route_table.tags.update(plan['tags'])
+
+    route_specs_to_create, route_specs_to_replace, routes_to_delete = plan['routes']
+    for route_spec in route_specs_to_create:
+        call_with_retry(vpc_conn.create_route, route_table.id, **route_spec)
+    for route_spec in route_specs_to_replace:
+        call_with_retry(vpc_conn.replace_route, route_table.id, **route_spec)
+    for route in routes_to_delete:
+        call_with_retry(vpc_conn.delete_route, route_table.id, route.destination_cidr_block)
+    for vgw_id in plan['propagate']:
+        call_with_retry(vpc_conn.enable_vgw_route_propagation, route_table.id, vgw_id)
+
+    # moving an association keeps the subnet routed during the change
+    for association_id, subnet_id in plan['move']:
+        call_with_retry(vpc_conn.replace_route_table_association_with_assoc,
+                        association_id, route_table.id)
+    for subnet_id in plan['associate']:
+        call_with_retry(vpc_conn.associate_route_table, route_table.id, subnet_id)
+    for association_id in plan['disassociate']:
+        call_with_retry(vpc_conn.disassociate_route_table, association_id)
+    return route_table
+
+
+def apply_route_table_plans(connect, vpc_id, plans, concurrency):
+    """
+    Run the plans with at most concurrency tables changed at the same time,
+    each worker using its own connection. Tables are deleted last, once the
+    subnets they held may have been moved away.
+    """
+    errors = []
+    lock = threading.Lock()
+
+    def run(batch):
+        pending = Queue.Queue()
+        for plan in batch:
+            pending.put(plan)
+
+        def worker(vpc_conn):
+            while True:
+                try:
+                    plan = pending.get_nowait()
+                except Queue.Empty:
+                    return
+                try:
+                    plan['route_table'] = apply_route_table_plan(vpc_conn, vpc_id, plan)
+                except Exception as e:
+                    if isinstance(e, BotoServerError):
+                        message = e.error_message or e.body
+                    else:
+                        message = str(e)
+                    lock.acquire()
+                    errors.append('{0}: {1}'.format(plan['route_table'] and plan['route_table'].id
+                                                    or plan['entry'].get('tags'), message))
+                    lock.release()
+
+        try:
+            connections = [connect() for i in range(min(concurrency, len(batch)))]
+        except Exception as e:
+            errors.append('Unable to connect: {0}'.format(e))
+            return
+        threads = [threading.Thread(target=worker, args=(vpc_conn,)) for vpc_conn in connections]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    run([plan for plan in plans if plan['actions'] and not plan.get('delete')])
+    if not errors:
+        run([plan for plan in plans if plan.get('delete')])
+    return errors
+
+
+def ensure_route_tables(connection, connect, module):
+
+    vpc_id = module.params.get('vpc_id')
+    resources = VpcResources(connection, vpc_id)
+    try:
+        plans = plan_route_tables(resources, module.params.get('route_tables'))
+    except (AnsibleRouteTableException, RuntimeError) as e:
+        module.fail_json(msg=str(e))
+    except EC2ResponseError as e:
+        module.fail_json(msg=e.message)
+
+    changed = any(plan['actions'] for plan in plans)
+    errors = []
+    if changed and not module.check_mode:
+        errors = apply_route_table_plans(connect, vpc_id, plans, max(1, module.params.get('concurrency')))
+
+    results = []
+    for plan in plans:
+        route_table = plan['route_table']
+        results.append({'id': route_table and route_table.id or None,
+                        'tags': plan['entry'].get('tags'),
+                        'changed': bool(plan['actions']),
+                        'actions': plan['actions']})
+    if errors:
+        module.fail_json(msg='Unable to apply the route tables: {0}'.format('; '.join(errors)),
+                         route_tables=results)
+    return {'changed': changed, 'route_tables': results}
+
+
 def main():
     argument_spec = ec2_argument_spec()
     argument_spec.update(
@@ -554,11 +838,17 @@ def main():
             state = dict(default='present', choices=['present', 'absent']),
             subnets = dict(default=None, required=False, type='list'),
             tags = dict(default=None, required=False, type='dict', aliases=['resource_tags']),
-            vpc_id = dict(default=None, required=True)
+            vpc_id = dict(default=None, required=True),
+            route_tables = dict(default=None, required=False, type='list'),
+            concurrency = dict(default=4, required=False, type='int')
         )
     )
     
-    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
+    module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True,
+                           mutually_exclusive=[['route_tables', 'route_table_id'],
+                                               ['route_tables', 'routes'],
+                                               ['route_tables', 'subnets'],
+                                               ['route_tables', 'tags']])
     
     if not HAS_BOTO:
         module.fail_json(msg='boto is required for this module')
@@ -573,6 +863,11 @@ def main():
     else:
         module.fail_json(msg="region must be specified")
 
+    if module.params.get('route_tables') is not None:
+        # boto connections can not be shared between threads
+        connect = lambda: connect_to_aws(boto.vpc, region, **aws_connect_params)
+        module.exit_json(**ensure_route_tables(connection, connect, module))
+
     lookup = module.params.get('lookup')
     route_table_id = module.params.get('route_table_id')
     state = module.params.get('state', 'present')
@@ -27,6 +27,18 @@ options:
       - A dict of filters to apply. Each dict item consists of a filter key and a filter value. See U(http://docs.aws.amazon.com/AWSEC2/latest/APIReference/API_DescribeRouteTables.html) for possible filters.
     required: false
     default: null
+  fields:
+    description:
+      - List of keys to return for each route table, e.g. C(id), C(tags), C(vpc_id). By default every key is returned.
+    required: false
+    default: null
+    version_added: "2.1"
+  compact:
+    description:
+      - Only return the id, vpc_id and tags of each route table, leaving out the routes. Ignored when fields is given.
+    required: false
+    default: false
+    version_added: "2.1"
 extends_documentation_fragment:
     - aws
     - ec2
@@ -53,6 +65,12 @@ EXAMPLES = '''
     filters:
       vpc-id: vpc-abcdef00
 
+# Gather the ids and tags of the route tables of a VPC without their routes
+- ec2_vpc_route_table_facts:
+    filters:
+      vpc-id: vpc-abcdef00
+    compact: yes
+
 '''
 
 try:
@@ -77,19 +95,32 @@ def get_route_table_info(route_table):
 
     return route_table_info
 
+def get_compact_route_table_info(route_table):
+
+    return { 'id': route_table.id,
+             'tags': route_table.tags,
+             'vpc_id': route_table.vpc_id
+           }
+
 def list_ec2_vpc_route_tables(connection, module):
 
     filters = module.params.get("filters")
+    fields = module.params.get("fields")
     route_table_dict_array = []
 
+    if module.params.get("compact") and not fields:
+        info = get_compact_route_table_info
+    elif fields:
+        info = lambda route_table: dict((k, v) for k, v in get_route_table_info(route_table).items() if k in fields)
+    else:
+        info = get_route_table_info
+
     try:
-        all_route_tables = connection.get_all_route_tables(filters=filters)
+        for route_table in connection.get_all_route_tables(filters=filters):
+            route_table_dict_array.append(info(route_table))
     except BotoServerError as e:
         module.fail_json(msg=e.message)
 
-    for route_table in all_route_tables:
-        route_table_dict_array.append(get_route_table_info(route_table))
-
     module.exit_json(route_tables=route_table_dict_array)
 
 
@@ -97,7 +128,9 @@ def main():
     argument_spec = ec2_argument_spec()
     argument_spec.update(
         dict(
-            filters = dict(default=None, type='dict')
+            filters = dict(default=None, type='dict'),
+            fields = dict(default=None, type='list'),
+            compact = dict(default=False, type='bool')
         )
     )
 
@@ -76,6 +76,7 @@ EXAMPLES = '''
 
 import sys  # noqa
 import time
+import random
 
 try:
     import boto.ec2
@@ -88,6 +89,10 @@ except ImportError:
         raise
 
 
+SUBNET_WAIT_TIMEOUT = 60
+THROTTLING_ERRORS = ('Throttling', 'RequestLimitExceeded')
+
+
 class AnsibleVPCSubnetException(Exception):
     pass
 
@@ -122,12 +127,38 @@ def get_subnet_info(subnet):
 def subnet_exists(vpc_conn, subnet_id):
     filters = {'subnet-id': subnet_id}
     subnet = vpc_conn.get_all_subnets(filters=filters)
-    if subnet[0].state == "available":
+    # a freshly created subnet may not be listed yet
+    if subnet and subnet[0].state == "available":
         return subnet[0]
     else:
         return False
 
 
+def wait_for_subnet(vpc_conn, subnet_id, timeout=SUBNET_WAIT_TIMEOUT):
+    """
+    Poll until the subnet is available: a first check right away, then
+    0.2s between checks, doubling with jitter up to 5s. Throttled
+    describes count as a check. Returns the subnet, or None after
+    timeout, and the number of attempts and elapsed time.
+    """
+    start = time.time()
+    delay = 0.2
+    attempts = 0
+    while True:
+        attempts += 1
+        try:
+            subnet = subnet_exists(vpc_conn, subnet_id) or None
+        except EC2ResponseError as e:
+            if e.error_code not in THROTTLING_ERRORS:
+                raise
+            subnet = None
+        remaining = start + timeout - time.time()
+        if subnet is not None or remaining <= 0:
+            return subnet, dict(attempts=attempts, elapsed=round(time.time() - start, 1))
+        time.sleep(min(delay * random.uniform(0.5, 1.5), remaining))
+        delay = min(delay * 2, 5)
+
+
 def create_subnet(vpc_conn, vpc_id, cidr, az, check_mode):
     try:
         new_subnet = vpc_conn.create_subnet(vpc_id, cidr, az, dry_run=check_mode)
@@ -135,10 +166,11 @@ def create_subnet(vpc_conn, vpc_id, cidr, az, check_mode):
         # new subnets's id to do things like create tags results in
         # exception.  boto doesn't seem to refresh 'state' of the newly
         # created subnet, i.e.: it's always 'pending'.
-        subnet = False
-        while subnet is False:
-            subnet = subnet_exists(vpc_conn, new_subnet.id)
-            time.sleep(0.1)
+        subnet, waited = wait_for_subnet(vpc_conn, new_subnet.id)
+        if subnet is None:
+            raise AnsibleVPCSubnetCreationException(
+                'Subnet {0} ({1}) is not available after {2} seconds and {3} checks'.format(
+                    new_subnet.id, cidr, waited['elapsed'], waited['attempts']))
     except EC2ResponseError as e:
         if e.error_code == "DryRunOperation":
             subnet = None
@@ -149,34 +181,37 @@ def create_subnet(vpc_conn, vpc_id, cidr, az, check_mode):
     return subnet
 
 
-def get_resource_tags(vpc_conn, resource_id):
-    return dict((t.name, t.value) for t in
-                vpc_conn.get_all_tags(filters={'resource-id': resource_id}))
-
-
-def ensure_tags(vpc_conn, resource_id, tags, add_only, check_mode):
+def ensure_tags(vpc_conn, resource, tags, add_only, check_mode):
+    # the tags come with the subnet from get_all_subnets, so they are
+    # neither read again before nor after being written
     try:
-        cur_tags = get_resource_tags(vpc_conn, resource_id)
+        cur_tags = resource.tags or {}
         if cur_tags == tags:
             return {'changed': False, 'tags': cur_tags}
 
+        latest_tags = dict(cur_tags)
         to_delete = dict((k, cur_tags[k]) for k in cur_tags if k not in tags)
         if to_delete and not add_only:
-            vpc_conn.delete_tags(resource_id, to_delete, dry_run=check_mode)
+            vpc_conn.delete_tags(resource.id, to_delete, dry_run=check_mode)
+            for k in to_delete:
+                del latest_tags[k]
+        else:
+            to_delete = {}
 
-        to_add = dict((k, tags[k]) for k in tags if k not in cur_tags)
+        to_add = dict((k, tags[k]) for k in tags if cur_tags.get(k) != tags[k])
         if to_add:
-            vpc_conn.create_tags(resource_id, to_add, dry_run=check_mode)
+            vpc_conn.create_tags(resource.id, to_add, dry_run=check_mode)
+            latest_tags.update(to_add)
 
-        latest_tags = get_resource_tags(vpc_conn, resource_id)
-        return {'changed': True, 'tags': latest_tags}
+        resource.tags = latest_tags
+        return {'changed': bool(to_delete or to_add), 'tags': latest_tags}
     except EC2ResponseError as e:
         raise AnsibleTagCreationException(
-            'Unable to update tags for {0}, error: {1}'.format(resource_id, e))
+            'Unable to update tags for {0}, error: {1}'.format(resource.id, e))
 
 
 def get_matching_subnet(vpc_conn, vpc_id, cidr):
-    subnets = vpc_conn.get_all_subnets(filters={'vpc_id': vpc_id})
+    subnets = vpc_conn.get_all_subnets(filters={'vpc_id': vpc_id, 'cidr': cidr})
     return next((s for s in subnets if s.cidr_block == cidr), None)
 
 
@@ -193,10 +228,9 @@ def ensure_subnet_present(vpc_conn, vpc_id, cidr, az, tags, check_mode):
                 'subnet': {}
             }
 
-    if tags != subnet.tags:
-        ensure_tags(vpc_conn, subnet.id, tags, False, check_mode)
-        subnet.tags = tags
-        changed = True
+    if tags is not None:
+        result = ensure_tags(vpc_conn, subnet, tags, False, check_mode)
+        changed = changed or result['changed']
 
     subnet_info = get_subnet_info(subnet)
 
@@ -27,6 +27,18 @@ options:
       - A dict of filters to apply. Each dict item consists of a filter key and a filter value. See U(http://docs.aws.amazon.com/AWSEC2/latest/APIReference/API_DescribeSubnets.html) for possible filters.
     required: false
     default: null
+  fields:
+    description:
+      - List of keys to return for each subnet, e.g. C(id), C(tags), C(vpc_id). By default every key is returned.
+    required: false
+    default: null
+    version_added: "2.1"
+  compact:
+    description:
+      - Only return the id, cidr_block, availability_zone and vpc_id of each subnet. Ignored when fields is given.
+    required: false
+    default: false
+    version_added: "2.1"
 extends_documentation_fragment:
     - aws
     - ec2
@@ -53,6 +65,12 @@ EXAMPLES = '''
     filters:
       vpc-id: vpc-abcdef00
 
+# Gather the CIDR blocks of every subnet of a VPC
+- ec2_vpc_subnet_facts:
+    filters:
+      vpc-id: vpc-abcdef00
+    fields: [id, cidr_block]
+
 '''
 
 try:
@@ -77,19 +95,33 @@ def get_subnet_info(subnet):
 
     return subnet_info
 
+def get_compact_subnet_info(subnet):
+
+    return { 'id': subnet.id,
+             'cidr_block': subnet.cidr_block,
+             'availability_zone': subnet.availability_zone,
+             'vpc_id': subnet.vpc_id
+           }
+
 def list_ec2_vpc_subnets(connection, module):
 
     filters = module.params.get("filters")
+    fields = module.params.get("fields")
     subnet_dict_array = []
 
+    if module.params.get("compact") and not fields:
+        info = get_compact_subnet_info
+    elif fields:
+        info = lambda subnet: dict((k, v) for k, v in get_subnet_info(subnet).items() if k in fields)
+    else:
+        info = get_subnet_info
+
     try:
-        all_subnets = connection.get_all_subnets(filters=filters)
+        for subnet in connection.get_all_subnets(filters=filters):
+            subnet_dict_array.append(info(subnet))
     except BotoServerError as e:
         module.fail_json(msg=e.message)
 
-    for subnet in all_subnets:
-        subnet_dict_array.append(get_subnet_info(subnet))
-
     module.exit_json(subnets=subnet_dict_array)
 
 
@@ -97,7 +129,9 @@ def main():
     argument_spec = ec2_argument_spec()
     argument_spec.update(
         dict(
-            filters = dict(default=None, type='dict')
+            filters = dict(default=None, type='dict'),
+            fields = dict(default=None, type='list'),
+            compact = dict(default=False, type='bool')
         )
     )
 
@@ -91,14 +91,45 @@ from base64 import b64decode
 from os.path import expanduser
 from Crypto.Cipher import PKCS1_v1_5
 from Crypto.PublicKey import RSA
-import datetime
+import random
+import time
 
 try:
     import boto.ec2
+    from boto.exception import EC2ResponseError
     HAS_BOTO = True
 except ImportError:
     HAS_BOTO = False
 
+THROTTLING_ERRORS = ('Throttling', 'RequestLimitExceeded')
+
+
+def wait_for_password(ec2, instance_id, wait_timeout):
+    """
+    Fetch the password data until Windows has generated it. The first
+    request is immediate, the next ones back off with jitter from 2 to 30
+    seconds apart, and throttled requests count as a try. Returns the
+    decoded data, or None on timeout, and the number of attempts and the
+    elapsed time.
+    """
+    start = time.time()
+    delay = 2
+    attempts = 0
+    while True:
+        attempts += 1
+        decoded = None
+        try:
+            decoded = b64decode(ec2.get_password_data(instance_id)) or None
+        except EC2ResponseError, e:
+            if e.error_code not in THROTTLING_ERRORS:
+                raise
+        remaining = start + wait_timeout - time.time()
+        if decoded is not None or remaining <= 0:
+            return decoded, dict(attempts=attempts, elapsed=round(time.time() - start, 1))
+        time.sleep(min(delay * random.uniform(0.5, 1.5), remaining))
+        delay = min(delay * 2, 30)
+
+
 def main():
     argument_spec = ec2_argument_spec()
     argument_spec.update(dict(
@@ -123,23 +154,14 @@ def main():
     ec2 = ec2_connect(module)
 
     if wait:
-        start = datetime.datetime.now()
-        end = start + datetime.timedelta(seconds=wait_timeout)
-
-        while datetime.datetime.now() < end:
-            data = ec2.get_password_data(instance_id)
-            decoded = b64decode(data)
-            if wait and not decoded:
-                time.sleep(5)
-            else:
-                break
+        decoded, waited = wait_for_password(ec2, instance_id, wait_timeout)
+        if decoded is None:
+            module.fail_json(msg = "wait for password timeout after %d seconds" % wait_timeout,
+                             wait=waited)
     else:
         data = ec2.get_password_data(instance_id)
         decoded = b64decode(data)
 
-    if wait and datetime.datetime.now() >= end:
-        module.fail_json(msg = "wait for password timeout after %d seconds" % wait_timeout)
-
     f = open(key_file, 'r')
     key = RSA.importKey(f.read(), key_passphrase)
     cipher = PKCS1_v1_5.new(key)
@@ -154,8 +176,8 @@ def main():
         module.exit_json(win_password='', changed=False)
     else:
         if wait:
-            elapsed = datetime.datetime.now() - start
-            module.exit_json(win_password=decrypted, changed=True, elapsed=elapsed.seconds)
+            module.exit_json(win_password=decrypted, changed=True, elapsed=int(waited['elapsed']),
+                             wait=waited)
         else:
             module.exit_json(win_password=decrypted, changed=True)
 
@@ -38,11 +38,14 @@ options:
         required: true
     delay:
         description:
-            - Number of seconds to wait
+            - Longest number of seconds between two checks for registered
+              instances. The checks start one second apart and back off up to
+              this delay.
         required: false
     repeat:
         description:
-            - The number of times to wait for the cluster to have an instance
+            - The number of times to wait for the cluster to have an instance,
+              the wait lasts at most delay times repeat seconds.
         required: false
 extends_documentation_fragment:
     - ec2
@@ -101,7 +104,7 @@ status:
     type: string
 '''
 try:
-    import json, time
+    import json, time, random
     import boto
     HAS_BOTO = True
 except ImportError:
@@ -109,10 +112,13 @@ except ImportError:
 
 try:
     import boto3
+    from botocore.exceptions import ClientError
     HAS_BOTO3 = True
 except ImportError:
     HAS_BOTO3 = False
 
+THROTTLING_ERRORS = ('Throttling', 'ThrottlingException')
+
 class EcsClusterManager:
     """Handles ECS Clusters"""
 
@@ -156,6 +162,36 @@ class EcsClusterManager:
     def delete_cluster(self, clusterName):
         return self.ecs.delete_cluster(cluster=clusterName)
 
+    def wait_for_instances(self, cluster_name, timeout, max_delay):
+        """
+        Describe the cluster until it has registered container instances.
+
+        The checks start a second apart and back off exponentially, with
+        jitter, to max_delay; throttled calls just count as a check.
+        Returns the cluster, or None after timeout seconds, and the number
+        of attempts and elapsed time.
+        """
+        start = time.time()
+        delay = 1
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                cluster = self.describe_cluster(cluster_name)
+            except ClientError, e:
+                if e.response['Error']['Code'] not in THROTTLING_ERRORS:
+                    raise
+                cluster = None
+            if cluster and cluster['registeredContainerInstancesCount'] > 0:
+                break
+            remaining = start + timeout - time.time()
+            if remaining <= 0:
+                cluster = None
+                break
+            time.sleep(min(delay * random.uniform(0.5, 1.5), remaining))
+            delay = min(delay * 2, max(max_delay, 1))
+        return cluster, dict(attempts=attempts, elapsed=round(time.time() - start, 1))
+
 def main():
 
     argument_spec = ec2_argument_spec()
@@ -215,18 +251,11 @@ def main():
         # return info about the cluster deleted
         delay = module.params['delay']
         repeat = module.params['repeat']
-        time.sleep(delay)
-        count = 0
-        for i in range(repeat):
-            existing = cluster_mgr.describe_cluster(module.params['name'])
-            count = existing['registeredContainerInstancesCount']
-            if count > 0:
-                results['changed'] = True
-                break
-            time.sleep(delay)
-        if count == 0 and i is repeat-1:
-            module.fail_json(msg="Cluster instance count still zero after "+str(repeat)+" tries of "+str(delay)+" seconds each.")
+        existing, results['wait'] = cluster_mgr.wait_for_instances(module.params['name'], delay * repeat, delay)
+        if existing is None:
+            module.fail_json(msg="Cluster instance count still zero after "+str(delay * repeat)+" seconds.", wait=results['wait'])
             return
+        results['changed'] = True
 
     module.exit_json(**results)
 
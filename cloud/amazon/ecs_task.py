@@ -46,16 +46,45 @@ options:
         required: False
     task:
         description:
-            - The task to stop
+            - The task to stop. When omitted with operation=stop, every
+              running task matching family and/or started_by is stopped.
         required: False
+    family:
+        description:
+            - Family of the running tasks to stop when operation=stop and no
+              task is given
+        required: False
+        version_added: "2.1"
     container_instances:
         description:
             - The list of container instances on which to deploy the task
         required: False
     started_by:
         description:
-            - A value showing who or what started the task (for informational purposes)
+            - A value showing who or what started the task (for informational purposes).
+              With operation=stop and no task, only running tasks started by this
+              value are stopped.
+        required: False
+    wait:
+        description:
+            - Wait until the started tasks are RUNNING, or the stopped tasks are
+              STOPPED. The tasks are described 100 at a time.
+        required: False
+        default: False
+        version_added: "2.1"
+    wait_timeout:
+        description:
+            - How many seconds to wait for the tasks
+        required: False
+        default: 300
+        version_added: "2.1"
+    concurrency:
+        description:
+            - How many stop requests are sent in parallel when stopping every
+              matching task
         required: False
+        default: 10
+        version_added: "2.1"
 extends_documentation_fragment:
     - ec2
 '''
@@ -90,15 +119,38 @@ EXAMPLES = '''
       cluster: console-sample-app-static-cluster
       task_definition: console-sample-app-static-taskdef
       task: "arn:aws:ecs:us-west-2:172139249013:task/3f8353d1-29a8-4689-bbf6-ad79937ffe8a"
+
+- name: Stop every task of the old release and wait until they are stopped
+  ecs_task:
+      operation: stop
+      cluster: console-sample-app-static-cluster
+      family: console-sample-app-static-taskdef
+      started_by: release-41
+      wait: yes
 '''
 RETURN = '''
 task:
     description: details about the tast that was started
     type: complex
     sample: "TODO: include sample"
+tasks:
+    description: arn, status and origin of the tasks stopped by family or started_by
+    returned: when operation=stop and no task is given
+    type: list
+    sample: [{"taskArn": "arn:aws:ecs:us-west-2:172139249013:task/3f8353d1-29a8-4689-bbf6-ad79937ffe8a",
+              "lastStatus": "STOPPED", "desiredStatus": "STOPPED", "startedBy": "release-41"}]
+wait:
+    description: number of describe rounds and seconds spent waiting for the tasks
+    returned: when wait is true
+    type: dict
+    sample: {"attempts": 4, "elapsed": 21.3}
 '''
 try:
     import json
+    import random
+    import threading
+    import time
+    import Queue
     import boto
     import botocore
     HAS_BOTO = True
@@ -107,10 +159,14 @@ except ImportError:
 
 try:
     import boto3
+    from botocore.exceptions import ClientError
     HAS_BOTO3 = True
 except ImportError:
     HAS_BOTO3 = False
 
+THROTTLING_ERRORS = ('Throttling', 'ThrottlingException')
+DESCRIBE_BATCH = 100
+
 class EcsExecManager:
     """Handles ECS Tasks"""
 
@@ -125,18 +181,122 @@ class EcsExecManager:
         except boto.exception.NoAuthHandlerFound, e:
             self.module.fail_json(msg="Can't authorize connection - "+str(e))
 
+    def call(self, method, **kwargs):
+        """ Call an ecs client method, backing off while it is throttled """
+        delay = 1
+        for attempt in range(6):
+            try:
+                return getattr(self.ecs, method)(**kwargs)
+            except ClientError, e:
+                if e.response['Error']['Code'] not in THROTTLING_ERRORS or attempt == 5:
+                    raise
+            time.sleep(delay * random.uniform(0.5, 1.5))
+            delay = min(delay * 2, 20)
+
+    def list_task_arns(self, cluster_name, family=None, started_by=None, status=None):
+        args = dict()
+        if cluster_name:
+            args['cluster'] = cluster_name
+        if family:
+            args['family'] = family
+        if started_by:
+            args['startedBy'] = started_by
+        if status:
+            args['desiredStatus'] = status
+        arns = []
+        while True:
+            response = self.call('list_tasks', **args)
+            arns.extend(response['taskArns'])
+            if not response.get('nextToken'):
+                return arns
+            args['nextToken'] = response['nextToken']
+
     def list_tasks(self, cluster_name, service_name, status):
-        response = self.ecs.list_tasks(
-            cluster=cluster_name,
-            family=service_name,
-            desiredStatus=status
-        )
-        if len(response['taskArns'])>0:
-            for c in response['taskArns']:
-                if c.endswith(service_name):
-                    return c
+        for c in self.list_task_arns(cluster_name, family=service_name, status=status):
+            if c.endswith(service_name):
+                return c
         return None
 
+    def describe_tasks(self, cluster_name, arns):
+        """
+        Describe the tasks DESCRIBE_BATCH at a time. Returns the tasks by
+        arn and the arns ECS no longer knows about.
+        """
+        tasks = dict()
+        missing = []
+        for i in range(0, len(arns), DESCRIBE_BATCH):
+            args = dict(tasks=arns[i:i + DESCRIBE_BATCH])
+            if cluster_name:
+                args['cluster'] = cluster_name
+            response = self.call('describe_tasks', **args)
+            for task in response['tasks']:
+                tasks[task['taskArn']] = task
+            missing.extend(f['arn'] for f in response.get('failures', []))
+        return tasks, missing
+
+    def find_running_tasks(self, cluster_name, family, started_by):
+        # a family filter leaves startedBy to be checked on the descriptions
+        arns = self.list_task_arns(cluster_name, family=family,
+                                   started_by=not family and started_by or None, status='RUNNING')
+        tasks, missing = self.describe_tasks(cluster_name, arns)
+        return [tasks[arn] for arn in arns if arn in tasks
+                and (not started_by or tasks[arn].get('startedBy') == started_by)]
+
+    def stop_tasks(self, cluster, arns, concurrency):
+        """ Stop the tasks with at most concurrency requests in flight """
+        pending = Queue.Queue()
+        for arn in arns:
+            pending.put(arn)
+        errors = []
+        lock = threading.Lock()
+
+        def worker():
+            while True:
+                try:
+                    arn = pending.get_nowait()
+                except Queue.Empty:
+                    return
+                try:
+                    self.stop_task(cluster, arn)
+                except Exception, e:
+                    lock.acquire()
+                    errors.append(dict(taskArn=arn, msg=str(e)))
+                    lock.release()
+
+        threads = [threading.Thread(target=worker) for i in range(max(1, min(concurrency, len(arns))))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return errors
+
+    def wait_for_tasks(self, cluster_name, arns, status, timeout):
+        """
+        Describe the tasks not yet at status, in batches, until all of them
+        are or timeout seconds went by. A task that stops while waiting for
+        RUNNING will never get there and ends the wait. Returns the tasks
+        that did not reach status and the wait statistics.
+        """
+        start = time.time()
+        delay = 2
+        attempts = 0
+        pending = list(arns)
+        while True:
+            attempts += 1
+            tasks, missing = self.describe_tasks(cluster_name, pending)
+            pending = [arn for arn in pending if arn in tasks and tasks[arn]['lastStatus'] != status]
+            if status == 'STOPPED':
+                # stopped tasks eventually disappear from ECS
+                stuck = []
+            else:
+                stuck = missing + [arn for arn in pending if tasks[arn]['lastStatus'] == 'STOPPED']
+            remaining = start + timeout - time.time()
+            if stuck or not pending or remaining <= 0:
+                return stuck + [arn for arn in pending if arn not in stuck], \
+                    dict(attempts=attempts, elapsed=round(time.time() - start, 1))
+            time.sleep(min(delay * random.uniform(0.5, 1.5), remaining))
+            delay = min(delay * 2, 15)
+
     def run_task(self, cluster, task_definition, overrides, count, startedBy):
         if overrides is None:
             overrides = dict()
@@ -166,9 +326,40 @@ class EcsExecManager:
         return response['tasks']
 
     def stop_task(self, cluster, task):
-        response = self.ecs.stop_task(cluster=cluster, task=task)
+        response = self.call('stop_task', cluster=cluster, task=task)
         return response['task']
 
+
+def task_summary(task):
+    return dict((k, task.get(k)) for k in ('taskArn', 'taskDefinitionArn', 'lastStatus', 'desiredStatus', 'startedBy'))
+
+
+def wait_for_tasks(module, service_mgr, results, arns, status):
+    failed, results['wait'] = service_mgr.wait_for_tasks(
+        module.params['cluster'], arns, status, module.params['wait_timeout'])
+    if failed:
+        module.fail_json(msg="%d task(s) did not reach %s" % (len(failed), status), failed_tasks=failed, **results)
+
+
+def stop_matching_tasks(module, service_mgr):
+    if not module.params['family'] and not module.params['started_by']:
+        module.fail_json(msg="To stop a task, a task, a family or started_by must be specified")
+    tasks = service_mgr.find_running_tasks(module.params['cluster'], module.params['family'],
+                                           module.params['started_by'])
+    arns = [task['taskArn'] for task in tasks]
+    results = dict(changed=len(arns) > 0, tasks=[task_summary(task) for task in tasks])
+    if module.check_mode or not arns:
+        module.exit_json(**results)
+
+    errors = service_mgr.stop_tasks(module.params['cluster'], arns, module.params['concurrency'])
+    if errors:
+        module.fail_json(msg="Failed to stop %d task(s)" % len(errors), errors=errors, **results)
+    if module.params['wait']:
+        wait_for_tasks(module, service_mgr, results, arns, 'STOPPED')
+        tasks, missing = service_mgr.describe_tasks(module.params['cluster'], arns)
+        results['tasks'] = [task_summary(tasks[arn]) for arn in arns if arn in tasks]
+    module.exit_json(**results)
+
 def main():
     argument_spec = ec2_argument_spec()
     argument_spec.update(dict(
@@ -179,7 +370,11 @@ def main():
         count=dict(required=False, type='int' ), # R
         task=dict(required=False, type='str' ), # P*
         container_instances=dict(required=False, type='list'), # S*
-        started_by=dict(required=False, type='str' ) # R S
+        started_by=dict(required=False, type='str' ), # R S P
+        family=dict(required=False, type='str' ), # P
+        wait=dict(required=False, type='bool', default=False ), # R S P
+        wait_timeout=dict(required=False, type='int', default=300 ), # R S P
+        concurrency=dict(required=False, type='int', default=10 ) # P
     ))
 
     module = AnsibleModule(argument_spec=argument_spec, supports_check_mode=True)
@@ -207,8 +402,8 @@ def main():
         status_type = "RUNNING"
 
     if module.params['operation'] == 'stop':
-        if not 'task' in module.params and module.params['task'] is None:
-            module.fail_json(msg="To stop a task, a task must be specified")
+        if module.params['task'] is None:
+            stop_matching_tasks(module, EcsExecManager(module))
         if not 'task_definition' in module.params and module.params['task_definition'] is None:
             module.fail_json(msg="To stop a task, a task definition must be specified")
         task_to_list = module.params['task_definition']
@@ -230,6 +425,8 @@ def main():
                     module.params['overrides'],
                     module.params['count'],
                     module.params['started_by'])
+                if module.params['wait']:
+                    wait_for_tasks(module, service_mgr, results, [t['taskArn'] for t in results['task']], 'RUNNING')
             results['changed'] = True
 
     elif module.params['operation'] == 'start':
@@ -245,6 +442,8 @@ def main():
                     module.params['container_instances'],
                     module.params['started_by']
                 )
+                if module.params['wait']:
+                    wait_for_tasks(module, service_mgr, results, [t['taskArn'] for t in results['task']], 'RUNNING')
             results['changed'] = True
 
     elif module.params['operation'] == 'stop':
@@ -258,6 +457,8 @@ def main():
                     module.params['cluster'],
                     module.params['task']
                 )
+                if module.params['wait']:
+                    wait_for_tasks(module, service_mgr, results, [results['task']['taskArn']], 'STOPPED')
             results['changed'] = True
 
     module.exit_json(**results)
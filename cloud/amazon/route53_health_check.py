@@ -45,7 +45,8 @@ options:
     description:
       - The type of health check that you want to create, which indicates how
         Amazon Route 53 determines whether an endpoint is healthy.
-    required: true
+      - Required unless C(health_checks) is given.
+    required: false
     choices: [ 'HTTP', 'HTTPS', 'HTTP_STR_MATCH', 'HTTPS_STR_MATCH', 'TCP' ]
   resource_path:
     description:
@@ -88,6 +89,25 @@ options:
     required: true
     default: 3
     choices: [ 1, 2, 3, 4, 5, 6, 7, 8, 9, 10 ]
+  health_checks:
+    description:
+      - List of health checks to reconcile in one run, each a dict with the
+        keys C(state), C(ip_address), C(port), C(type), C(resource_path),
+        C(fqdn), C(string_match), C(request_interval) and
+        C(failure_threshold), with the same meaning as the options of the
+        same name. Either this or C(type) has to be provided.
+      - The existing health checks are read once, and the needed changes
+        are sent in parallel while staying under the Route53 request rate.
+    required: false
+    default: null
+    version_added: "2.1"
+  concurrency:
+    description:
+      - How many changes are sent to Route53 at the same time when
+        C(health_checks) is used.
+    required: false
+    default: 4
+    version_added: "2.1"
 author: "zimbatm (@zimbatm)"
 extends_documentation_fragment:
     - aws
@@ -123,10 +143,27 @@ EXAMPLES = '''
     state: absent
     fqdn: host1.example.com
 
+# Health checks of every web server at once
+- route53_health_check:
+    health_checks:
+      - fqdn: host1.example.com
+        type: HTTP
+        resource_path: /status
+      - fqdn: host2.example.com
+        type: HTTP
+        resource_path: /status
+      - fqdn: host3.example.com
+        type: HTTP
+        state: absent
+  register: web_health_checks
+
 '''
 
 import time
 import uuid
+import random
+import threading
+import Queue
 
 try:
     import boto
@@ -138,23 +175,48 @@ try:
 except ImportError:
     HAS_BOTO = False
 
+# Route53 accepts 5 requests per second per account
+MAX_REQUESTS_PER_SECOND = 5
+MAX_ATTEMPTS = 6
+
+HEALTH_CHECK_OPTIONS = ['state', 'ip_address', 'port', 'type', 'resource_path', 'fqdn',
+                        'string_match', 'request_interval', 'failure_threshold']
+
 # Things that can't get changed:
 #  protocol
 #  ip_address or domain
 #  request_interval
 #  string_match if not previously enabled
-def find_health_check(conn, wanted):
+def health_check_key(ip_addr, fqdn, hc_type, request_interval):
+    """The immutable values identifying a health check"""
+    return (ip_addr, fqdn, hc_type, str(request_interval))
+
+def index_health_checks(conn):
+    """Reads every page of health checks into a dict keyed by health_check_key"""
+    index = {}
+    marker = None
+    while True:
+        result = conn.get_list_health_checks(marker=marker)
+        for check in result.HealthChecks:
+            config = check.HealthCheckConfig
+            key = health_check_key(config.get('IPAddress'), config.get('FullyQualifiedDomainName'),
+                                   config.get('Type'), config.get('RequestInterval'))
+            index.setdefault(key, check)
+        if getattr(result, 'IsTruncated', 'false') != 'true':
+            return index
+        marker = result.NextMarker
+
+def find_health_check(index, wanted):
     """Searches for health checks that have the exact same set of immutable values"""
-    for check in conn.get_list_health_checks().HealthChecks:
-        config = check.HealthCheckConfig
-        if config.get('IPAddress') == wanted.ip_addr and config.get('FullyQualifiedDomainName') == wanted.fqdn and config.get('Type') == wanted.hc_type and config.get('RequestInterval') == str(wanted.request_interval):
-            return check
-    return None
+    return index.get(health_check_key(wanted.ip_addr, wanted.fqdn, wanted.hc_type, wanted.request_interval))
 
 def to_health_check(config):
+    port = config.get('Port')
+    if port is not None:
+        port = int(port)
     return HealthCheck(
         config.get('IPAddress'),
-        config.get('Port'),
+        port,
         config.get('Type'),
         config.get('ResourcePath'),
         fqdn=config.get('FullyQualifiedDomainName'),
@@ -264,37 +326,56 @@ def update_health_check(conn, health_check_id, health_check_version, health_chec
     h.parse(body)
     return e
 
-def main():
-    argument_spec = ec2_argument_spec()
-    argument_spec.update(dict(
-            state               = dict(choices=['present', 'absent'], default='present'),
-            ip_address          = dict(),
-            port                = dict(type='int'),
-            type                = dict(required=True, choices=['HTTP', 'HTTPS', 'HTTP_STR_MATCH', 'HTTPS_STR_MATCH', 'TCP']),
-            resource_path       = dict(),
-            fqdn                = dict(),
-            string_match        = dict(),
-            request_interval    = dict(type='int', choices=[10, 30], default=30),
-            failure_threshold   = dict(type='int', choices=[1, 2, 3, 4, 5, 6, 7, 8, 9, 10], default=3),
-        )
-    )
-    module = AnsibleModule(argument_spec=argument_spec)
+class RateLimiter(object):
+    """Spaces the requests of all the threads to stay under a rate"""
 
-    if not HAS_BOTO:
-        module.fail_json(msg='boto 2.27.0+ required for this module')
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self.lock = threading.Lock()
+        self.next_slot = 0
+
+    def wait(self):
+        self.lock.acquire()
+        try:
+            now = time.time()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        finally:
+            self.lock.release()
+        if slot > now:
+            time.sleep(slot - now)
 
-    state_in              = module.params.get('state')
-    ip_addr_in            = module.params.get('ip_address')
-    port_in               = module.params.get('port')
-    type_in               = module.params.get('type')
-    resource_path_in      = module.params.get('resource_path')
-    fqdn_in               = module.params.get('fqdn')
-    string_match_in       = module.params.get('string_match')
-    request_interval_in   = module.params.get('request_interval')
-    failure_threshold_in  = module.params.get('failure_threshold')
+def call_rate_limited(limiter, func, *args, **kwargs):
+    """Calls Route53 within the rate limit, retrying throttled requests with backoff"""
+    delay = 0.5
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        limiter.wait()
+        try:
+            return func(*args, **kwargs)
+        except boto.exception.BotoServerError, e:
+            throttled = e.status == 400 and 'Throttling' in (e.body or '') or \
+                'PriorRequestNotComplete' in (e.body or '')
+            if not throttled or attempt == MAX_ATTEMPTS:
+                raise
+        time.sleep(delay * random.uniform(0.5, 1.5))
+        delay = min(delay * 2, 20)
+
+def health_check_from_params(params):
+    """Validates the options of one health check, returns the wanted HealthCheck or an error"""
+    ip_addr_in            = params.get('ip_address')
+    port_in               = params.get('port')
+    type_in               = params.get('type')
+    resource_path_in      = params.get('resource_path')
+    fqdn_in               = params.get('fqdn')
+    string_match_in       = params.get('string_match')
+    request_interval_in   = int(params.get('request_interval') or 30)
+    failure_threshold_in  = int(params.get('failure_threshold') or 3)
+
+    if type_in not in ['HTTP', 'HTTPS', 'HTTP_STR_MATCH', 'HTTPS_STR_MATCH', 'TCP']:
+        return None, "parameter 'type' must be one of HTTP, HTTPS, HTTP_STR_MATCH, HTTPS_STR_MATCH or TCP"
 
     if ip_addr_in is None and fqdn_in is None:
-        module.fail_json(msg="parameter 'ip_address' or 'fqdn' is required")
+        return None, "parameter 'ip_address' or 'fqdn' is required"
 
     # Default port
     if port_in is None:
@@ -303,16 +384,130 @@ def main():
       elif type_in in ['HTTPS', 'HTTPS_STR_MATCH']:
         port_in = 443
       else:
-        module.fail_json(msg="parameter 'port' is required for 'type' TCP")
+        return None, "parameter 'port' is required for 'type' TCP"
 
     # string_match in relation with type
     if type_in in ['HTTP_STR_MATCH', 'HTTPS_STR_MATCH']:
         if string_match_in is None:
-            module.fail_json(msg="parameter 'string_match' is required for the HTTP(S)_STR_MATCH types")
+            return None, "parameter 'string_match' is required for the HTTP(S)_STR_MATCH types"
         elif len(string_match_in) > 255:
-            module.fail_json(msg="parameter 'string_match' is limited to 255 characters max")
+            return None, "parameter 'string_match' is limited to 255 characters max"
     elif string_match_in:
-        module.fail_json(msg="parameter 'string_match' argument is only for the HTTP(S)_STR_MATCH types")
+        return None, "parameter 'string_match' argument is only for the HTTP(S)_STR_MATCH types"
+
+    return HealthCheck(ip_addr_in, int(port_in), type_in, resource_path_in, fqdn_in, string_match_in,
+                       request_interval_in, failure_threshold_in), None
+
+def plan_health_check(index, state_in, wanted_config):
+    """Returns the action needed to reach the wanted state, and the existing check"""
+    existing_check = find_health_check(index, wanted_config)
+    if state_in == 'present':
+        if existing_check is None:
+            return "create", None
+        existing_config = to_health_check(existing_check.HealthCheckConfig)
+        if health_check_diff(existing_config, wanted_config):
+            return "update", existing_check
+        return None, existing_check
+    elif existing_check is not None:
+        return "delete", existing_check
+    return None, None
+
+def apply_health_check(conn, limiter, action, existing_check, wanted_config):
+    """Runs one planned action, returns the id of the health check"""
+    if action == "create":
+        return call_rate_limited(limiter, create_health_check, conn, wanted_config).HealthCheck.Id
+    elif action == "update":
+        call_rate_limited(limiter, update_health_check, conn, existing_check.Id,
+                          int(existing_check.HealthCheckVersion), wanted_config)
+    elif action == "delete":
+        call_rate_limited(limiter, conn.delete_health_check, existing_check.Id)
+    return existing_check and existing_check.Id or None
+
+def ensure_health_checks(module, connect, conn):
+    """Reconciles the health_checks list, with concurrency requests in flight"""
+    plans = []
+    keys = set()
+    for entry in module.params.get('health_checks'):
+        if not isinstance(entry, dict):
+            module.fail_json(msg="every entry of health_checks must be a dict, got %s" % entry)
+        state_in = entry.get('state', 'present')
+        if state_in not in ['present', 'absent']:
+            module.fail_json(msg="state of health check %s must be present or absent" % entry)
+        wanted_config, error = health_check_from_params(entry)
+        if error:
+            module.fail_json(msg="%s: %s" % (entry, error))
+        key = health_check_key(wanted_config.ip_addr, wanted_config.fqdn, wanted_config.hc_type,
+                               wanted_config.request_interval)
+        if key in keys:
+            module.fail_json(msg="health check %s is listed more than once" % entry)
+        keys.add(key)
+        plans.append((entry, state_in, wanted_config))
+
+    index = index_health_checks(conn)
+    results = []
+    pending = Queue.Queue()
+    for entry, state_in, wanted_config in plans:
+        action, existing_check = plan_health_check(index, state_in, wanted_config)
+        result = dict(ip_address=wanted_config.ip_addr, fqdn=wanted_config.fqdn, type=wanted_config.hc_type,
+                      id=existing_check and existing_check.Id or None, action=action, changed=action is not None)
+        results.append(result)
+        if action:
+            pending.put((result, action, existing_check, wanted_config))
+
+    limiter = RateLimiter(MAX_REQUESTS_PER_SECOND)
+    errors = []
+    lock = threading.Lock()
+
+    def worker(worker_conn):
+        while True:
+            try:
+                result, action, existing_check, wanted_config = pending.get_nowait()
+            except Queue.Empty:
+                return
+            try:
+                result['id'] = apply_health_check(worker_conn, limiter, action, existing_check, wanted_config)
+            except Exception, e:
+                if isinstance(e, boto.exception.BotoServerError):
+                    message = e.error_message or e.body
+                else:
+                    message = str(e)
+                result.update(failed=True, changed=False, msg=message)
+                lock.acquire()
+                errors.append("%s %s: %s" % (action, result['fqdn'] or result['ip_address'], message))
+                lock.release()
+
+    # boto connections can not be shared between threads
+    threads = [threading.Thread(target=worker, args=(connect(),))
+               for i in range(min(max(1, module.params.get('concurrency')), pending.qsize()))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        module.fail_json(msg="Unable to apply the health checks: %s" % '; '.join(errors), health_checks=results)
+    module.exit_json(changed=any(r['changed'] for r in results), health_checks=results)
+
+def main():
+    argument_spec = ec2_argument_spec()
+    argument_spec.update(dict(
+            state               = dict(choices=['present', 'absent'], default='present'),
+            ip_address          = dict(),
+            port                = dict(type='int'),
+            type                = dict(choices=['HTTP', 'HTTPS', 'HTTP_STR_MATCH', 'HTTPS_STR_MATCH', 'TCP']),
+            resource_path       = dict(),
+            fqdn                = dict(),
+            string_match        = dict(),
+            request_interval    = dict(type='int', choices=[10, 30], default=30),
+            failure_threshold   = dict(type='int', choices=[1, 2, 3, 4, 5, 6, 7, 8, 9, 10], default=3),
+            health_checks       = dict(type='list'),
+            concurrency         = dict(type='int', default=4),
+        )
+    )
+    module = AnsibleModule(argument_spec=argument_spec, required_one_of=[['type', 'health_checks']])
+
+    if not HAS_BOTO:
+        module.fail_json(msg='boto 2.27.0+ required for this module')
 
     region, ec2_url, aws_connect_kwargs = get_aws_connection_info(module)
     # connect to the route53 endpoint
@@ -321,35 +516,19 @@ def main():
     except boto.exception.BotoServerError, e:
         module.fail_json(msg = e.error_message)
 
-    changed = False
-    action = None
-    check_id = None
-    wanted_config = HealthCheck(ip_addr_in, port_in, type_in, resource_path_in, fqdn_in, string_match_in, request_interval_in, failure_threshold_in)
-    existing_check = find_health_check(conn, wanted_config)
-    if existing_check:
-        check_id = existing_check.Id
-        existing_config = to_health_check(existing_check.HealthCheckConfig)
+    if module.params.get('health_checks') is not None:
+        ensure_health_checks(module, lambda: Route53Connection(**aws_connect_kwargs), conn)
 
-    if state_in == 'present':
-        if existing_check is None:
-            action = "create"
-            check_id = create_health_check(conn, wanted_config).HealthCheck.Id
-            changed = True
-        else:
-            diff = health_check_diff(existing_config, wanted_config)
-            if not diff:
-                action = "update"
-                update_health_check(conn, existing_check.Id, int(existing_check.HealthCheckVersion), wanted_config)
-                changed = True
-    elif state_in == 'absent':
-        if check_id:
-            action = "delete"
-            conn.delete_health_check(check_id)
-            changed = True
-    else:
-        module.fail_json(msg = "Logic Error: Unknown state")
+    state_in = module.params.get('state')
+    wanted_config, error = health_check_from_params(module.params)
+    if error:
+        module.fail_json(msg=error)
+
+    action, existing_check = plan_health_check(index_health_checks(conn), state_in, wanted_config)
+    limiter = RateLimiter(MAX_REQUESTS_PER_SECOND)
+    check_id = apply_health_check(conn, limiter, action, existing_check, wanted_config)
 
-    module.exit_json(changed=changed, health_check=dict(id=check_id), action=action)
+    module.exit_json(changed=action is not None, health_check=dict(id=check_id), action=action)
 
 # import module snippets
 from ansible.module_utils.basic import *
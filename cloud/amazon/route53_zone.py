@@ -57,13 +57,91 @@ import time
 try:
     import boto
     import boto.ec2
+    import boto.jsonresponse
     from boto import route53
     from boto.route53 import Route53Connection
     from boto.route53.zone import Zone
+    from boto.route53 import exception
     HAS_BOTO = True
 except ImportError:
     HAS_BOTO = False
 
+# zones asked for per ListHostedZonesByName page
+ZONES_PAGE_SIZE = 100
+
+
+def list_zones_by_name(conn, name):
+    """
+    Return the hosted zones called name.
+
+    ListHostedZonesByName returns the zones sorted by name starting at
+    name, so only the pages holding zones of that name are read instead
+    of every zone of the account.
+    """
+    zones = []
+    params = {'dnsname': name, 'maxitems': str(ZONES_PAGE_SIZE)}
+    while True:
+        uri = '/%s/hostedzonesbyname' % conn.Version
+        response = conn.make_request('GET', uri, params=params)
+        body = response.read()
+        boto.log.debug(body)
+        if response.status >= 300:
+            raise exception.DNSServerError(response.status, response.reason, body)
+        e = boto.jsonresponse.Element(list_marker='HostedZones',
+                                      item_marker=('HostedZone',))
+        h = boto.jsonresponse.XmlHandler(e, None)
+        h.parse(body)
+        page = e['ListHostedZonesByNameResponse']
+        for r53zone in page['HostedZones']:
+            if r53zone['Name'] != name:
+                return zones
+            zones.append(r53zone)
+        if page.get('IsTruncated') != 'true':
+            return zones
+        params = {'dnsname': page['NextDNSName'],
+                  'hostedzoneid': page['NextHostedZoneId'],
+                  'maxitems': str(ZONES_PAGE_SIZE)}
+
+
+def is_private(r53zone):
+    return str(r53zone.get('Config', {}).get('PrivateZone', 'false')).lower() == 'true'
+
+
+def zone_vpcs(zone_details):
+    """ Return the (VPC id, region) pairs a private zone is associated with """
+    if 'VPCs' not in zone_details:
+        return []
+    # this is to deal with this boto bug: https://github.com/boto/boto/pull/2882
+    if isinstance(zone_details['VPCs'], dict):
+        vpcs = [zone_details['VPCs']['VPC']]
+    else: # Forward compatibility for when boto fixes that bug
+        vpcs = zone_details['VPCs']
+    return [(v['VPCId'], v.get('VPCRegion')) for v in vpcs]
+
+
+def find_zone(conn, name, vpc_id):
+    """
+    Pick the zone called name to manage, and its details when it is private.
+
+    Only the private zones of that name are described to learn their VPCs,
+    and only when a vpc_id is given.
+    """
+    candidates = list_zones_by_name(conn, name)
+    if vpc_id:
+        for r53zone in candidates:
+            if not is_private(r53zone):
+                continue
+            zone_id = r53zone['Id'].replace('/hostedzone/', '')
+            zone_details = conn.get_hosted_zone(zone_id)['GetHostedZoneResponse']
+            if vpc_id in [v[0] for v in zone_vpcs(zone_details)]:
+                return zone_id, zone_details
+    public = [z for z in candidates if not is_private(z)]
+    if public:
+        return public[0]['Id'].replace('/hostedzone/', ''), None
+    if candidates and not vpc_id:
+        return candidates[0]['Id'].replace('/hostedzone/', ''), None
+    return None, None
+
 
 def main():
     argument_spec = ec2_argument_spec()
@@ -97,22 +175,10 @@ def main():
     except boto.exception.BotoServerError, e:
         module.fail_json(msg=e.error_message)
 
-    results = conn.get_all_hosted_zones()
-    zones = {}
-
-    for r53zone in results['ListHostedZonesResponse']['HostedZones']:
-        zone_id = r53zone['Id'].replace('/hostedzone/', '')
-        zone_details = conn.get_hosted_zone(zone_id)['GetHostedZoneResponse']
-        if vpc_id and 'VPCs' in zone_details:
-            # this is to deal with this boto bug: https://github.com/boto/boto/pull/2882
-            if isinstance(zone_details['VPCs'], dict):
-                if zone_details['VPCs']['VPC']['VPCId'] == vpc_id:
-                    zones[r53zone['Name']] = zone_id
-            else: # Forward compatibility for when boto fixes that bug
-                if vpc_id in [v['VPCId'] for v in zone_details['VPCs']]:
-                    zones[r53zone['Name']] = zone_id
-        else:
-            zones[r53zone['Name']] = zone_id
+    try:
+        zone_id, zone_details = find_zone(conn, zone_in, vpc_id)
+    except boto.exception.BotoServerError, e:
+        module.fail_json(msg=e.error_message)
 
     record = {
         'private_zone': private_zone,
@@ -121,29 +187,25 @@ def main():
         'comment': comment,
     }
 
-    if state == 'present' and zone_in in zones:
+    if state == 'present' and zone_id is not None:
         if private_zone:
-            details = conn.get_hosted_zone(zones[zone_in])
-
-            if 'VPCs' not in details['GetHostedZoneResponse']:
+            if zone_details is None:
                 module.fail_json(
                     msg="Can't change VPC from public to private"
                 )
 
-            vpc_details = details['GetHostedZoneResponse']['VPCs']['VPC']
-            current_vpc_id = vpc_details['VPCId']
-            current_vpc_region = vpc_details['VPCRegion']
+            current_vpcs = dict(zone_vpcs(zone_details))
 
-            if current_vpc_id != vpc_id:
+            if vpc_id not in current_vpcs:
                 module.fail_json(
                     msg="Can't change VPC ID once a zone has been created"
                 )
-            if current_vpc_region != vpc_region:
+            if current_vpcs[vpc_id] != vpc_region:
                 module.fail_json(
                     msg="Can't change VPC Region once a zone has been created"
                 )
 
-        record['zone_id'] = zones[zone_in]
+        record['zone_id'] = zone_id
         record['name'] = zone_in
         module.exit_json(changed=False, set=record)
 
@@ -155,8 +217,8 @@ def main():
         record['name'] = zone_in
         module.exit_json(changed=True, set=record)
 
-    elif state == 'absent' and zone_in in zones:
-        conn.delete_hosted_zone(zones[zone_in])
+    elif state == 'absent' and zone_id is not None:
+        conn.delete_hosted_zone(zone_id)
         module.exit_json(changed=True)
 
     elif state == 'absent':
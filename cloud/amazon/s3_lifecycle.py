@@ -29,8 +29,21 @@ requirements:
 options:
   name:
     description:
-      - "Name of the s3 bucket"
-    required: true
+      - "Name of the s3 bucket. Required unless buckets is given."
+    required: false
+  buckets:
+    description:
+      - "List of buckets whose complete lifecycle configuration is managed in one run, each a hash with C(name) and C(rules). C(rules) is the full list of rules the bucket must have, rules not listed are removed and an empty list removes the lifecycle configuration. Each rule is a hash with the optional keys C(rule_id), C(prefix), C(status), C(storage_class), C(expiration_days), C(expiration_date), C(transition_days) and C(transition_date), which mean the same as the options of this module. Rules without C(rule_id) match existing rules regardless of their id."
+      - "The configurations are fetched concurrently and compared rule by rule, and only the buckets whose rules differ are written."
+    required: false
+    default: null
+    version_added: "2.1"
+  concurrency:
+    description:
+      - "Number of buckets handled in parallel when buckets is given."
+    required: false
+    default: 8
+    version_added: "2.1"
   expiration_date:
     description:
       - "Indicates the lifetime of the objects that are subject to the rule by the date they will expire. The value must be ISO-8601 format, the time must be midnight and a GMT timezone must be specified."
@@ -126,12 +139,31 @@ EXAMPLES = '''
     name: mybucket
     prefix: /logs/
     state: absent
-    
+
+# Set the complete lifecycle of many buckets, removing it from the last one
+- s3_lifecycle:
+    buckets:
+      - name: app-logs
+        rules:
+          - prefix: /logs/
+            transition_days: 7
+            expiration_days: 90
+      - name: app-tmp
+        rules:
+          - rule_id: expire-tmp
+            expiration_days: 1
+      - name: app-archive
+        rules: []
+    concurrency: 16
 '''
 
 import xml.etree.ElementTree as ET
 import copy
 import datetime
+import random
+import threading
+import time
+import Queue
 
 try:
     import dateutil.parser
@@ -148,6 +180,8 @@ try:
 except ImportError:
     HAS_BOTO = False
 
+SLOWDOWN_ERRORS = ('SlowDown', 'Throttling', 'RequestLimitExceeded')
+
 def create_lifecycle_rule(connection, module):
 
     name = module.params.get("name")
@@ -337,12 +371,187 @@ def destroy_lifecycle_rule(connection, module):
     module.exit_json(changed=changed)
     
 
+def s3_connect(module):
+
+    region, ec2_url, aws_connect_params = get_aws_connection_info(module)
+
+    if region in ('us-east-1', '', None):
+        # S3ism for the US Standard region
+        location = Location.DEFAULT
+    else:
+        # Boto uses symbolic names for locations but region strings will
+        # actually work fine for everything except us-east-1 (US Standard)
+        location = region
+    try:
+        connection = boto.s3.connect_to_region(location, is_secure=True, calling_format=OrdinaryCallingFormat(), **aws_connect_params)
+        # use this as fallback because connect_to_region seems to fail in boto + non 'classic' aws accounts in some cases
+        if connection is None:
+            connection = boto.connect_s3(**aws_connect_params)
+    except (boto.exception.NoAuthHandlerFound, StandardError), e:
+        module.fail_json(msg=str(e))
+    return connection
+
+
+def check_date(module, value, option):
+
+    try:
+        datetime.datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.000Z")
+    except ValueError, e:
+        module.fail_json(msg="%s is not a valid ISO-8601 format. The time must be midnight and a timezone of GMT must be included" % option)
+
+
+def rule_from_spec(module, spec):
+
+    if not isinstance(spec, dict):
+        module.fail_json(msg="every lifecycle rule must be a hash, got %s" % spec)
+    for a, b in (('expiration_days', 'expiration_date'), ('expiration_days', 'transition_date'),
+                 ('transition_days', 'transition_date'), ('transition_days', 'expiration_date')):
+        if spec.get(a) is not None and spec.get(b) is not None:
+            module.fail_json(msg="%s and %s are mutually exclusive in rule %s" % (a, b, spec))
+    status = spec.get('status', 'enabled')
+    storage_class = spec.get('storage_class', 'glacier')
+    if status not in ('enabled', 'disabled') or storage_class != 'glacier':
+        module.fail_json(msg="invalid status or storage_class in rule %s" % spec)
+
+    expiration_obj = None
+    transition_obj = None
+    if spec.get('expiration_days') is not None:
+        expiration_obj = Expiration(days=int(spec['expiration_days']))
+    elif spec.get('expiration_date') is not None:
+        check_date(module, spec['expiration_date'], 'expiration_date')
+        expiration_obj = Expiration(date=spec['expiration_date'])
+    if spec.get('transition_days') is not None:
+        transition_obj = Transition(days=int(spec['transition_days']), storage_class=storage_class.upper())
+    elif spec.get('transition_date') is not None:
+        check_date(module, spec['transition_date'], 'transition_date')
+        transition_obj = Transition(date=spec['transition_date'], storage_class=storage_class.upper())
+
+    return Rule(spec.get('rule_id', spec.get('id')), spec.get('prefix') or '', status.title(),
+                expiration_obj, transition_obj)
+
+
+def rule_signature(rule, keep_id):
+    """
+    Canonical, hashable form of a rule. Days read back from S3 are
+    strings, and the id only counts when the desired rules name it.
+    """
+    expiration = rule.expiration or Expiration()
+    transition = rule.transition or Transition()
+    if transition.days is None and transition.date is None:
+        storage_class = None
+    else:
+        storage_class = (transition.storage_class or '').upper()
+    return (keep_id and rule.id or None, rule.prefix or '', rule.status,
+            expiration.days is not None and int(expiration.days) or None, expiration.date,
+            transition.days is not None and int(transition.days) or None, transition.date,
+            storage_class)
+
+
+def call_with_retry(func, *args, **kwargs):
+
+    delay = 1
+    for attempt in range(5):
+        try:
+            return func(*args, **kwargs)
+        except S3ResponseError, e:
+            if e.error_code not in SLOWDOWN_ERRORS or attempt == 4:
+                raise
+        time.sleep(delay * random.uniform(0.5, 1.5))
+        delay *= 2
+
+
+def reconcile_lifecycle(connection, spec):
+
+    name, rules = spec
+    # validate=False saves a request per bucket, a missing bucket
+    # still fails on the lifecycle read
+    bucket = connection.get_bucket(name, validate=False)
+    try:
+        current = call_with_retry(bucket.get_lifecycle_config)
+    except S3ResponseError, e:
+        if e.error_code != "NoSuchLifecycleConfiguration":
+            raise
+        current = Lifecycle()
+
+    ids = set(rule.id for rule in rules if rule.id)
+    wanted = sorted(rule_signature(rule, rule.id in ids) for rule in rules)
+    existing = sorted(rule_signature(rule, rule.id in ids) for rule in current)
+    result = dict(name=name, rules=len(rules), changed=wanted != existing)
+
+    if result['changed']:
+        if rules:
+            lifecycle_obj = Lifecycle()
+            lifecycle_obj.extend(rules)
+            call_with_retry(bucket.configure_lifecycle, lifecycle_obj)
+        else:
+            call_with_retry(bucket.delete_lifecycle_configuration)
+    return result
+
+
+def run_workers(module, func, items):
+    """
+    Call func(connection, item) for every item with at most concurrency
+    threads, each using its own connection since boto ones are not thread
+    safe. Returns the results in the order of items, an item whose call
+    raised gets a dict with failed and msg set instead.
+    """
+
+    if not items:
+        return []
+    pending = Queue.Queue()
+    for index, item in enumerate(items):
+        pending.put((index, item))
+    results = [None] * len(items)
+
+    def worker(connection):
+        while True:
+            try:
+                index, item = pending.get_nowait()
+            except Queue.Empty:
+                return
+            try:
+                results[index] = func(connection, item)
+            except Exception, e:
+                results[index] = dict(failed=True, msg=str(e))
+
+    count = max(1, min(module.params.get('concurrency'), len(items)))
+    threads = [threading.Thread(target=worker, args=(s3_connect(module),)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def reconcile_buckets(module, buckets):
+
+    specs = []
+    for entry in buckets:
+        if not isinstance(entry, dict) or not entry.get('name'):
+            module.fail_json(msg="every entry of buckets must be a hash with a name, got %s" % entry)
+        specs.append((entry['name'], [rule_from_spec(module, rule) for rule in entry.get('rules') or []]))
+
+    results = run_workers(module, reconcile_lifecycle, specs)
+    for (name, rules), result in zip(specs, results):
+        result['name'] = name
+        result.setdefault('changed', False)
+
+    changed = len([r for r in results if r['changed']]) > 0
+    failed = [r['name'] for r in results if r.get('failed')]
+    if failed:
+        module.fail_json(msg="Failed to reconcile the lifecycle of %s" % ', '.join(failed),
+                         changed=changed, buckets=results)
+    module.exit_json(changed=changed, buckets=results)
+
+
 def main():
 
     argument_spec = ec2_argument_spec()
     argument_spec.update(
         dict(
-            name = dict(required=True),
+            name = dict(required=False),
+            buckets = dict(default=None, required=False, type='list'),
+            concurrency = dict(default=8, type='int'),
             expiration_days = dict(default=None, required=False, type='int'),
             expiration_date = dict(default=None, required=False, type='str'),
             prefix = dict(default=None, required=False),
@@ -361,8 +570,10 @@ def main():
                                                  [ 'expiration_days', 'expiration_date' ],
                                                  [ 'expiration_days', 'transition_date' ],
                                                  [ 'transition_days', 'transition_date' ],
-                                                 [ 'transition_days', 'expiration_date' ]                 
-                                                 ]
+                                                 [ 'transition_days', 'expiration_date' ],
+                                                 [ 'name', 'buckets' ]
+                                                 ],
+                           required_one_of = [ [ 'name', 'buckets' ] ]
                            )
 
     if not HAS_BOTO:
@@ -371,22 +582,10 @@ def main():
     if not HAS_DATEUTIL:
         module.fail_json(msg='dateutil required for this module')    
 
-    region, ec2_url, aws_connect_params = get_aws_connection_info(module)
-    
-    if region in ('us-east-1', '', None):
-        # S3ism for the US Standard region
-        location = Location.DEFAULT
-    else:
-        # Boto uses symbolic names for locations but region strings will
-        # actually work fine for everything except us-east-1 (US Standard)
-        location = region
-    try:
-        connection = boto.s3.connect_to_region(location, is_secure=True, calling_format=OrdinaryCallingFormat(), **aws_connect_params)
-        # use this as fallback because connect_to_region seems to fail in boto + non 'classic' aws accounts in some cases
-        if connection is None:
-            connection = boto.connect_s3(**aws_connect_params)
-    except (boto.exception.NoAuthHandlerFound, StandardError), e:
-        module.fail_json(msg=str(e))
+    if module.params.get("buckets") is not None:
+        reconcile_buckets(module, module.params.get("buckets"))
+
+    connection = s3_connect(module)
 
     expiration_date = module.params.get("expiration_date")
     transition_date = module.params.get("transition_date")
@@ -394,17 +593,12 @@ def main():
 
     # If expiration_date set, check string is valid
     if expiration_date is not None:
-        try:
-            datetime.datetime.strptime(expiration_date, "%Y-%m-%dT%H:%M:%S.000Z")
-        except ValueError, e:
-            module.fail_json(msg="expiration_date is not a valid ISO-8601 format. The time must be midnight and a timezone of GMT must be included")
-    
+        check_date(module, expiration_date, 'expiration_date')
+
     if transition_date is not None:
-        try:
-            datetime.datetime.strptime(transition_date, "%Y-%m-%dT%H:%M:%S.000Z")
-        except ValueError, e:
-            module.fail_json(msg="expiration_date is not a valid ISO-8601 format. The time must be midnight and a timezone of GMT must be included")
-        
+        check_date(module, transition_date, 'transition_date')
+
+
     if state == 'present':
         create_lifecycle_rule(connection, module)
     elif state == 'absent':
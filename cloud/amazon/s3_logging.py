@@ -24,8 +24,21 @@ author: Rob White (@wimnat)
 options:
   name:
     description:
-      - "Name of the s3 bucket."
-    required: true
+      - "Name of the s3 bucket. Required unless buckets is given."
+    required: false
+  buckets:
+    description:
+      - "List of buckets whose logging is managed in one run, each a hash with C(name) and the optional keys C(state), C(target_bucket) and C(target_prefix), which mean the same as the options of this module."
+      - "The logging status of the buckets is read concurrently, each target bucket is prepared once, and only buckets whose logging differs are updated."
+    required: false
+    default: null
+    version_added: "2.1"
+  concurrency:
+    description:
+      - "Number of buckets handled in parallel when buckets is given."
+    required: false
+    default: 8
+    version_added: "2.1"
   state:
     description:
       - "Enable or disable logging."
@@ -61,9 +74,25 @@ EXAMPLES = '''
   s3_logging:
     name: mywebsite.com
     state: absent
-    
+
+- name: Log many buckets to one target bucket
+  s3_logging:
+    buckets:
+      - name: mywebsite.com
+        target_bucket: mylogs
+        target_prefix: logs/mywebsite.com
+      - name: myapi.com
+        target_bucket: mylogs
+        target_prefix: logs/myapi.com
+      - name: mystatic.com
+        state: absent
 '''
 
+import random
+import threading
+import time
+import Queue
+
 try:
     import boto.ec2
     from boto.s3.connection import OrdinaryCallingFormat, Location
@@ -72,6 +101,8 @@ try:
 except ImportError:
     HAS_BOTO = False
 
+SLOWDOWN_ERRORS = ('SlowDown', 'Throttling', 'RequestLimitExceeded')
+
 
 def compare_bucket_logging(bucket, target_bucket, target_prefix):
     
@@ -131,23 +162,8 @@ def disable_bucket_logging(connection, module):
     module.exit_json(changed=changed)
     
     
-def main():
-    
-    argument_spec = ec2_argument_spec()
-    argument_spec.update(
-        dict(
-            name = dict(required=True),
-            target_bucket = dict(required=False, default=None),
-            target_prefix = dict(required=False, default=""),
-            state = dict(required=False, default='present', choices=['present', 'absent'])
-        )
-    )
-    
-    module = AnsibleModule(argument_spec=argument_spec)
+def s3_connect(module):
 
-    if not HAS_BOTO:
-        module.fail_json(msg='boto required for this module')
-    
     region, ec2_url, aws_connect_params = get_aws_connection_info(module)
 
     if region in ('us-east-1', '', None):
@@ -164,7 +180,164 @@ def main():
             connection = boto.connect_s3(**aws_connect_params)
     except (boto.exception.NoAuthHandlerFound, StandardError), e:
         module.fail_json(msg=str(e))
+    return connection
+
+
+def call_with_retry(func, *args, **kwargs):
+    """ Retry S3 calls that were slowed down, backing off with jitter """
+
+    delay = 1
+    for attempt in range(5):
+        try:
+            return func(*args, **kwargs)
+        except S3ResponseError as e:
+            if e.error_code not in SLOWDOWN_ERRORS or attempt == 4:
+                raise
+        time.sleep(delay * random.uniform(0.5, 1.5))
+        delay *= 2
+
+
+def run_workers(module, func, items):
+    """
+    Call func(connection, item) for every item with at most concurrency
+    threads, each using its own connection since boto ones are not thread
+    safe. Returns the results in the order of items, an item whose call
+    raised gets a dict with failed and msg set instead.
+    """
+
+    if not items:
+        return []
+    pending = Queue.Queue()
+    for index, item in enumerate(items):
+        pending.put((index, item))
+    results = [None] * len(items)
+
+    def worker(connection):
+        while True:
+            try:
+                index, item = pending.get_nowait()
+            except Queue.Empty:
+                return
+            try:
+                results[index] = func(connection, item)
+            except Exception as e:
+                results[index] = dict(failed=True, msg=str(e))
+
+    count = max(1, min(module.params.get('concurrency'), len(items)))
+    threads = [threading.Thread(target=worker, args=(s3_connect(module),)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def logging_signature(spec):
+
+    if spec['state'] == 'absent':
+        return (None, None)
+    return (spec['target_bucket'], spec.get('target_prefix') or '')
+
+
+def read_bucket_logging(connection, spec):
+
+    # validate=False saves a request per bucket, reading the logging
+    # status fails on a missing bucket anyway
+    bucket = connection.get_bucket(spec['name'], validate=False)
+    status = call_with_retry(bucket.get_logging_status)
+    return dict(name=spec['name'], changed=(status.target, status.prefix) != logging_signature(spec))
+
+
+def prepare_logging_target(connection, target_bucket):
+
+    try:
+        target_bucket_obj = connection.get_bucket(target_bucket)
+    except S3ResponseError as e:
+        if e.status == 301:
+            return dict(failed=True, msg="the logging target bucket %s must be in the same region as the bucket being logged" % target_bucket)
+        raise
+    call_with_retry(target_bucket_obj.set_as_logging_target)
+    return dict(name=target_bucket)
+
+
+def apply_bucket_logging(connection, spec):
+
+    bucket = connection.get_bucket(spec['name'], validate=False)
+    target_bucket, target_prefix = logging_signature(spec)
+    if target_bucket is None:
+        call_with_retry(bucket.disable_logging)
+    else:
+        call_with_retry(bucket.enable_logging, target_bucket, target_prefix)
+    return dict(name=spec['name'], changed=True)
+
+
+def reconcile_buckets_logging(module, buckets):
+
+    specs = []
+    for entry in buckets:
+        if not isinstance(entry, dict) or not entry.get('name'):
+            module.fail_json(msg="every entry of buckets must be a hash with a name, got %s" % entry)
+        spec = dict(entry, state=entry.get('state', 'present'))
+        if spec['state'] not in ('present', 'absent'):
+            module.fail_json(msg="state of bucket %s must be present or absent" % spec['name'])
+        if spec['state'] == 'present' and not spec.get('target_bucket'):
+            module.fail_json(msg="target_bucket is required for bucket %s when state=present" % spec['name'])
+        specs.append(spec)
+
+    results = run_workers(module, read_bucket_logging, specs)
+    for spec, result in zip(specs, results):
+        result['name'] = spec['name']
+    changes = [spec for spec, result in zip(specs, results) if result.get('changed')]
+
+    # the log-delivery group needs WRITE and READ_ACP on every target,
+    # which is granted once per target rather than once per bucket
+    targets = sorted(set(spec['target_bucket'] for spec in changes if spec['state'] == 'present'))
+    failed = []
+    for target, result in zip(targets, run_workers(module, prepare_logging_target, targets)):
+        if result.get('failed'):
+            failed.append(dict(result, name=target))
+    if failed:
+        module.fail_json(msg="Failed to prepare the logging target buckets", errors=failed, buckets=results)
+
+    applied = dict((spec['name'], result) for spec, result in
+                   zip(changes, run_workers(module, apply_bucket_logging, changes)))
+    for spec, result in zip(specs, results):
+        if applied.get(spec['name'], {}).get('failed'):
+            result.update(applied[spec['name']])
+
+    failed = [r['name'] for r in results if r.get('failed')]
+    changed = len([r for r in results if r.get('changed') and not r.get('failed')]) > 0
+    if failed:
+        module.fail_json(msg="Failed to reconcile the logging of %s" % ', '.join(failed),
+                         changed=changed, buckets=results)
+    module.exit_json(changed=changed, buckets=results)
+
+
+def main():
+    
+    argument_spec = ec2_argument_spec()
+    argument_spec.update(
+        dict(
+            name = dict(required=False),
+            buckets = dict(required=False, default=None, type='list'),
+            concurrency = dict(required=False, default=8, type='int'),
+            target_bucket = dict(required=False, default=None),
+            target_prefix = dict(required=False, default=""),
+            state = dict(required=False, default='present', choices=['present', 'absent'])
+        )
+    )
+    
+    module = AnsibleModule(argument_spec=argument_spec,
+                           mutually_exclusive=[['name', 'buckets']],
+                           required_one_of=[['name', 'buckets']])
+
+    if not HAS_BOTO:
+        module.fail_json(msg='boto required for this module')
+    
+    if module.params.get("buckets") is not None:
+        reconcile_buckets_logging(module, module.params.get("buckets"))
 
+    connection = s3_connect(module)
 
     state = module.params.get("state")
 
@@ -34,8 +34,27 @@ options:
     default: 'present'
   name:
     description:
-      - Name of the queue.
-    required: true
+      - Name of the queue. Required unless queues is given.
+    required: false
+  queues:
+    description:
+      - List of queues to manage in one run, each a hash with C(name) and the
+        optional keys C(state), C(default_visibility_timeout),
+        C(message_retention_period), C(maximum_message_size),
+        C(delivery_delay) and C(receive_message_wait_time), which mean the
+        same as the options of this module.
+      - The existing queues are found with one ListQueues call on the
+        longest common prefix of the names, and the queues are handled
+        concurrently.
+    required: false
+    default: null
+    version_added: "2.1"
+  concurrency:
+    description:
+      - Number of queues handled in parallel when queues is given.
+    required: false
+    default: 8
+    version_added: "2.1"
   default_visibility_timeout:
     description:
       - The default visibility timeout in seconds.
@@ -82,27 +101,70 @@ EXAMPLES = '''
     name: my-queue
     region: ap-southeast-2
     state: absent
+
+# Manage the queues of an application in one task
+- sqs_queue:
+    region: ap-southeast-2
+    queues:
+      - name: app-orders
+        default_visibility_timeout: 120
+      - name: app-orders-dlq
+        message_retention_period: 1209600
+      - name: app-legacy
+        state: absent
 '''
 
+import os
+import random
+import threading
+import time
+import Queue as queue_lib
+
 try:
     import boto.sqs
+    from boto.sqs.queue import Queue
     from boto.exception import BotoServerError, NoAuthHandlerFound
     HAS_BOTO = True
 
 except ImportError:
     HAS_BOTO = False
 
+# module option -> SQS attribute
+QUEUE_ATTRIBUTES = [
+    ('default_visibility_timeout', 'VisibilityTimeout'),
+    ('message_retention_period', 'MessageRetentionPeriod'),
+    ('maximum_message_size', 'MaximumMessageSize'),
+    ('delivery_delay', 'DelaySeconds'),
+    ('receive_message_wait_time', 'ReceiveMessageWaitTimeSeconds'),
+]
+
+THROTTLING_ERRORS = ('Throttling', 'RequestThrottled')
+
+
+def call_with_retry(func, *args, **kwargs):
+    delay = 1
+    for attempt in range(6):
+        try:
+            return func(*args, **kwargs)
+        except BotoServerError, e:
+            if e.error_code not in THROTTLING_ERRORS or attempt == 5:
+                raise
+        time.sleep(delay * random.uniform(0.5, 1.5))
+        delay = min(delay * 2, 20)
+
+
+def attribute_params(attributes):
+    params = {}
+    for i, (name, value) in enumerate(sorted(attributes.items())):
+        params['Attribute.%d.Name' % (i + 1)] = name
+        params['Attribute.%d.Value' % (i + 1)] = value
+    return params
+
 
 def create_or_update_sqs_queue(connection, module):
     queue_name = module.params.get('name')
 
-    queue_attributes = dict(
-        default_visibility_timeout=module.params.get('default_visibility_timeout'),
-        message_retention_period=module.params.get('message_retention_period'),
-        maximum_message_size=module.params.get('maximum_message_size'),
-        delivery_delay=module.params.get('delivery_delay'),
-        receive_message_wait_time=module.params.get('receive_message_wait_time'),
-    )
+    queue_attributes = dict((option, module.params.get(option)) for option, attribute in QUEUE_ATTRIBUTES)
 
     result = dict(
         region=module.params.get('region'),
@@ -114,13 +176,12 @@ def create_or_update_sqs_queue(connection, module):
         queue = connection.get_queue(queue_name)
         if queue:
             # Update existing
-            result['changed'] = update_sqs_queue(queue, check_mode=module.check_mode, **queue_attributes)
+            result['changed'] = len(update_sqs_queue(queue, check_mode=module.check_mode, **queue_attributes)) > 0
 
         else:
             # Create new
             if not module.check_mode:
-                queue = connection.create_queue(queue_name)
-                update_sqs_queue(queue, **queue_attributes)
+                create_sqs_queue(connection, queue_name, queue_attributes)
             result['changed'] = True
 
     except BotoServerError:
@@ -130,39 +191,34 @@ def create_or_update_sqs_queue(connection, module):
         module.exit_json(**result)
 
 
-def update_sqs_queue(queue,
-                     check_mode=False,
-                     default_visibility_timeout=None,
-                     message_retention_period=None,
-                     maximum_message_size=None,
-                     delivery_delay=None,
-                     receive_message_wait_time=None):
-    changed = False
-
-    changed = set_queue_attribute(queue, 'VisibilityTimeout', default_visibility_timeout,
-                                  check_mode=check_mode) or changed
-    changed = set_queue_attribute(queue, 'MessageRetentionPeriod', message_retention_period,
-                                  check_mode=check_mode) or changed
-    changed = set_queue_attribute(queue, 'MaximumMessageSize', maximum_message_size,
-                                  check_mode=check_mode) or changed
-    changed = set_queue_attribute(queue, 'DelaySeconds', delivery_delay,
-                                  check_mode=check_mode) or changed
-    changed = set_queue_attribute(queue, 'ReceiveMessageWaitTimeSeconds', receive_message_wait_time,
-                                  check_mode=check_mode) or changed
-    return changed
-
-
-def set_queue_attribute(queue, attribute, value, check_mode=False):
-    if not value:
-        return False
-
-    existing_value = queue.get_attributes(attributes=attribute)[attribute]
-    if str(value) != existing_value:
-        if not check_mode:
-            queue.set_attribute(attribute, value)
-        return True
+def desired_attributes(queue_attributes):
+    return dict((attribute, str(queue_attributes[option])) for option, attribute in QUEUE_ATTRIBUTES
+                if queue_attributes.get(option) is not None)
+
+
+def create_sqs_queue(connection, queue_name, queue_attributes):
+    # CreateQueue takes the attributes, no need for a second request
+    params = attribute_params(desired_attributes(queue_attributes))
+    params['QueueName'] = queue_name
+    return call_with_retry(connection.get_object, 'CreateQueue', params, Queue)
 
-    return False
+
+def update_sqs_queue(queue, check_mode=False, **queue_attributes):
+    """
+    Read every attribute of the queue in one GetQueueAttributes and send
+    the differing ones in one SetQueueAttributes. Returns the names of the
+    changed attributes.
+    """
+    wanted = desired_attributes(queue_attributes)
+    if not wanted:
+        return []
+
+    existing = call_with_retry(queue.get_attributes, 'All')
+    changes = dict((k, v) for k, v in wanted.items() if existing.get(k) != v)
+    if changes and not check_mode:
+        call_with_retry(queue.connection.get_status, 'SetQueueAttributes',
+                        attribute_params(changes), queue.id, verb='POST')
+    return sorted(changes)
 
 
 def delete_sqs_queue(connection, module):
@@ -190,11 +246,104 @@ def delete_sqs_queue(connection, module):
         module.exit_json(**result)
 
 
+def find_queues(connection, names):
+    """
+    Look the queues up with one ListQueues on the longest common prefix
+    of their names. ListQueues returns at most 1000 queues, names missing
+    from a full answer are looked up one by one.
+    """
+    listed = call_with_retry(connection.get_all_queues, os.path.commonprefix(names) or None)
+    found = dict((queue.name, queue) for queue in listed)
+    if len(listed) >= 1000:
+        for name in names:
+            if name not in found:
+                queue = call_with_retry(connection.get_queue, name)
+                if queue:
+                    found[name] = queue
+    return found
+
+
+def reconcile_queue(connection, spec, url, check_mode):
+    result = dict(name=spec['name'], state=spec['state'], changed=False)
+    if spec['state'] == 'absent':
+        if url:
+            if not check_mode:
+                call_with_retry(connection.delete_queue, Queue(connection, url))
+            result['changed'] = True
+    elif url:
+        result['attributes'] = update_sqs_queue(Queue(connection, url), check_mode=check_mode, **spec)
+        result['changed'] = len(result['attributes']) > 0
+    else:
+        if not check_mode:
+            create_sqs_queue(connection, spec['name'], spec)
+        result['changed'] = True
+    return result
+
+
+def reconcile_sqs_queues(module, region, aws_connect_params):
+    specs = []
+    for entry in module.params.get('queues'):
+        if not isinstance(entry, dict) or not entry.get('name'):
+            module.fail_json(msg='every entry of queues must be a hash with a name, got %s' % entry)
+        spec = dict(entry, state=entry.get('state', 'present'))
+        if spec['state'] not in ('present', 'absent'):
+            module.fail_json(msg='state of queue %s must be present or absent' % spec['name'])
+        for option, attribute in QUEUE_ATTRIBUTES:
+            if spec.get(option) is not None:
+                try:
+                    spec[option] = int(spec[option])
+                except ValueError:
+                    module.fail_json(msg='%s of queue %s must be an integer' % (option, spec['name']))
+        specs.append(spec)
+
+    # boto connections are not thread safe, every worker gets its own
+    count = max(1, min(module.params.get('concurrency'), len(specs)))
+    try:
+        connections = [connect_to_aws(boto.sqs, region, **aws_connect_params) for i in range(count)]
+        urls = dict((name, queue.url) for name, queue in
+                    find_queues(connections[0], [spec['name'] for spec in specs]).items())
+    except (NoAuthHandlerFound, StandardError), e:
+        module.fail_json(msg=str(e))
+
+    pending = queue_lib.Queue()
+    for index, spec in enumerate(specs):
+        pending.put((index, spec))
+    results = [None] * len(specs)
+
+    def worker(connection):
+        while True:
+            try:
+                index, spec = pending.get_nowait()
+            except queue_lib.Empty:
+                return
+            try:
+                results[index] = reconcile_queue(connection, spec, urls.get(spec['name']), module.check_mode)
+            except Exception, e:
+                # anything else than an SQS error would leave no result
+                results[index] = dict(name=spec['name'], state=spec['state'], changed=False,
+                                      failed=True, msg=str(e))
+
+    threads = [threading.Thread(target=worker, args=(connection,)) for connection in connections]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    changed = len([r for r in results if r['changed']]) > 0
+    failed = [r['name'] for r in results if r.get('failed')]
+    if failed:
+        module.fail_json(msg='Failed to manage sqs queues %s' % ', '.join(failed),
+                         changed=changed, queues=results)
+    module.exit_json(changed=changed, region=region, queues=results)
+
+
 def main():
     argument_spec = ec2_argument_spec()
     argument_spec.update(dict(
         state=dict(default='present', choices=['present', 'absent']),
-        name=dict(required=True, type='str'),
+        name=dict(required=False, type='str'),
+        queues=dict(required=False, type='list'),
+        concurrency=dict(default=8, type='int'),
         default_visibility_timeout=dict(type='int'),
         message_retention_period=dict(type='int'),
         maximum_message_size=dict(type='int'),
@@ -204,6 +353,8 @@ def main():
 
     module = AnsibleModule(
         argument_spec=argument_spec,
+        mutually_exclusive=[['name', 'queues']],
+        required_one_of=[['name', 'queues']],
         supports_check_mode=True)
 
     if not HAS_BOTO:
@@ -213,6 +364,9 @@ def main():
     if not region:
         module.fail_json(msg='region must be specified')
 
+    if module.params.get('queues') is not None:
+        reconcile_sqs_queues(module, region, aws_connect_params)
+
     try:
         connection = connect_to_aws(boto.sqs, region, **aws_connect_params)
         
@@ -144,6 +144,21 @@ options:
           - the token key indentifying an ACL rule set. May be required to register services.
         required: false
         default: None
+    services:
+        description:
+          - a list of services to converge in one call. Each entry is a hash
+            using the service and check options of this module (service_name,
+            service_id, service_port, tags, script, interval, ttl, http,
+            timeout, notes) and an optional state. The registered services and
+            checks are read from the agent once and only the services that
+            differ are registered or deregistered.
+          - As the agent does not return the definition of a check, a service
+            with a check is only registered again if its service definition
+            changed or its check is missing; changes to the check alone are
+            not detected in this mode.
+        required: false
+        default: None
+        version_added: "2.1"
 """
 
 EXAMPLES = '''
@@ -186,6 +201,20 @@ EXAMPLES = '''
       script: "/opt/disk_usage.py"
       interval: 5m
 
+  - name: register several services in one call
+    consul:
+      services:
+        - service_name: nginx
+          service_port: 80
+          http: /status
+          interval: 60s
+        - service_name: memcached
+          service_port: 11211
+          tags:
+            - cache
+        - service_name: legacy
+          state: absent
+
 '''
 
 import sys
@@ -206,12 +235,66 @@ def register_with_consul(module):
 
     state = module.params.get('state')
 
-    if state == 'present':
+    if module.params.get('services') is not None:
+        sync_services(module)
+    elif state == 'present':
         add(module)
     else:
         remove(module)
 
 
+def sync_services(module):
+    ''' converges a list of services against a single read of the agent's
+    services and checks, reusing one api client and its http session '''
+    consul_api = get_consul_api(module)
+    existing_services = consul_api.agent.services()
+    existing_checks = consul_api.agent.checks()
+
+    results = []
+    for entry in module.params.get('services'):
+        if not isinstance(entry, dict):
+            module.fail_json(msg='every entry of services must be a hash, got %s' % entry)
+        state = entry.get('state', 'present')
+        service_id = entry.get('service_id') or entry.get('service_name')
+        if not service_id:
+            module.fail_json(msg='every entry of services needs a service_name or service_id: %s' % entry)
+
+        if state == 'absent':
+            changed = service_id in existing_services
+            if changed:
+                consul_api.agent.service.deregister(service_id)
+            results.append(dict(service_id=service_id, state=state, changed=changed))
+            continue
+
+        service = parse_service(module, entry)
+        check = parse_check(module, entry)
+        if not service:
+            module.fail_json(msg='a name and port are required to register a service: %s' % entry)
+        if check:
+            service.add_check(check)
+
+        # the agent reports services without tags with an empty list
+        service.tags = service.tags or []
+        existing = existing_services.get(service.id)
+        if existing:
+            existing = ConsulService(loaded=existing)
+            existing.tags = existing.tags or []
+        changed = not existing or not existing == service
+        if not changed and check:
+            # notes are not sent along with a service's check, so only
+            # whether the check is registered can be compared
+            changed = 'service:%s' % service.id not in existing_checks
+        if changed:
+            service.register(consul_api)
+
+        result = service.to_dict()
+        result.update(service_id=service.id, state=state, changed=changed)
+        results.append(result)
+
+    module.exit_json(changed=len([r for r in results if r['changed']]) > 0,
+                     services=results)
+
+
 def add(module):
     ''' adds a service or a check depending on supplied configuration'''
     check = parse_check(module)
@@ -323,38 +406,44 @@ def get_service_by_id(consul_api, service_id):
             return ConsulService(loaded=service)
 
 
-def parse_check(module):
+def parse_check(module, params=None):
+
+    if params is None:
+        params = module.params
 
-    if len(filter(None, [module.params.get('script'), module.params.get('ttl'), module.params.get('http')])) > 1:
+    if len(filter(None, [params.get('script'), params.get('ttl'), params.get('http')])) > 1:
         module.fail_json(
             msg='check are either script, http or ttl driven, supplying more than one does not make sense')
 
-    if module.params.get('check_id') or module.params.get('script') or module.params.get('ttl') or module.params.get('http'):
+    if params.get('check_id') or params.get('script') or params.get('ttl') or params.get('http'):
 
        return ConsulCheck(
-            module.params.get('check_id'),
-            module.params.get('check_name'),
-            module.params.get('check_node'),
-            module.params.get('check_host'),
-            module.params.get('script'),
-            module.params.get('interval'),
-            module.params.get('ttl'),
-            module.params.get('notes'),
-            module.params.get('http'),
-            module.params.get('timeout')
+            params.get('check_id'),
+            params.get('check_name'),
+            params.get('check_node'),
+            params.get('check_host'),
+            params.get('script'),
+            params.get('interval'),
+            params.get('ttl'),
+            params.get('notes'),
+            params.get('http'),
+            params.get('timeout')
         )
 
 
-def parse_service(module):
+def parse_service(module, params=None):
+
+    if params is None:
+        params = module.params
 
-    if module.params.get('service_name') and module.params.get('service_port'):
+    if params.get('service_name') and params.get('service_port'):
         return ConsulService(
-            module.params.get('service_id'),
-            module.params.get('service_name'),
-            module.params.get('service_port'),
-            module.params.get('tags'),
+            params.get('service_id'),
+            params.get('service_name'),
+            int(params.get('service_port')),
+            params.get('tags'),
         )
-    elif module.params.get('service_name') and not module.params.get('service_port'):
+    elif params.get('service_name') and not params.get('service_port'):
 
         module.fail_json( msg="service_name supplied but no service_port, a port is required to configure a service. Did you configure the 'port' argument meaning 'service_port'?")
 
@@ -523,7 +612,8 @@ def main():
             http=dict(required=False, type='str'),
             timeout=dict(required=False, type='str'),
             tags=dict(required=False, type='list'),
-            token=dict(required=False)
+            token=dict(required=False),
+            services=dict(required=False, type='list')
         ),
         supports_check_mode=False,
     )
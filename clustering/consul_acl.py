@@ -69,6 +69,16 @@ options:
           - the port on which the consul agent is running
         required: false
         default: 8500
+    tokens:
+        description:
+          - a list of tokens to manage in one call. Each entry is a hash with
+            the optional keys token, name, token_type, rules and state, which
+            behave like the module options of the same name. Entries without
+            a token are matched to an existing acl by name. All acls are
+            listed once and only the tokens whose rules, name or type differ
+            are updated.
+        required: false
+        version_added: "2.1"
 """
 
 EXAMPLES = '''
@@ -102,9 +112,26 @@ EXAMPLES = '''
         host: 'consul1.mycluster.io'
         token: '172bd5c8-9fe9-11e4-b1b0-3c15c2c9fd5e'
         state: absent
+
+    - name: manage several tokens in one call
+      consul_acl:
+        mgmt_token: 'some_management_acl'
+        tokens:
+          - name: 'Foo access'
+            rules:
+              - key: 'foo'
+                policy: read
+          - token: 'some_client_token'
+            name: 'Bar access'
+            rules:
+              - service: 'bar'
+                policy: write
+          - token: '172bd5c8-9fe9-11e4-b1b0-3c15c2c9fd5e'
+            state: absent
 '''
 
 import sys
+import hashlib
 
 try:
     import consul
@@ -125,12 +152,85 @@ def execute(module):
 
     state = module.params.get('state')
 
-    if state == 'present':
+    if module.params.get('tokens') is not None:
+        sync_acls(module)
+    elif state == 'present':
         update_acl(module)
     else:
         remove_acl(module)
 
 
+def sync_acls(module):
+    ''' converges a list of tokens against a single listing of the acls,
+    comparing rule sets by digest '''
+    mgmt = module.params.get('mgmt_token')
+    consul = get_consul_api(module, mgmt)
+
+    try:
+        acls = consul.acl.list()
+    except Exception, e:
+        module.fail_json(msg="Could not list acls %s" % e)
+
+    by_id = {}
+    by_name = {}
+    for acl in acls:
+        by_id[acl['ID']] = acl
+        by_name.setdefault(acl.get('Name'), []).append(acl)
+
+    results = []
+    for entry in module.params.get('tokens'):
+        if not isinstance(entry, dict):
+            module.fail_json(msg="every entry of tokens must be a hash, got %s" % entry)
+        token = entry.get('token')
+        name = entry.get('name')
+        token_type = entry.get('token_type', module.params.get('token_type'))
+        state = entry.get('state', 'present')
+        if not (token or name):
+            module.fail_json(msg="every entry of tokens needs a token or a name: %s" % entry)
+
+        if token:
+            existing = by_id.get(token)
+        else:
+            named = by_name.get(name, [])
+            if len(named) > 1:
+                module.fail_json(msg="more than one acl is named %s, supply its token" % name)
+            existing = named and named[0] or None
+
+        if state == 'absent':
+            changed = existing is not None
+            if changed:
+                consul.acl.destroy(existing['ID'])
+            results.append(dict(token=existing and existing['ID'] or token, name=name,
+                                state=state, changed=changed))
+            continue
+
+        supplied_rules = yml_to_rules(module, entry.get('rules'))
+        hcl_rules = supplied_rules.are_rules() and supplied_rules.to_hcl() or None
+        try:
+            if existing is None:
+                if token:
+                    token = consul.acl.update(token, name=name, type=token_type, rules=hcl_rules)
+                else:
+                    token = consul.acl.create(name=name, type=token_type, rules=hcl_rules)
+                changed = True
+            else:
+                token = existing['ID']
+                existing_rules = hcl_to_rules(existing.get('Rules'))
+                changed = (existing_rules.digest() != supplied_rules.digest()
+                           or (name is not None and existing.get('Name') != name)
+                           or existing.get('Type') != token_type)
+                if changed:
+                    consul.acl.update(token, name=name, type=token_type, rules=hcl_rules)
+        except Exception, e:
+            module.fail_json(msg="Could not create/update acl %s, %s" % (token or name, e))
+
+        results.append(dict(token=token, name=name, type=token_type,
+                            rules=hcl_rules, state=state, changed=changed))
+
+    module.exit_json(changed=len([r for r in results if r['changed']]) > 0,
+                     tokens=results)
+
+
 def update_acl(module):
 
     rules = module.params.get('rules')
@@ -194,20 +294,30 @@ def remove_acl(module):
 
 def load_rules_for_token(module, consul_api, token):
     try:
-        rules = Rules()
         info = consul_api.acl.info(token)
         if info and info['Rules']:
-            rule_set = hcl.loads(to_ascii(info['Rules']))
-            for rule_type in rule_set:
-                for pattern, policy in rule_set[rule_type].iteritems():
-                    rules.add_rule(rule_type, Rule(pattern, policy['policy']))
-        return rules
+            return hcl_to_rules(info['Rules'])
+        return Rules()
     except Exception, e:
         module.fail_json(
             msg="Could not load rule list from retrieved rule data %s, %s" % (
                     token, e))
 
-    return json_to_rules(module, loaded)
+# many tokens share the same rule text, so each distinct text is parsed once
+_hcl_rules_cache = {}
+
+def hcl_to_rules(hcl_rules):
+    ''' parse the hcl rules of an acl, the returned Rules must not be modified '''
+    if not hcl_rules:
+        return Rules()
+    if hcl_rules not in _hcl_rules_cache:
+        rules = Rules()
+        rule_set = hcl.loads(to_ascii(hcl_rules))
+        for rule_type in rule_set:
+            for pattern, policy in rule_set[rule_type].iteritems():
+                rules.add_rule(rule_type, Rule(pattern, policy['policy']))
+        _hcl_rules_cache[hcl_rules] = rules
+    return _hcl_rules_cache[hcl_rules]
 
 def to_ascii(unicode_string):
     if isinstance(unicode_string, unicode):
@@ -237,11 +347,27 @@ class Rules:
 
     def __init__(self):
         self.rules = {}
+        self._digest = None
         for rule_type in RULE_TYPES:
             self.rules[rule_type] = {}
 
     def add_rule(self, rule_type, rule):
         self.rules[rule_type][rule.pattern] = rule
+        self._digest = None
+
+    def digest(self):
+        ''' a hash of the canonical, ordered form of the rule set '''
+        if self._digest is None:
+            canonical = []
+            for rule_type in RULE_TYPES:
+                for pattern in sorted(self.rules[rule_type]):
+                    canonical.append('%s\0%s\0%s' % (
+                        rule_type, pattern, self.rules[rule_type][pattern].policy))
+            canonical = '\n'.join(canonical)
+            if isinstance(canonical, unicode):
+                canonical = canonical.encode('utf-8')
+            self._digest = hashlib.sha1(canonical).hexdigest()
+        return self._digest
 
     def are_rules(self):
         return len(self) > 0
@@ -261,19 +387,10 @@ class Rules:
         return count
 
     def __eq__(self, other):
-        if not (other or isinstance(other, self.__class__)
-                or len(other) == len(self)):
-            return False
-
-        for rule_type in RULE_TYPES:
-            for name, other_rule in other.rules[rule_type].iteritems():
-                if not name in self.rules[rule_type]:
-                    return False
-                rule = self.rules[rule_type][name]
+        return isinstance(other, self.__class__) and self.digest() == other.digest()
 
-                if not (rule and rule == other_rule):
-                    return False
-        return True
+    def __ne__(self, other):
+        return not self.__eq__(other)
 
     def __str__(self):
         return self.to_hcl()
@@ -320,6 +437,7 @@ def main():
         rules=dict(default=None, required=False, type='list'),
         state=dict(default='present', choices=['present', 'absent']),
         token=dict(required=False),
+        tokens=dict(default=None, required=False, type='list'),
         token_type=dict(
             required=False, choices=['client', 'management'], default='client')
     )
@@ -51,8 +51,9 @@ options:
         default: present
     key:
         description:
-          - the key at which the value should be stored.
-        required: true
+          - the key at which the value should be stored, required unless a
+            tree is given.
+        required: false
     value:
         description:
           - the value should be associated with the given key, required if state
@@ -99,6 +100,34 @@ options:
           - the port on which the consul agent is running
         required: false
         default: 8500
+    tree:
+        description:
+          - a hash of keys to values to be stored under I(prefix), it can
+            not be combined with key or value. The existing entries under the prefix are fetched with a
+            single recursive read and only the keys whose value differs are
+            written, through consul transactions of up to 64 operations that
+            check the ModifyIndex of every key they touch.
+          - Each transaction is atomic, but a change set of more than 64
+            operations is split over several of them. If one of them fails,
+            the ones before it stay applied and the tree is left partially
+            synced; the failure reports how many operations were applied.
+        required: false
+        default: None
+        version_added: "2.1"
+    prefix:
+        description:
+          - the prefix under which the keys of the tree are stored, required
+            with tree.
+        required: false
+        default: None
+        version_added: "2.1"
+    prune:
+        description:
+          - when a tree is given, remove the keys under the prefix that are
+            not part of the tree.
+        required: false
+        default: false
+        version_added: "2.1"
 """
 
 
@@ -118,9 +147,19 @@ EXAMPLES = '''
     consul_kv:
       key: ansible/groups/dc1/somenode
       value: 'top_secret'
+
+  - name: sync a configuration tree, removing keys that are no longer used
+    consul_kv:
+      prefix: config/myservice/
+      tree:
+        db/host: db.example.com
+        db/port: 5432
+        cache/ttl: 300
+      prune: true
 '''
 
 import sys
+import base64
 
 try:
     import json
@@ -129,6 +168,7 @@ except ImportError:
 
 try:
     import consul
+    import requests
     from requests.exceptions import ConnectionError
     python_consul_installed = True
 except ImportError, e:
@@ -136,10 +176,17 @@ except ImportError, e:
 
 from requests.exceptions import ConnectionError
 
+# consul rejects transactions with more than 64 operations
+TXN_MAX_OPS = 64
+# seconds to wait for the agent to answer a transaction
+TXN_TIMEOUT = 30
+
 def execute(module):
 
     state = module.params.get('state')
 
+    if module.params.get('tree') is not None:
+        sync_tree(module, state)
     if state == 'acquire' or state == 'release':
         lock(module, state)
     if state == 'present':
@@ -220,6 +267,123 @@ def remove_value(module):
                      data=existing)
 
 
+def tree_prefix(key):
+    if key.endswith('/'):
+        return key
+    return key + '/'
+
+
+def sync_tree(module, state):
+    ''' converge every key under the prefix in one read and as few
+    transactions as possible '''
+    consul_api = get_consul_api(module)
+
+    prefix = tree_prefix(module.params.get('prefix'))
+    tree = module.params.get('tree')
+    prune = module.boolean(module.params.get('prune'))
+
+    index, entries = consul_api.kv.get(prefix, recurse=True)
+    existing = {}
+    for entry in entries or []:
+        existing[entry['Key']] = entry
+
+    desired = {}
+    if state == 'present':
+        for key, value in tree.items():
+            if not isinstance(value, basestring):
+                value = unicode(value)
+            desired[prefix + key.lstrip('/')] = value
+
+    ops = []
+    set_keys = []
+    for key in sorted(desired.keys()):
+        value = desired[key]
+        entry = existing.get(key)
+        if entry is None:
+            # cas with index 0 only creates keys that do not exist yet
+            ops.append(txn_op('cas', key, value, 0))
+            set_keys.append(key)
+        elif entry_value(entry) != value:
+            ops.append(txn_op('cas', key, value, entry['ModifyIndex']))
+            set_keys.append(key)
+
+    deleted_keys = []
+    if state == 'absent':
+        remove = [prefix + key.lstrip('/') for key in tree.keys()]
+    elif prune:
+        remove = [key for key in existing.keys() if key not in desired]
+    else:
+        remove = []
+    for key in sorted(remove):
+        if key in existing:
+            ops.append(txn_op('delete-cas', key, None, existing[key]['ModifyIndex']))
+            deleted_keys.append(key)
+
+    changed = len(ops) > 0
+    if changed and not module.check_mode:
+        for start in range(0, len(ops), TXN_MAX_OPS):
+            apply_txn(module, ops[start:start + TXN_MAX_OPS],
+                      applied=start, operations=len(ops))
+
+    module.exit_json(changed=changed,
+                     index=index,
+                     key=prefix,
+                     set=set_keys,
+                     deleted=deleted_keys)
+
+
+def entry_value(entry):
+    ''' the value of a key as text, python-consul returns the bytes
+    stored, or None for an empty value '''
+    value = entry['Value']
+    if value is None:
+        return u''
+    if isinstance(value, str):
+        return value.decode('utf-8', 'replace')
+    return value
+
+
+def txn_op(verb, key, value, index):
+    op = {'Verb': verb, 'Key': key, 'Index': index}
+    if value is not None:
+        if isinstance(value, unicode):
+            value = value.encode('utf-8')
+        op['Value'] = base64.b64encode(value)
+    return {'KV': op}
+
+
+def apply_txn(module, ops, **progress):
+    ''' run the operations as one transaction through /v1/txn, python-consul
+    does not expose the transaction endpoint. progress is reported along
+    with a failure '''
+    url = 'http://%s:%s/v1/txn' % (module.params.get('host'), module.params.get('port'))
+    params = {}
+    if module.params.get('token'):
+        params['token'] = module.params.get('token')
+    try:
+        response = get_http_session().put(url, params=params, data=json.dumps(ops),
+                                          timeout=TXN_TIMEOUT)
+    except requests.exceptions.Timeout:
+        module.fail_json(msg='consul transaction timed out after %s seconds, it may or may not have been applied' % TXN_TIMEOUT,
+                         **progress)
+    if response.status_code == 409:
+        errors = [error.get('What') for error in response.json().get('Errors') or []]
+        module.fail_json(msg='consul transaction rolled back, keys were modified concurrently: %s' % ', '.join(errors),
+                         **progress)
+    if response.status_code != 200:
+        module.fail_json(msg='consul transaction failed (%s): %s' % (response.status_code, response.text),
+                         **progress)
+
+
+_http_session = None
+
+def get_http_session():
+    global _http_session
+    if _http_session is None:
+        _http_session = requests.Session()
+    return _http_session
+
+
 def get_consul_api(module, token=None):
     return consul.Consul(host=module.params.get('host'),
                          port=module.params.get('port'),
@@ -235,17 +399,24 @@ def main():
     argument_spec = dict(
         cas=dict(required=False),
         flags=dict(required=False),
-        key=dict(required=True),
+        key=dict(required=False),
         host=dict(default='localhost'),
         port=dict(default=8500, type='int'),
+        prefix=dict(required=False),
+        prune=dict(required=False, default=False, type='bool'),
         recurse=dict(required=False, type='bool'),
         retrieve=dict(required=False, default=True),
         state=dict(default='present', choices=['present', 'absent']),
         token=dict(required=False, default='anonymous'),
+        tree=dict(required=False, type='dict'),
         value=dict(required=False)
     )
 
-    module = AnsibleModule(argument_spec, supports_check_mode=False)
+    module = AnsibleModule(argument_spec,
+                           mutually_exclusive=[['tree', 'key'], ['tree', 'value']],
+                           required_one_of=[['key', 'tree']],
+                           required_together=[['tree', 'prefix']],
+                           supports_check_mode=False)
 
     test_dependencies(module)
         
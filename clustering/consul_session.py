@@ -40,9 +40,12 @@ options:
             required to remove the session. Info for a single session, all the
             sessions for a node or all available sessions can be retrieved by
             specifying info, node or list for the state; for node or info, the
-            node name or session id is required as parameter.
+            node name or session id is required as parameter. The state
+            released waits, using consul blocking queries, until the session
+            given by id no longer exists or until the lock on the given key is
+            released.
         required: false
-        choices: ['present', 'absent', 'info', 'node', 'list']
+        choices: ['present', 'absent', 'info', 'node', 'list', 'released']
         default: present
     name:
         description:
@@ -64,6 +67,26 @@ options:
             by default this is the name of the agent.
         required: false
         default: None
+    nodes:
+        description:
+          - a list of node names to retrieve the sessions of with state node.
+            All sessions are listed once and returned indexed by node.
+        required: false
+        default: None
+        version_added: "2.1"
+    key:
+        description:
+          - with state released, the key whose lock should be waited on.
+        required: false
+        default: None
+        version_added: "2.1"
+    wait_timeout:
+        description:
+          - with state released, how many seconds to wait for the session or
+            lock to be released before failing.
+        required: false
+        default: 300
+        version_added: "2.1"
     datacenter:
         description:
           - name of the datacenter in which the session exists or should be
@@ -88,6 +111,13 @@ options:
           - the port on which the consul agent is running
         required: false
         default: 8500
+    token:
+        description:
+          - the token identifying an ACL rule set that controls access to
+            the sessions and keys
+        required: false
+        default: None
+        version_added: "2.1"
 """
 
 EXAMPLES = '''
@@ -111,12 +141,27 @@ EXAMPLES = '''
 
 - name: retrieve active sessions
   consul_session: state=list
+
+- name: retrieve the sessions of several nodes with a single lookup
+  consul_session:
+    state: node
+    nodes:
+      - node1
+      - node2
+
+- name: wait until the lock on a key is released
+  consul_session:
+    state: released
+    key: service/myservice/leader
+    wait_timeout: 600
 '''
 
 import sys
+import time
 
 try:
     import consul
+    import requests
     from requests.exceptions import ConnectionError
     python_consul_installed = True
 except ImportError, e:
@@ -128,6 +173,8 @@ def execute(module):
 
     if state in ['info', 'list', 'node']:
         lookup_sessions(module)
+    elif state == 'released':
+        wait_for_release(module)
     elif state == 'present':
         update_session(module)
     else:
@@ -147,6 +194,16 @@ def lookup_sessions(module):
                 sessions_list = sessions_list[1]
             module.exit_json(changed=True,
                              sessions=sessions_list)
+        elif state == 'node' and module.params.get('nodes'):
+            nodes = module.params.get('nodes')
+            index, sessions_list = consul.session.list(dc=datacenter)
+            sessions = dict((node, []) for node in nodes)
+            for session in sessions_list or []:
+                if session.get('Node') in sessions:
+                    sessions[session['Node']].append(session)
+            module.exit_json(changed=True,
+                             nodes=nodes,
+                             sessions=sessions)
         elif state == 'node':
             node = module.params.get('node')
             if not node:
@@ -221,6 +278,80 @@ def remove_session(module):
         module.fail_json(msg="Could not remove session with id '%s' %s" % (
                          session_id, e))
 
+# longest single blocking query, the overall wait is bounded by wait_timeout
+MAX_BLOCKING_WAIT = 60
+
+def wait_for_release(module):
+    ''' block until a session disappears or a lock is released, using consul
+    blocking queries so that the agent answers as soon as the state changes '''
+    session_id = module.params.get('id')
+    key = module.params.get('key')
+    datacenter = module.params.get('datacenter')
+
+    if not (session_id or key):
+        module.fail_json(msg="an id or a key is required to wait for a release")
+
+    consul = get_consul_api(module)
+    started = time.time()
+    deadline = started + module.params.get('wait_timeout')
+    index = None
+    queries = 0
+
+    while True:
+        remaining = int(deadline - time.time())
+        if remaining <= 0:
+            module.fail_json(msg="Timed out waiting for %s to be released" % (key or session_id),
+                             queries=queries)
+        wait = int(min(remaining, MAX_BLOCKING_WAIT))
+        queries += 1
+        if key:
+            new_index, entry = consul.kv.get(key, index=index, wait='%ds' % wait, dc=datacenter)
+            released = not entry or not entry.get('Session')
+        else:
+            new_index, sessions = get_session_blocking(module, session_id, index, wait)
+            released = not sessions
+        if released:
+            module.exit_json(changed=False,
+                             key=key,
+                             session_id=session_id,
+                             queries=queries,
+                             elapsed=time.time() - started)
+        # consul may reset its index, in which case the query restarts at 0
+        if index is not None and new_index is not None and int(new_index) < int(index):
+            new_index = 0
+        index = new_index
+
+
+def get_session_blocking(module, session_id, index, wait):
+    ''' python-consul does not pass a wait time for session queries, so the
+    blocking query is made directly against the http api. wait is in
+    seconds; consul may hold the query up to wait/16 longer, so the http
+    timeout leaves a margin on top of that '''
+    url = 'http://%s:%s/v1/session/info/%s' % (
+        module.params.get('host'), module.params.get('port'), session_id)
+    params = {'wait': '%ds' % wait}
+    if index is not None:
+        params['index'] = index
+    if module.params.get('datacenter'):
+        params['dc'] = module.params.get('datacenter')
+    if module.params.get('token'):
+        params['token'] = module.params.get('token')
+    response = get_http_session().get(url, params=params, timeout=wait + wait / 16.0 + 5)
+    if response.status_code != 200:
+        module.fail_json(msg="Could not retrieve session %s (%s): %s" % (
+                         session_id, response.status_code, response.text))
+    return response.headers.get('X-Consul-Index'), response.json()
+
+
+_http_session = None
+
+def get_http_session():
+    global _http_session
+    if _http_session is None:
+        _http_session = requests.Session()
+    return _http_session
+
+
 def validate_duration(name, duration):
     if duration:
         duration_units = ['ns', 'us', 'ms', 's', 'm', 'h']
@@ -231,7 +362,8 @@ def validate_duration(name, duration):
 
 def get_consul_api(module):
     return consul.Consul(host=module.params.get('host'),
-                         port=module.params.get('port'))
+                         port=module.params.get('port'),
+                         token=module.params.get('token'))
                          
 def test_dependencies(module):
     if not python_consul_installed:
@@ -244,11 +376,15 @@ def main():
         delay=dict(required=False,type='str', default='15s'),
         host=dict(default='localhost'),
         port=dict(default=8500, type='int'),
+        token=dict(required=False, no_log=True),
         id=dict(required=False),
+        key=dict(required=False),
         name=dict(required=False),
         node=dict(required=False),
+        nodes=dict(required=False, type='list'),
         state=dict(default='present',
-                   choices=['present', 'absent', 'info', 'node', 'list'])
+                   choices=['present', 'absent', 'info', 'node', 'list', 'released']),
+        wait_timeout=dict(required=False, type='int', default=300)
     )
 
     module = AnsibleModule(argument_spec, supports_check_mode=False)
@@ -88,6 +88,26 @@ options:
             - A redis config value.
         required: false
         default: null
+    config:
+        version_added: 2.1
+        description:
+            - A hash of redis config keys to values, set together on each
+              instance [config command]. The current configuration is read
+              with a single CONFIG GET and the changed keys are set in one
+              pipeline.
+        required: false
+        default: null
+    instances:
+        version_added: 2.1
+        description:
+            - A list of instances to apply the config or slave command to
+              concurrently, instead of login_host/login_port. Each entry is a
+              "host:port" string or a hash with host, port and optionally
+              password, config, master_host, master_port and slave_mode keys
+              overriding the module options for that instance. The change
+              status of every instance is returned in C(instances).
+        required: false
+        default: null
 
 
 notes:
@@ -119,8 +139,28 @@ EXAMPLES = '''
 
 # Configure local redis to have lua time limit of 100 ms
 - redis: command=config name=lua-time-limit value=100
+
+# Configure all the shards running on this host at once
+- redis:
+    command: config
+    config:
+      maxclients: 10000
+      lua-time-limit: 100
+    instances:
+      - localhost:7000
+      - localhost:7001
+      - localhost:7002
+
+# Make a set of local instances slaves of their own masters
+- redis:
+    command: slave
+    instances:
+      - { port: 7000, master_host: 10.0.0.1, master_port: 7000 }
+      - { port: 7001, master_host: 10.0.0.2, master_port: 7001 }
 '''
 
+import threading
+
 try:
     import redis
 except ImportError:
@@ -158,6 +198,108 @@ def flush(client, db=None):
         return False
 
 
+def ensure_config(client, settings, check_mode):
+    """ Set every changed key of settings, reading the configuration once
+    and writing all changes in a single pipeline. Returns the changed keys. """
+    current = client.config_get('*')
+    changed = [name for name in sorted(settings.keys())
+               if current.get(name) != str(settings[name])]
+    if changed and not check_mode:
+        pipe = client.pipeline(transaction=False)
+        for name in changed:
+            pipe.config_set(name, settings[name])
+        pipe.execute()
+    return changed
+
+
+def ensure_replication(client, mode, master_host, master_port, check_mode):
+    """ Put the instance in master or slave mode. Returns whether it changed. """
+    info = client.info()
+    if mode == "master":
+        if info["role"] == "master":
+            return False
+        if not check_mode and not set_master_mode(client):
+            raise Exception('Unable to set master mode')
+        return True
+    if info["role"] == "slave" and\
+       info["master_host"] == master_host and\
+       info["master_port"] == master_port:
+        return False
+    if not check_mode and not set_slave_mode(client, master_host, master_port):
+        raise Exception('Unable to set slave mode')
+    return True
+
+
+def parse_instance(module, instance):
+    if isinstance(instance, dict):
+        instance = dict(instance)
+    else:
+        parts = str(instance).rsplit(':', 1)
+        if len(parts) == 2:
+            host, port = parts
+        else:
+            host, port = parts[0], module.params['login_port']
+        instance = dict(host=host, port=port)
+    instance.setdefault('host', module.params['login_host'])
+    instance.setdefault('port', module.params['login_port'])
+    instance.setdefault('password', module.params['login_password'])
+    try:
+        instance['port'] = int(instance['port'])
+    except ValueError:
+        module.fail_json(msg="invalid port in instance %s" % instance)
+    return instance
+
+
+def apply_instance(module, command, instance, settings):
+    """ Run the command against one instance, returning its result """
+    result = dict(instance='%s:%s' % (instance['host'], instance['port']), changed=False)
+    try:
+        client = redis.StrictRedis(host=instance['host'],
+                                   port=instance['port'],
+                                   password=instance['password'])
+        if command == 'config':
+            settings = instance.get('config', settings)
+            changed = ensure_config(client, settings, module.check_mode)
+            result.update(changed=len(changed) > 0, changed_keys=changed)
+        else:
+            mode = instance.get('slave_mode', module.params['slave_mode'])
+            master_host = instance.get('master_host', module.params['master_host'])
+            master_port = instance.get('master_port', module.params['master_port'])
+            if mode == "slave":
+                if not master_host or not master_port:
+                    raise Exception('In slave mode master host and port must be provided')
+                master_port = int(master_port)
+            result.update(mode=mode, master_host=master_host, master_port=master_port,
+                          changed=ensure_replication(client, mode, master_host, master_port,
+                                                     module.check_mode))
+    except Exception, e:
+        result.update(failed=True, msg=str(e))
+    return result
+
+
+def apply_instances(module, command, settings):
+    """ Run the command against all instances concurrently, each thread
+    using the connection pool of its own client """
+    instances = [parse_instance(module, i) for i in module.params['instances']]
+    results = [None] * len(instances)
+
+    def worker(idx):
+        results[idx] = apply_instance(module, command, instances[idx], settings)
+
+    threads = [threading.Thread(target=worker, args=(idx,)) for idx in range(len(instances))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    changed = len([r for r in results if r['changed']]) > 0
+    failed = [r for r in results if r.get('failed')]
+    if failed:
+        module.fail_json(msg="command failed on %d instance(s)" % len(failed),
+                         changed=changed, instances=results)
+    module.exit_json(changed=changed, instances=results)
+
+
 # ===========================================
 # Module execution.
 #
@@ -175,7 +317,9 @@ def main():
             db=dict(default=None),
             flush_mode=dict(default='all', choices=['all', 'db']),
             name=dict(default=None),
-            value=dict(default=None)
+            value=dict(default=None),
+            config=dict(default=None, type='dict'),
+            instances=dict(default=None, type='list')
         ),
         supports_check_mode = True
     )
@@ -188,6 +332,17 @@ def main():
     login_port = int(module.params['login_port'])
     command = module.params['command']
 
+    if module.params['instances'] is not None:
+        if command not in ('config', 'slave'):
+            module.fail_json(msg="instances is only supported with the config and slave commands")
+        settings = module.params['config']
+        if settings is None and module.params['name']:
+            settings = {module.params['name']: module.params['value']}
+        if command == 'config' and settings is None and\
+           not [i for i in module.params['instances'] if isinstance(i, dict) and 'config' in i]:
+            module.fail_json(msg="config or name and value must be provided")
+        apply_instances(module, command, settings or {})
+
     # Slave Command section -----------
     if command == "slave":
         master_host = module.params['master_host']
@@ -293,6 +448,22 @@ def main():
                 module.exit_json(changed=True, flushed=True, db=db)
             else:  # Flush never fails :)
                 module.fail_json(msg="Unable to flush '%d' database" % db)
+    elif command == 'config' and module.params['config'] is not None:
+        r = redis.StrictRedis(host=login_host,
+                              port=login_port,
+                              password=login_password)
+
+        try:
+            r.ping()
+        except Exception, e:
+            module.fail_json(msg="unable to connect to database: %s" % e)
+
+        try:
+            changed = ensure_config(r, module.params['config'], module.check_mode)
+        except Exception, e:
+            module.fail_json(msg="unable to update config: %s" % e)
+        module.exit_json(changed=len(changed) > 0, changed_keys=changed,
+                         config=module.params['config'])
     elif command == 'config':
         name = module.params['name']
         value = module.params['value']
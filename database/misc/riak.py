@@ -58,6 +58,9 @@ options:
   wait_for_handoffs:
     description:
       - Number of seconds to wait for handoffs to complete.
+      - The transfers are checked more often as the number of partitions
+        waiting for handoff goes down, and the number of pending partitions
+        seen over time is returned as C(handoff_progress).
     required: false
     default: null
     aliases: []
@@ -95,16 +98,104 @@ EXAMPLES = '''
 
 # Wait for riak_kv service to startup
 - riak: wait_for_service=kv
+
+# Rolling restart, wait for the node to rejoin and hand its partitions back
+- riak: wait_for_service=kv wait_for_handoffs=3600 wait_for_ring=600
+'''
+
+RETURN = '''
+handoff_progress:
+    description: partitions waiting for handoff each time the number changed while waiting for handoffs
+    returned: when wait_for_handoffs is set
+    type: list
+    sample: [{"elapsed": 0.0, "pending": 12, "active": 2}, {"elapsed": 31.2, "pending": 0, "active": 0}]
 '''
 
 import time
 import socket
 import sys
+import re
 try:
     import json
 except ImportError:
     import simplejson as json
 
+# bounds of the pause between two checks while waiting on the node
+MIN_WAIT_DELAY = 0.25
+MAX_WAIT_DELAY = 10
+
+TRANSFER_PENDING_RE = re.compile(r"^'?([^'\s]+)'? waiting to handoff (\d+) partitions", re.M)
+TRANSFER_ACTIVE_RE = re.compile(r"^\s*transfer type:", re.M)
+
+
+def get_stats(module, http_conn):
+    """ Return the decoded /stats, or None if the node did not answer """
+    (response, info) = fetch_url(module, 'http://%s/stats' % (http_conn), force=True, timeout=5)
+    if info['status'] != 200:
+        return None
+    return json.loads(response.read())
+
+
+def next_delay(delay, remaining, hint=None):
+    """ Pause before the next check
+
+    With a hint, e.g. the amount of work left, the pause follows it so the
+    checks become sub-second close to completion, without one the pause
+    doubles from MIN_WAIT_DELAY.
+    """
+    if hint is not None:
+        delay = hint
+    else:
+        delay = delay * 2
+    return max(0, min(max(delay, MIN_WAIT_DELAY), MAX_WAIT_DELAY, remaining))
+
+
+def wait_for_stats(module, http_conn, wait):
+    deadline = time.time() + wait
+    delay = MIN_WAIT_DELAY / 2
+    while True:
+        try:
+            stats = get_stats(module, http_conn)
+        except ValueError:
+            stats = None
+        if stats is not None:
+            return stats
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return None
+        delay = next_delay(delay, remaining)
+        time.sleep(delay)
+
+
+def parse_transfers(out):
+    """ Parse riak-admin transfers into pending partitions per node """
+    pending = dict((node, int(count)) for node, count in TRANSFER_PENDING_RE.findall(out))
+    return dict(pending=pending,
+                active=len(TRANSFER_ACTIVE_RE.findall(out)),
+                done='No transfers active' in out)
+
+
+def wait_handoffs(module, riak_admin_bin, wait):
+    start = time.time()
+    deadline = start + wait
+    delay = MIN_WAIT_DELAY / 2
+    progress = []
+    while True:
+        rc, out, err = module.run_command([riak_admin_bin, 'transfers'])
+        transfers = parse_transfers(out)
+        pending = sum(transfers['pending'].values())
+        if not progress or (progress[-1]['pending'], progress[-1]['active']) != (pending, transfers['active']):
+            progress.append(dict(elapsed=round(time.time() - start, 3), pending=pending,
+                                 active=transfers['active']))
+        if transfers['done']:
+            return True, progress
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return False, progress
+        # about half a second per partition still to hand off
+        delay = next_delay(delay, remaining, (pending + transfers['active']) * 0.5 or None)
+        time.sleep(delay)
+
 
 def ring_check(module, riak_admin_bin):
     cmd = '%s ringready' % riak_admin_bin
@@ -114,6 +205,19 @@ def ring_check(module, riak_admin_bin):
     else:
         return False
 
+
+def wait_ring(module, riak_admin_bin, wait):
+    deadline = time.time() + wait
+    delay = MIN_WAIT_DELAY / 2
+    while True:
+        if ring_check(module, riak_admin_bin):
+            return True
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return False
+        delay = next_delay(delay, remaining)
+        time.sleep(delay)
+
 def main():
 
     module = AnsibleModule(
@@ -145,21 +249,9 @@ def main():
     riak_bin = module.get_bin_path('riak')
     riak_admin_bin = module.get_bin_path('riak-admin')
 
-    timeout = time.time() + 120
-    while True:
-        if time.time() > timeout:
-            module.fail_json(msg='Timeout, could not fetch Riak stats.')
-        (response, info) = fetch_url(module, 'http://%s/stats' % (http_conn), force=True, timeout=5)
-        if info['status'] == 200:
-            stats_raw = response.read()
-            break
-        time.sleep(5)
-
-    # here we attempt to load those stats,
-    try:
-        stats = json.loads(stats_raw)
-    except:
-        module.fail_json(msg='Could not parse Riak stats.')
+    stats = wait_for_stats(module, http_conn, 120)
+    if stats is None:
+        module.fail_json(msg='Timeout, could not fetch Riak stats.')
 
     node_name = stats['nodename']
     nodes = stats['ring_members']
@@ -221,16 +313,11 @@ def main():
 
 # this could take a while, recommend to run in async mode
     if wait_for_handoffs:
-        timeout = time.time() + wait_for_handoffs
-        while True:
-            cmd = '%s transfers' % riak_admin_bin
-            rc, out, err = module.run_command(cmd)
-            if 'No transfers active' in out:
-                result['handoffs'] = 'No transfers active.'
-                break
-            time.sleep(10)
-            if time.time() > timeout:
-                module.fail_json(msg='Timeout waiting for handoffs.')
+        done, progress = wait_handoffs(module, riak_admin_bin, wait_for_handoffs)
+        result['handoff_progress'] = progress
+        if not done:
+            module.fail_json(msg='Timeout waiting for handoffs.', handoff_progress=progress)
+        result['handoffs'] = 'No transfers active.'
 
     if wait_for_service:
         cmd = [riak_admin_bin, 'wait_for_service', 'riak_%s' % wait_for_service, node_name ]
@@ -238,15 +325,11 @@ def main():
         result['service'] = out
 
     if wait_for_ring:
-        timeout = time.time() + wait_for_ring
-        while True:
-            if ring_check(module, riak_admin_bin):
-                break
-            time.sleep(10)
-        if time.time() > timeout:
+        if not wait_ring(module, riak_admin_bin, wait_for_ring):
             module.fail_json(msg='Timeout waiting for nodes to agree on ring.')
-
-    result['ring_ready'] = ring_check(module, riak_admin_bin)
+        result['ring_ready'] = True
+    else:
+        result['ring_ready'] = ring_check(module, riak_admin_bin)
 
     module.exit_json(**result)
 
@@ -34,7 +34,8 @@ author: "Balazs Pocze (@banyek)"
 options:
     mode:
         description:
-            - module operating mode. Could be getslave (SHOW SLAVE STATUS), getmaster (SHOW MASTER STATUS), changemaster (CHANGE MASTER TO), startslave (START SLAVE), stopslave (STOP SLAVE), resetslave (RESET SLAVE), resetslaveall (RESET SLAVE ALL)
+            - module operating mode. Could be getslave (SHOW SLAVE STATUS), getmaster (SHOW MASTER STATUS), changemaster (CHANGE MASTER TO), startslave (START SLAVE), stopslave (STOP SLAVE), resetslave (RESET SLAVE), resetslaveall (RESET SLAVE ALL), wait_for_catchup (wait until the slave has applied everything it received from the master)
+            - with wait_for_catchup, if master_gtid_set is given the server waits for it with WAIT_FOR_EXECUTED_GTID_SET, if master_log_file and master_log_pos are given it waits with MASTER_POS_WAIT, otherwise SHOW SLAVE STATUS is polled on the same connection with a backoff following the reported lag.
         required: False
         choices:
             - getslave
@@ -44,6 +45,7 @@ options:
             - startslave
             - resetslave
             - resetslaveall
+            - wait_for_catchup
         default: getslave
     login_user:
         description:
@@ -118,6 +120,25 @@ options:
         required: false
         default: null
         version_added: "2.0"
+    master_gtid_set:
+        description:
+            - GTID set the slave has to execute before wait_for_catchup returns, usually the Executed_Gtid_Set of the master
+        required: false
+        default: null
+        version_added: "2.1"
+    max_lag:
+        description:
+            - highest Seconds_Behind_Master accepted as caught up when wait_for_catchup polls the slave status.
+              With 0 the slave also has to have executed all of the relay log it read from the master.
+        required: false
+        default: 0
+        version_added: "2.1"
+    wait_timeout:
+        description:
+            - how many seconds wait_for_catchup waits before failing
+        required: false
+        default: 300
+        version_added: "2.1"
 '''
 
 EXAMPLES = '''
@@ -132,10 +153,20 @@ EXAMPLES = '''
 
 # Check slave status using port 3308
 - mysql_replication: mode=getslave login_host=ansible.example.com login_port=3308
+
+# Wait until the slave has applied everything it has read from its master
+- mysql_replication: mode=wait_for_catchup wait_timeout=60
+
+# Wait until the slave has executed the transactions of the old master before promoting it
+- mysql_replication: mode=getmaster
+  delegate_to: "{{ old_master }}"
+  register: master
+- mysql_replication: mode=wait_for_catchup master_gtid_set="{{ master.Executed_Gtid_Set }}"
 '''
 
 import ConfigParser
 import os
+import time
 import warnings
 
 try:
@@ -194,6 +225,132 @@ def start_slave(cursor):
     return started
 
 
+# bounds of the pause between two SHOW SLAVE STATUS polls in wait_for_catchup
+MIN_POLL_DELAY = 0.05
+MAX_POLL_DELAY = 5
+
+# ER_SP_DOES_NOT_EXIST, "FUNCTION ... does not exist"
+ER_SP_DOES_NOT_EXIST = 1305
+
+
+def slave_caught_up(status, max_lag):
+    """ Tell if a SHOW SLAVE STATUS row is within max_lag of its master
+
+    With max_lag 0 Seconds_Behind_Master is not trusted alone, as it only
+    has a one second resolution, and the SQL thread must also have executed
+    everything the IO thread wrote to the relay log.
+    """
+    lag = status.get('Seconds_Behind_Master')
+    if lag is None or lag > max_lag:
+        return False
+    if max_lag == 0:
+        if status.get('Relay_Master_Log_File') != status.get('Master_Log_File'):
+            return False
+        if status.get('Exec_Master_Log_Pos') != status.get('Read_Master_Log_Pos'):
+            return False
+    return True
+
+
+def slave_broken(status):
+    """ Return the error which stopped a replication thread, if any """
+    if status.get('Slave_SQL_Running') != 'Yes':
+        return status.get('Last_SQL_Error') or 'Slave SQL thread is not running'
+    if status.get('Slave_IO_Running') not in ('Yes', 'Connecting'):
+        return status.get('Last_IO_Error') or 'Slave IO thread is not running'
+    return None
+
+
+def poll_catchup(cursor, max_lag, timeout):
+    """ Poll SHOW SLAVE STATUS until the slave caught up
+
+    The pause between two polls follows the reported lag: a slave which is
+    seconds behind is not asked again immediately, while one which is
+    almost there is checked quickly, so the wait ends close to the moment
+    the slave catches up.
+    """
+    deadline = time.time() + timeout
+    delay = MIN_POLL_DELAY
+    polls = 0
+    while True:
+        status = get_slave_status(cursor)
+        polls += 1
+        if status is None:
+            return dict(failed=True, msg="Server is not configured as mysql slave", polls=polls)
+        error = slave_broken(status)
+        if error:
+            return dict(failed=True, msg="Replication is stopped: %s" % error, polls=polls)
+        if slave_caught_up(status, max_lag):
+            return dict(failed=False, polls=polls, Seconds_Behind_Master=status['Seconds_Behind_Master'])
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return dict(failed=True, msg="Timeout waiting for the slave to catch up", polls=polls,
+                        Seconds_Behind_Master=status.get('Seconds_Behind_Master'))
+        lag = status.get('Seconds_Behind_Master')
+        if lag:
+            delay = lag / 2.0
+        else:
+            delay = delay * 2
+        delay = min(max(delay, MIN_POLL_DELAY), MAX_POLL_DELAY, remaining)
+        time.sleep(delay)
+
+
+def wait_master_pos(cursor, log_file, log_pos, timeout):
+    """ Let the server block until the SQL thread reached log_file:log_pos """
+    cursor.execute("SELECT MASTER_POS_WAIT(%s, %s, %s) AS result", (log_file, log_pos, timeout))
+    result = cursor.fetchone()['result']
+    if result is None:
+        return dict(failed=True, msg="Slave SQL thread is not running or server is not configured as mysql slave")
+    if result == -1:
+        return dict(failed=True, msg="Timeout waiting for the slave to reach %s:%s" % (log_file, log_pos))
+    return dict(failed=False, events=result)
+
+
+def wait_gtid_set(cursor, gtid_set, timeout):
+    """ Let the server block until gtid_set has been executed
+
+    WAIT_FOR_EXECUTED_GTID_SET appeared in MySQL 5.7.5, older servers with
+    GTIDs only have WAIT_UNTIL_SQL_THREAD_AFTER_GTIDS.
+    """
+    try:
+        cursor.execute("SELECT WAIT_FOR_EXECUTED_GTID_SET(%s, %s) AS result", (gtid_set, timeout))
+        if cursor.fetchone()['result'] == 1:
+            return dict(failed=True, msg="Timeout waiting for the slave to execute %s" % gtid_set)
+        return dict(failed=False)
+    except MySQLdb.OperationalError, e:
+        # only a missing function means an older server
+        if e.args[0] != ER_SP_DOES_NOT_EXIST:
+            return dict(failed=True, msg="Unable to wait for %s: %s" % (gtid_set, e))
+    try:
+        cursor.execute("SELECT WAIT_UNTIL_SQL_THREAD_AFTER_GTIDS(%s, %s) AS result", (gtid_set, timeout))
+    except MySQLdb.OperationalError, e:
+        return dict(failed=True, msg="Unable to wait for %s: %s" % (gtid_set, e))
+    result = cursor.fetchone()['result']
+    if result is None:
+        return dict(failed=True, msg="Slave SQL thread is not running or GTID mode is disabled")
+    if result == -1:
+        return dict(failed=True, msg="Timeout waiting for the slave to execute %s" % gtid_set)
+    return dict(failed=False, events=result)
+
+
+def wait_for_catchup(cursor, module):
+    gtid_set = module.params["master_gtid_set"]
+    log_file = module.params["master_log_file"]
+    log_pos = module.params["master_log_pos"]
+    timeout = module.params["wait_timeout"]
+    start = time.time()
+    if gtid_set:
+        result = wait_gtid_set(cursor, gtid_set, timeout)
+        result['method'] = 'gtid'
+    elif log_file and log_pos is not None:
+        result = wait_master_pos(cursor, log_file, log_pos, timeout)
+        result['method'] = 'position'
+    else:
+        result = poll_catchup(cursor, module.params["max_lag"], timeout)
+        result['method'] = 'poll'
+    result['elapsed'] = round(time.time() - start, 3)
+    return result
+
+
 def changemaster(cursor, chm, chm_params):
     sql_param = ",".join(chm)
     query = 'CHANGE MASTER TO %s' % sql_param
@@ -267,7 +424,7 @@ def main():
             login_host=dict(default="localhost"),
             login_port=dict(default=3306, type='int'),
             login_unix_socket=dict(default=None),
-            mode=dict(default="getslave", choices=["getmaster", "getslave", "changemaster", "stopslave", "startslave", "resetslave", "resetslaveall"]),
+            mode=dict(default="getslave", choices=["getmaster", "getslave", "changemaster", "stopslave", "startslave", "resetslave", "resetslaveall", "wait_for_catchup"]),
             master_auto_position=dict(default=False, type='bool'),
             master_host=dict(default=None),
             master_user=dict(default=None),
@@ -284,6 +441,9 @@ def main():
             master_ssl_cert=dict(default=None),
             master_ssl_key=dict(default=None),
             master_ssl_cipher=dict(default=None),
+            master_gtid_set=dict(default=None),
+            max_lag=dict(default=0, type='int'),
+            wait_timeout=dict(default=300, type='int'),
         )
     )
     user = module.params["login_user"]
@@ -432,6 +592,11 @@ def main():
             module.exit_json(msg="Slave reset", changed=True)
         else:
             module.exit_json(msg="Slave already reset", changed=False)
+    elif mode == "wait_for_catchup":
+        result = wait_for_catchup(cursor, module)
+        if result.pop('failed'):
+            module.fail_json(**result)
+        module.exit_json(changed=False, **result)
 
 # import module snippets
 from ansible.module_utils.basic import *
@@ -49,6 +49,37 @@ options:
       - The password used to authenticate with.
     required: false
     default: null
+  gather_subset:
+    description:
+      - Which facts to gather, any of C(schemas), C(users), C(roles),
+        C(configuration) and C(nodes), or C(all).
+    required: false
+    default: all
+    version_added: '2.1'
+  schemas:
+    description:
+      - Only gather the facts of these schemas, filtered by the database.
+    required: false
+    default: null
+    version_added: '2.1'
+  users:
+    description:
+      - Only gather the facts of these users, filtered by the database.
+    required: false
+    default: null
+    version_added: '2.1'
+  roles:
+    description:
+      - Only gather the facts of these roles, filtered by the database.
+    required: false
+    default: null
+    version_added: '2.1'
+  parameters:
+    description:
+      - Only gather these configuration parameters, filtered by the database.
+    required: false
+    default: null
+    version_added: '2.1'
 notes:
   - The default authentication assumes that you are either logging in as or sudo'ing
     to the C(dbadmin) account on the host.
@@ -65,6 +96,13 @@ author: "Dariusz Owczarek (@dareko)"
 EXAMPLES = """
 - name: gathering vertica facts
   vertica_facts: db=db_name
+
+- name: gathering the facts of the application users and roles only
+  vertica_facts:
+    db: db_name
+    gather_subset: [users, roles]
+    users: [app_loader, app_reader]
+    roles: [app_rw, app_ro]
 """
 
 try:
@@ -74,53 +112,57 @@ except ImportError:
 else:
     pyodbc_found = True
 
+FACT_SUBSETS = ['schemas', 'users', 'roles', 'configuration', 'nodes']
+
 class NotSupportedError(Exception):
     pass
 
 # module specific functions
 
+def name_filter(column, names):
+    """ Condition restricting column to names, case insensitive, and its parameters """
+    if not names:
+        return "true", []
+    if isinstance(names, basestring):
+        names = [names]
+    return "lower({0}) in ({1})".format(column, ','.join('?' * len(names))), \
+        [name.lower() for name in names]
+
 def get_schema_facts(cursor, schema=''):
     facts = {}
+    condition, params = name_filter('s.schema_name', schema)
     cursor.execute("""
-        select schema_name, schema_owner, create_time
-        from schemata
-        where not is_system_schema and schema_name not in ('public')
-        and (? = '' or schema_name ilike ?)
-    """, schema, schema)
-    while True:
-        rows = cursor.fetchmany(100)
-        if not rows:
-            break
-        for row in rows:
-            facts[row.schema_name.lower()] = {
+        select s.schema_name, s.schema_owner, s.create_time, r.name as role_name,
+        lower(g.privileges_description) privileges_description
+        from schemata s
+        left join grants g
+        on g.object_name = s.schema_name and g.object_type='SCHEMA'
+        and g.privileges_description like '%USAGE%'
+        and g.grantee not in ('public', 'dbadmin')
+        left join roles r on g.grantee = r.name
+        where not s.is_system_schema and s.schema_name not in ('public')
+        and {0}
+    """.format(condition), params)
+    for row in cursor.fetchall():
+        schema_key = row.schema_name.lower()
+        if schema_key not in facts:
+            facts[schema_key] = {
                 'name': row.schema_name,
                 'owner': row.schema_owner,
                 'create_time': str(row.create_time),
                 'usage_roles': [],
                 'create_roles': []}
-    cursor.execute("""
-        select g.object_name as schema_name, r.name as role_name,
-        lower(g.privileges_description) privileges_description
-        from roles r join grants g
-        on g.grantee = r.name and g.object_type='SCHEMA'
-        and g.privileges_description like '%USAGE%'
-        and g.grantee not in ('public', 'dbadmin')
-        and (? = '' or g.object_name ilike ?)
-    """, schema, schema)
-    while True:
-        rows = cursor.fetchmany(100)
-        if not rows:
-            break
-        for row in rows:
-            schema_key = row.schema_name.lower()
-            if 'create' in row.privileges_description:
-                facts[schema_key]['create_roles'].append(row.role_name)
-            else:
-                facts[schema_key]['usage_roles'].append(row.role_name)
+        if row.role_name is None:
+            continue
+        if 'create' in row.privileges_description:
+            facts[schema_key]['create_roles'].append(row.role_name)
+        else:
+            facts[schema_key]['usage_roles'].append(row.role_name)
     return facts
 
 def get_user_facts(cursor, user=''):
     facts = {}
+    condition, params = name_filter('u.user_name', user)
     cursor.execute("""
         select u.user_name, u.is_locked, u.lock_time,
         p.password, p.acctexpired as is_expired,
@@ -128,68 +170,58 @@ def get_user_facts(cursor, user=''):
         u.all_roles, u.default_roles
         from users u join password_auditor p on p.user_id = u.user_id
         where not u.is_super_user
-        and (? = '' or u.user_name ilike ?)
-     """, user, user)
-    while True:
-        rows = cursor.fetchmany(100)
-        if not rows:
-            break
-        for row in rows:
-            user_key = row.user_name.lower()
-            facts[user_key] = {
-                'name': row.user_name,
-                'locked': str(row.is_locked),
-                'password': row.password,
-                'expired': str(row.is_expired),
-                'profile': row.profile_name,
-                'resource_pool': row.resource_pool,
-                'roles': [],
-                'default_roles': []}
-            if row.is_locked:
-                facts[user_key]['locked_time'] = str(row.lock_time)
-            if row.all_roles:
-                facts[user_key]['roles'] = row.all_roles.replace(' ', '').split(',')
-            if row.default_roles:
-                facts[user_key]['default_roles'] = row.default_roles.replace(' ', '').split(',')
+        and {0}
+     """.format(condition), params)
+    for row in cursor.fetchall():
+        user_key = row.user_name.lower()
+        facts[user_key] = {
+            'name': row.user_name,
+            'locked': str(row.is_locked),
+            'password': row.password,
+            'expired': str(row.is_expired),
+            'profile': row.profile_name,
+            'resource_pool': row.resource_pool,
+            'roles': [],
+            'default_roles': []}
+        if row.is_locked:
+            facts[user_key]['locked_time'] = str(row.lock_time)
+        if row.all_roles:
+            facts[user_key]['roles'] = row.all_roles.replace(' ', '').split(',')
+        if row.default_roles:
+            facts[user_key]['default_roles'] = row.default_roles.replace(' ', '').split(',')
     return facts
 
 def get_role_facts(cursor, role=''):
     facts = {}
+    condition, params = name_filter('r.name', role)
     cursor.execute("""
         select r.name, r.assigned_roles
         from roles r
-        where (? = '' or r.name ilike ?)
-    """, role, role)
-    while True:
-        rows = cursor.fetchmany(100)
-        if not rows:
-            break
-        for row in rows:
-            role_key = row.name.lower()
-            facts[role_key] = {
-                'name': row.name,
-                'assigned_roles': []}
-            if row.assigned_roles:
-                facts[role_key]['assigned_roles'] = row.assigned_roles.replace(' ', '').split(',')
+        where {0}
+    """.format(condition), params)
+    for row in cursor.fetchall():
+        role_key = row.name.lower()
+        facts[role_key] = {
+            'name': row.name,
+            'assigned_roles': []}
+        if row.assigned_roles:
+            facts[role_key]['assigned_roles'] = row.assigned_roles.replace(' ', '').split(',')
     return facts
 
 def get_configuration_facts(cursor, parameter=''):
     facts = {}
+    condition, params = name_filter('c.parameter_name', parameter)
     cursor.execute("""
         select c.parameter_name, c.current_value, c.default_value
         from configuration_parameters c
         where c.node_name = 'ALL'
-        and (? = '' or c.parameter_name ilike ?)
-    """, parameter, parameter)
-    while True:
-        rows = cursor.fetchmany(100)
-        if not rows:
-            break
-        for row in rows:
-            facts[row.parameter_name.lower()] = {
-                'parameter_name': row.parameter_name,
-                'current_value': row.current_value,
-                'default_value': row.default_value}
+        and {0}
+    """.format(condition), params)
+    for row in cursor.fetchall():
+        facts[row.parameter_name.lower()] = {
+            'parameter_name': row.parameter_name,
+            'current_value': row.current_value,
+            'default_value': row.default_value}
     return facts
 
 def get_node_facts(cursor, schema=''):
@@ -199,17 +231,13 @@ def get_node_facts(cursor, schema=''):
             catalog_path
         from nodes
     """)
-    while True:
-        rows = cursor.fetchmany(100)
-        if not rows:
-            break
-        for row in rows:
-            facts[row.node_address] = {
-                'node_name': row.node_name,
-                'export_address': row.export_address,
-                'node_state': row.node_state,
-                'node_type': row.node_type,
-                'catalog_path': row.catalog_path}
+    for row in cursor.fetchall():
+        facts[row.node_address] = {
+            'node_name': row.node_name,
+            'export_address': row.export_address,
+            'node_state': row.node_state,
+            'node_type': row.node_type,
+            'catalog_path': row.catalog_path}
     return facts
 
 # module logic
@@ -223,11 +251,20 @@ def main():
             db=dict(default=None),
             login_user=dict(default='dbadmin'),
             login_password=dict(default=None),
+            gather_subset=dict(default=['all'], type='list'),
+            schemas=dict(default=None, type='list'),
+            users=dict(default=None, type='list'),
+            roles=dict(default=None, type='list'),
+            parameters=dict(default=None, type='list'),
         ), supports_check_mode = True)
 
     if not pyodbc_found:
         module.fail_json(msg="The python pyodbc module is required.")
 
+    unknown = set(module.params['gather_subset']) - set(FACT_SUBSETS + ['all'])
+    if unknown:
+        module.fail_json(msg="Unknown gather_subset: {0}.".format(', '.join(unknown)))
+
     db = ''
     if module.params['db']:
         db = module.params['db']
@@ -250,18 +287,22 @@ def main():
     except Exception, e:
         module.fail_json(msg="Unable to connect to database: {0}.".format(e))
         
+    gather_subset = module.params['gather_subset']
+    if 'all' in gather_subset:
+        gather_subset = FACT_SUBSETS
     try:
-        schema_facts = get_schema_facts(cursor)
-        user_facts = get_user_facts(cursor)
-        role_facts = get_role_facts(cursor)
-        configuration_facts = get_configuration_facts(cursor)
-        node_facts = get_node_facts(cursor)
-        module.exit_json(changed=False,
-            ansible_facts={'vertica_schemas': schema_facts,
-                           'vertica_users': user_facts,
-                           'vertica_roles': role_facts,
-                           'vertica_configuration': configuration_facts,
-                           'vertica_nodes': node_facts})
+        facts = {}
+        if 'schemas' in gather_subset:
+            facts['vertica_schemas'] = get_schema_facts(cursor, module.params['schemas'])
+        if 'users' in gather_subset:
+            facts['vertica_users'] = get_user_facts(cursor, module.params['users'])
+        if 'roles' in gather_subset:
+            facts['vertica_roles'] = get_role_facts(cursor, module.params['roles'])
+        if 'configuration' in gather_subset:
+            facts['vertica_configuration'] = get_configuration_facts(cursor, module.params['parameters'])
+        if 'nodes' in gather_subset:
+            facts['vertica_nodes'] = get_node_facts(cursor)
+        module.exit_json(changed=False, ansible_facts=facts)
     except NotSupportedError, e:
         module.fail_json(msg=str(e))
     except SystemExit:
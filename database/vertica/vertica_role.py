@@ -27,7 +27,19 @@ options:
   name:
     description:
       - Name of the role to add or remove.
-    required: true
+      - Either I(name) or I(roles) is required.
+    required: false
+  roles:
+    description:
+      - List of roles to manage in one connection, each a hash with C(name)
+        and optionally C(assigned_roles) and C(state), with the same meaning
+        as the options of the same name.
+      - The facts are read with one query up front, and those of the changed
+        roles with one more query after the changes.
+      - A name can only be listed once.
+    required: false
+    default: null
+    version_added: '2.1'
   assigned_roles:
     description:
       - Comma separated list of roles to assign to the role.
@@ -65,6 +77,13 @@ options:
       - The password used to authenticate with.
     required: false
     default: null
+  limit_facts:
+    description:
+      - Only return the facts of the managed roles in C(vertica_roles), instead
+        of the facts of every role of the database.
+    required: false
+    default: false
+    version_added: '2.1'
 notes:
   - The default authentication assumes that you are either logging in as or sudo'ing
     to the C(dbadmin) account on the host.
@@ -84,6 +103,16 @@ EXAMPLES = """
 
 - name: creating a new vertica role with other role assigned
   vertica_role: name=role_name assigned_role=other_role_name state=present
+
+- name: managing the roles of an application at once
+  vertica_role:
+    db: db_name
+    roles:
+      - name: app_ro
+      - name: app_rw
+        assigned_roles: [app_ro]
+      - name: app_old
+        state: absent
 """
 
 try:
@@ -101,24 +130,30 @@ class CannotDropError(Exception):
 
 # module specific functions
 
+def name_filter(column, names):
+    """ Condition restricting column to names, case insensitive, and its parameters """
+    if not names:
+        return "true", []
+    if isinstance(names, basestring):
+        names = [names]
+    return "lower({0}) in ({1})".format(column, ','.join('?' * len(names))), \
+        [name.lower() for name in names]
+
 def get_role_facts(cursor, role=''):
     facts = {}
+    condition, params = name_filter('r.name', role)
     cursor.execute("""
         select r.name, r.assigned_roles
         from roles r
-        where (? = '' or r.name ilike ?)
-    """, role, role)
-    while True:
-        rows = cursor.fetchmany(100)
-        if not rows:
-            break
-        for row in rows:
-            role_key = row.name.lower()
-            facts[role_key] = {
-                'name': row.name,
-                'assigned_roles': []}
-            if row.assigned_roles:
-                facts[role_key]['assigned_roles'] = row.assigned_roles.replace(' ', '').split(',')
+        where {0}
+    """.format(condition), params)
+    for row in cursor.fetchall():
+        role_key = row.name.lower()
+        facts[role_key] = {
+            'name': row.name,
+            'assigned_roles': []}
+        if row.assigned_roles:
+            facts[role_key]['assigned_roles'] = row.assigned_roles.replace(' ', '').split(',')
     return facts
 
 def update_roles(role_facts, cursor, role,
@@ -141,7 +176,6 @@ def present(role_facts, cursor, role, assigned_roles):
     if role_key not in role_facts:
         cursor.execute("create role {0}".format(role))
         update_roles(role_facts, cursor, role, [], assigned_roles)
-        role_facts.update(get_role_facts(cursor, role))
         return True
     else:
         changed = False
@@ -149,8 +183,6 @@ def present(role_facts, cursor, role, assigned_roles):
             update_roles(role_facts, cursor, role,
                 role_facts[role_key]['assigned_roles'], assigned_roles)
             changed = True
-        if changed:
-            role_facts.update(get_role_facts(cursor, role))
         return changed
 
 def absent(role_facts, cursor, role, assigned_roles):
@@ -164,13 +196,27 @@ def absent(role_facts, cursor, role, assigned_roles):
     else:
         return False
 
+def role_settings(params):
+    """ Normalize the settings of one role, from the module or a roles entry """
+    settings = {
+        'role': params.get('role', params.get('name')),
+        'assigned_roles': [],
+        'state': params.get('state') or 'present'}
+    assigned_roles = params.get('assigned_roles', params.get('assigned_role'))
+    if assigned_roles:
+        if isinstance(assigned_roles, basestring):
+            assigned_roles = assigned_roles.split(',')
+        settings['assigned_roles'] = filter(None, assigned_roles)
+    return settings
+
 # module logic
 
 def main():
 
     module = AnsibleModule(
         argument_spec=dict(
-            role=dict(required=True, aliases=['name']),
+            role=dict(default=None, aliases=['name']),
+            roles=dict(default=None, type='list'),
             assigned_roles=dict(default=None, aliases=['assigned_role']),
             state=dict(default='present', choices=['absent', 'present']),
             db=dict(default=None),
@@ -178,23 +224,32 @@ def main():
             port=dict(default='5433'),
             login_user=dict(default='dbadmin'),
             login_password=dict(default=None),
-        ), supports_check_mode = True)
+            limit_facts=dict(type='bool', default=False),
+        ),
+        required_one_of=[['role', 'roles']],
+        mutually_exclusive=[['role', 'roles']],
+        supports_check_mode = True)
 
     if not pyodbc_found:
         module.fail_json(msg="The python pyodbc module is required.")
 
-    role = module.params['role']
-    assigned_roles = []
-    if module.params['assigned_roles']:
-        assigned_roles = module.params['assigned_roles'].split(',')
-        assigned_roles = filter(None, assigned_roles)
-    state = module.params['state']
+    if module.params['roles']:
+        roles = []
+        for entry in module.params['roles']:
+            if not isinstance(entry, dict) or not entry.get('name'):
+                module.fail_json(msg="Every entry of roles must be a hash with a name, got {0}.".format(entry))
+            if entry['name'].lower() in [settings['role'].lower() for settings in roles]:
+                module.fail_json(msg="Role {0} is listed more than once in roles.".format(entry['name']))
+            roles.append(role_settings(entry))
+            if roles[-1]['state'] not in ['absent', 'present']:
+                module.fail_json(msg="Invalid state {0} for role {1}.".format(roles[-1]['state'], entry['name']))
+    else:
+        roles = [role_settings(module.params)]
+
     db = ''
     if module.params['db']:
         db = module.params['db']
 
-    changed = False
-
     try:
         dsn = (
             "Driver=Vertica;"
@@ -211,31 +266,51 @@ def main():
     except Exception, e:
         module.fail_json(msg="Unable to connect to database: {0}.".format(e))
 
+    results = []
+    role_facts = {}
     try:
-        role_facts = get_role_facts(cursor)
-        if module.check_mode:
-            changed = not check(role_facts, role, assigned_roles)
-        elif state == 'absent':
-            try:
-                changed = absent(role_facts, cursor, role, assigned_roles)
-            except pyodbc.Error, e:
-                module.fail_json(msg=str(e))
-        elif state == 'present':
-            try:
-                changed = present(role_facts, cursor, role, assigned_roles)
-            except pyodbc.Error, e:
-                module.fail_json(msg=str(e))
+        # one query for all the roles handled, kept up to date as they change
+        if module.params['limit_facts']:
+            role_facts = get_role_facts(cursor, [settings['role'] for settings in roles])
+        else:
+            role_facts = get_role_facts(cursor)
+        changed_roles = []
+        for settings in roles:
+            role = settings['role']
+            if module.check_mode:
+                if settings['state'] == 'absent':
+                    role_changed = role.lower() in role_facts
+                else:
+                    role_changed = not check(role_facts, role, settings['assigned_roles'])
+            elif settings['state'] == 'absent':
+                try:
+                    role_changed = absent(role_facts, cursor, role, settings['assigned_roles'])
+                except pyodbc.Error, e:
+                    module.fail_json(msg=str(e), roles=results)
+            else:
+                try:
+                    role_changed = present(role_facts, cursor, role, settings['assigned_roles'])
+                except pyodbc.Error, e:
+                    module.fail_json(msg=str(e), roles=results)
+                if role_changed:
+                    changed_roles.append(role)
+            results.append({'role': role, 'changed': role_changed})
+        if changed_roles:
+            role_facts.update(get_role_facts(cursor, changed_roles))
     except NotSupportedError, e:
-        module.fail_json(msg=str(e), ansible_facts={'vertica_roles': role_facts})
+        module.fail_json(msg=str(e), roles=results, ansible_facts={'vertica_roles': role_facts})
     except CannotDropError, e:
-        module.fail_json(msg=str(e), ansible_facts={'vertica_roles': role_facts})
+        module.fail_json(msg=str(e), roles=results, ansible_facts={'vertica_roles': role_facts})
     except SystemExit:
         # avoid catching this on python 2.4
         raise
     except Exception, e:
         module.fail_json(msg=e)
 
-    module.exit_json(changed=changed, role=role, ansible_facts={'vertica_roles': role_facts})
+    changed = len([result for result in results if result['changed']]) > 0
+    if module.params['roles']:
+        module.exit_json(changed=changed, roles=results, ansible_facts={'vertica_roles': role_facts})
+    module.exit_json(changed=changed, role=roles[0]['role'], ansible_facts={'vertica_roles': role_facts})
 
 # import ansible utilities
 from ansible.module_utils.basic import *
@@ -32,7 +32,19 @@ options:
   name:
     description:
       - Name of the schema to add or remove.
-    required: true
+      - Either I(name) or I(schemas) is required.
+    required: false
+  schemas:
+    description:
+      - List of schemas to manage in one connection, each a hash with C(name)
+        and optionally C(usage_roles), C(create_roles), C(owner) and C(state),
+        with the same meaning as the options of the same name.
+      - The facts are read with one query up front, and those of the changed
+        schemas with one more query after the changes.
+      - A name can only be listed once.
+    required: false
+    default: null
+    version_added: '2.1'
   usage_roles:
     description:
       - Comma separated list of roles to create and grant usage access to the schema.
@@ -81,6 +93,13 @@ options:
       - The password used to authenticate with.
     required: false
     default: null
+  limit_facts:
+    description:
+      - Only return the facts of the managed schemas in C(vertica_schemas), instead
+        of the facts of every schema of the database.
+    required: false
+    default: false
+    version_added: '2.1'
 notes:
   - The default authentication assumes that you are either logging in as or sudo'ing
     to the C(dbadmin) account on the host.
@@ -108,6 +127,19 @@ EXAMPLES = """
     usage_roles=schema_name_ro,schema_name_rw
     db=db_name
     state=present
+
+- name: managing the schemas of an application at once
+  vertica_schema:
+    db: db_name
+    schemas:
+      - name: app_data
+        owner: dbowner
+        create_roles: [app_data_all]
+        usage_roles: [app_data_ro, app_data_rw]
+      - name: app_staging
+        usage_roles: [app_data_rw]
+      - name: app_old
+        state: absent
 """
 
 try:
@@ -125,44 +157,45 @@ class CannotDropError(Exception):
 
 # module specific functions
 
+def name_filter(column, names):
+    """ Condition restricting column to names, case insensitive, and its parameters """
+    if not names:
+        return "true", []
+    if isinstance(names, basestring):
+        names = [names]
+    return "lower({0}) in ({1})".format(column, ','.join('?' * len(names))), \
+        [name.lower() for name in names]
+
 def get_schema_facts(cursor, schema=''):
     facts = {}
+    condition, params = name_filter('s.schema_name', schema)
     cursor.execute("""
-        select schema_name, schema_owner, create_time
-        from schemata
-        where not is_system_schema and schema_name not in ('public', 'TxtIndex')
-        and (? = '' or schema_name ilike ?)
-    """, schema, schema)
-    while True:
-        rows = cursor.fetchmany(100)
-        if not rows:
-            break
-        for row in rows:
-            facts[row.schema_name.lower()] = {
+        select s.schema_name, s.schema_owner, s.create_time, r.name as role_name,
+        lower(g.privileges_description) privileges_description
+        from schemata s
+        left join grants g
+        on g.object_name = s.schema_name and g.object_type='SCHEMA'
+        and g.privileges_description like '%USAGE%'
+        and g.grantee not in ('public', 'dbadmin')
+        left join roles r on g.grantee_id = r.role_id
+        where not s.is_system_schema and s.schema_name not in ('public', 'TxtIndex')
+        and {0}
+    """.format(condition), params)
+    for row in cursor.fetchall():
+        schema_key = row.schema_name.lower()
+        if schema_key not in facts:
+            facts[schema_key] = {
                 'name': row.schema_name,
                 'owner': row.schema_owner,
                 'create_time': str(row.create_time),
                 'usage_roles': [],
                 'create_roles': []}
-    cursor.execute("""
-        select g.object_name as schema_name, r.name as role_name,
-        lower(g.privileges_description) privileges_description
-        from roles r join grants g
-        on g.grantee_id = r.role_id and g.object_type='SCHEMA'
-        and g.privileges_description like '%USAGE%'
-        and g.grantee not in ('public', 'dbadmin')
-        and (? = '' or g.object_name ilike ?)
-    """, schema, schema)
-    while True:
-        rows = cursor.fetchmany(100)
-        if not rows:
-            break
-        for row in rows:
-            schema_key = row.schema_name.lower()
-            if 'create' in row.privileges_description:
-                facts[schema_key]['create_roles'].append(row.role_name)
-            else:
-                facts[schema_key]['usage_roles'].append(row.role_name)
+        if row.role_name is None:
+            continue
+        if 'create' in row.privileges_description:
+            facts[schema_key]['create_roles'].append(row.role_name)
+        else:
+            facts[schema_key]['usage_roles'].append(row.role_name)
     return facts
 
 def update_roles(schema_facts, cursor, schema,
@@ -198,7 +231,6 @@ def present(schema_facts, cursor, schema, usage_roles, create_roles, owner):
             query_fragments.append("authorization {0}".format(owner))
         cursor.execute(' '.join(query_fragments))
         update_roles(schema_facts, cursor, schema, [], usage_roles, [], create_roles)
-        schema_facts.update(get_schema_facts(cursor, schema))
         return True
     else:
         changed = False
@@ -213,8 +245,6 @@ def present(schema_facts, cursor, schema, usage_roles, create_roles, owner):
                 schema_facts[schema_key]['usage_roles'], usage_roles,
                 schema_facts[schema_key]['create_roles'], create_roles)
             changed = True
-        if changed:
-            schema_facts.update(get_schema_facts(cursor, schema))
         return changed
 
 def absent(schema_facts, cursor, schema, usage_roles, create_roles):
@@ -231,13 +261,30 @@ def absent(schema_facts, cursor, schema, usage_roles, create_roles):
     else:
         return False
 
+def schema_settings(params):
+    """ Normalize the settings of one schema, from the module or a schemas entry """
+    settings = {
+        'schema': params.get('schema', params.get('name')),
+        'usage_roles': [],
+        'create_roles': [],
+        'owner': params.get('owner'),
+        'state': params.get('state') or 'present'}
+    for key in ['usage_roles', 'create_roles']:
+        roles = params.get(key, params.get(key[:-1]))
+        if roles:
+            if isinstance(roles, basestring):
+                roles = roles.split(',')
+            settings[key] = filter(None, roles)
+    return settings
+
 # module logic
 
 def main():
 
     module = AnsibleModule(
         argument_spec=dict(
-            schema=dict(required=True, aliases=['name']),
+            schema=dict(default=None, aliases=['name']),
+            schemas=dict(default=None, type='list'),
             usage_roles=dict(default=None, aliases=['usage_role']),
             create_roles=dict(default=None, aliases=['create_role']),
             owner=dict(default=None),
@@ -247,28 +294,32 @@ def main():
             port=dict(default='5433'),
             login_user=dict(default='dbadmin'),
             login_password=dict(default=None),
-        ), supports_check_mode = True)
+            limit_facts=dict(type='bool', default=False),
+        ),
+        required_one_of=[['schema', 'schemas']],
+        mutually_exclusive=[['schema', 'schemas']],
+        supports_check_mode = True)
 
     if not pyodbc_found:
         module.fail_json(msg="The python pyodbc module is required.")
 
-    schema = module.params['schema']
-    usage_roles = []
-    if module.params['usage_roles']:
-        usage_roles = module.params['usage_roles'].split(',')
-        usage_roles = filter(None, usage_roles)
-    create_roles = []
-    if module.params['create_roles']:
-        create_roles = module.params['create_roles'].split(',')
-        create_roles = filter(None, create_roles)
-    owner = module.params['owner']
-    state = module.params['state']
+    if module.params['schemas']:
+        schemas = []
+        for entry in module.params['schemas']:
+            if not isinstance(entry, dict) or not entry.get('name'):
+                module.fail_json(msg="Every entry of schemas must be a hash with a name, got {0}.".format(entry))
+            if entry['name'].lower() in [settings['schema'].lower() for settings in schemas]:
+                module.fail_json(msg="Schema {0} is listed more than once in schemas.".format(entry['name']))
+            schemas.append(schema_settings(entry))
+            if schemas[-1]['state'] not in ['absent', 'present']:
+                module.fail_json(msg="Invalid state {0} for schema {1}.".format(schemas[-1]['state'], entry['name']))
+    else:
+        schemas = [schema_settings(module.params)]
+
     db = ''
     if module.params['db']:
         db = module.params['db']
 
-    changed = False
-
     try:
         dsn = (
             "Driver=Vertica;"
@@ -285,31 +336,54 @@ def main():
     except Exception, e:
         module.fail_json(msg="Unable to connect to database: {0}.".format(e))
 
+    results = []
+    schema_facts = {}
     try:
-        schema_facts = get_schema_facts(cursor)
-        if module.check_mode:
-            changed = not check(schema_facts, schema, usage_roles, create_roles, owner)
-        elif state == 'absent':
-            try:
-                changed = absent(schema_facts, cursor, schema, usage_roles, create_roles)
-            except pyodbc.Error, e:
-                module.fail_json(msg=str(e))
-        elif state == 'present':
-            try:
-                changed = present(schema_facts, cursor, schema, usage_roles, create_roles, owner)
-            except pyodbc.Error, e:
-                module.fail_json(msg=str(e))
+        # one query for all the schemas handled, kept up to date as they change
+        if module.params['limit_facts']:
+            schema_facts = get_schema_facts(cursor, [settings['schema'] for settings in schemas])
+        else:
+            schema_facts = get_schema_facts(cursor)
+        changed_schemas = []
+        for settings in schemas:
+            schema = settings['schema']
+            if module.check_mode:
+                if settings['state'] == 'absent':
+                    schema_changed = schema.lower() in schema_facts
+                else:
+                    schema_changed = not check(schema_facts, schema, settings['usage_roles'],
+                        settings['create_roles'], settings['owner'])
+            elif settings['state'] == 'absent':
+                try:
+                    schema_changed = absent(schema_facts, cursor, schema, settings['usage_roles'],
+                        settings['create_roles'])
+                except pyodbc.Error, e:
+                    module.fail_json(msg=str(e), schemas=results)
+            else:
+                try:
+                    schema_changed = present(schema_facts, cursor, schema, settings['usage_roles'],
+                        settings['create_roles'], settings['owner'])
+                except pyodbc.Error, e:
+                    module.fail_json(msg=str(e), schemas=results)
+                if schema_changed:
+                    changed_schemas.append(schema)
+            results.append({'schema': schema, 'changed': schema_changed})
+        if changed_schemas:
+            schema_facts.update(get_schema_facts(cursor, changed_schemas))
     except NotSupportedError, e:
-        module.fail_json(msg=str(e), ansible_facts={'vertica_schemas': schema_facts})
+        module.fail_json(msg=str(e), schemas=results, ansible_facts={'vertica_schemas': schema_facts})
     except CannotDropError, e:
-        module.fail_json(msg=str(e), ansible_facts={'vertica_schemas': schema_facts})
+        module.fail_json(msg=str(e), schemas=results, ansible_facts={'vertica_schemas': schema_facts})
     except SystemExit:
         # avoid catching this on python 2.4
         raise
     except Exception, e:
         module.fail_json(msg=e)
 
-    module.exit_json(changed=changed, schema=schema, ansible_facts={'vertica_schemas': schema_facts})
+    changed = len([result for result in results if result['changed']]) > 0
+    if module.params['schemas']:
+        module.exit_json(changed=changed, schemas=results, ansible_facts={'vertica_schemas': schema_facts})
+    module.exit_json(changed=changed, schema=schemas[0]['schema'], ansible_facts={'vertica_schemas': schema_facts})
 
 # import ansible utilities
 from ansible.module_utils.basic import *
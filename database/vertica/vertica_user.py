@@ -30,7 +30,20 @@ options:
   name:
     description:
       - Name of the user to add or remove.
-    required: true
+      - Either I(name) or I(users) is required.
+    required: false
+  users:
+    description:
+      - List of users to manage in one connection, each a hash with C(name)
+        and optionally C(profile), C(resource_pool), C(password), C(expired),
+        C(ldap), C(roles) and C(state), with the same meaning as the options
+        of the same name.
+      - The facts are read with one query up front, and those of the changed
+        users with one more query after the changes.
+      - A name can only be listed once.
+    required: false
+    default: null
+    version_added: '2.1'
   profile:
     description:
       - Sets the user's profile.
@@ -97,6 +110,13 @@ options:
       - The password used to authenticate with.
     required: false
     default: null
+  limit_facts:
+    description:
+      - Only return the facts of the managed users in C(vertica_users), instead
+        of the facts of every user of the database.
+    required: false
+    default: false
+    version_added: '2.1'
 notes:
   - The default authentication assumes that you are either logging in as or sudo'ing
     to the C(dbadmin) account on the host.
@@ -121,6 +141,19 @@ EXAMPLES = """
     db=db_name
     roles=schema_name_ro
     state=present
+
+- name: managing the users of an application at once
+  vertica_user:
+    db: db_name
+    users:
+      - name: app_loader
+        password: md5<encrypted_password>
+        roles: [app_rw]
+      - name: app_reader
+        ldap: true
+        roles: [app_ro]
+      - name: old_loader
+        state: absent
 """
 
 try:
@@ -138,8 +171,18 @@ class CannotDropError(Exception):
 
 # module specific functions
 
+def name_filter(column, names):
+    """ Condition restricting column to names, case insensitive, and its parameters """
+    if not names:
+        return "true", []
+    if isinstance(names, basestring):
+        names = [names]
+    return "lower({0}) in ({1})".format(column, ','.join('?' * len(names))), \
+        [name.lower() for name in names]
+
 def get_user_facts(cursor, user=''):
     facts = {}
+    condition, params = name_filter('u.user_name', user)
     cursor.execute("""
         select u.user_name, u.is_locked, u.lock_time,
         p.password, p.acctexpired as is_expired,
@@ -147,29 +190,25 @@ def get_user_facts(cursor, user=''):
         u.all_roles, u.default_roles
         from users u join password_auditor p on p.user_id = u.user_id
         where not u.is_super_user
-        and (? = '' or u.user_name ilike ?)
-    """, user, user)
-    while True:
-        rows = cursor.fetchmany(100)
-        if not rows:
-            break
-        for row in rows:
-            user_key = row.user_name.lower()
-            facts[user_key] = {
-                'name': row.user_name,
-                'locked': str(row.is_locked),
-                'password': row.password,
-                'expired': str(row.is_expired),
-                'profile': row.profile_name,
-                'resource_pool': row.resource_pool,
-                'roles': [],
-                'default_roles': []}
-            if row.is_locked:
-                facts[user_key]['locked_time'] = str(row.lock_time)
-            if row.all_roles:
-                facts[user_key]['roles'] = row.all_roles.replace(' ', '').split(',')
-            if row.default_roles:
-                facts[user_key]['default_roles'] = row.default_roles.replace(' ', '').split(',')
+        and {0}
+    """.format(condition), params)
+    for row in cursor.fetchall():
+        user_key = row.user_name.lower()
+        facts[user_key] = {
+            'name': row.user_name,
+            'locked': str(row.is_locked),
+            'password': row.password,
+            'expired': str(row.is_expired),
+            'profile': row.profile_name,
+            'resource_pool': row.resource_pool,
+            'roles': [],
+            'default_roles': []}
+        if row.is_locked:
+            facts[user_key]['locked_time'] = str(row.lock_time)
+        if row.all_roles:
+            facts[user_key]['roles'] = row.all_roles.replace(' ', '').split(',')
+        if row.default_roles:
+            facts[user_key]['default_roles'] = row.default_roles.replace(' ', '').split(',')
     return facts
 
 def update_roles(user_facts, cursor, user,
@@ -227,7 +266,6 @@ def present(user_facts, cursor, user, profile, resource_pool,
             cursor.execute("grant usage on resource pool {0} to {1}".format(
                 resource_pool, user))
         update_roles(user_facts, cursor, user, [], [], roles)
-        user_facts.update(get_user_facts(cursor, user))
         return True
     else:
         changed = False
@@ -271,8 +309,6 @@ def present(user_facts, cursor, user, profile, resource_pool,
             update_roles(user_facts, cursor, user,
                 user_facts[user_key]['roles'], user_facts[user_key]['default_roles'], roles)
             changed = True
-        if changed:
-            user_facts.update(get_user_facts(cursor, user))
         return changed
 
 def absent(user_facts, cursor, user, roles):
@@ -289,13 +325,36 @@ def absent(user_facts, cursor, user, roles):
     else:
         return False
 
+def user_settings(params):
+    """ Normalize the settings of one user, from the module or a users entry """
+    settings = {
+        'user': params.get('user', params.get('name')),
+        'profile': params.get('profile'),
+        'resource_pool': params.get('resource_pool'),
+        'password': params.get('password'),
+        'expired': params.get('expired'),
+        'ldap': params.get('ldap'),
+        'roles': [],
+        'state': params.get('state') or 'present'}
+    if settings['profile']:
+        settings['profile'] = settings['profile'].lower()
+    if settings['resource_pool']:
+        settings['resource_pool'] = settings['resource_pool'].lower()
+    roles = params.get('roles', params.get('role'))
+    if roles:
+        if isinstance(roles, basestring):
+            roles = roles.split(',')
+        settings['roles'] = filter(None, roles)
+    return settings
+
 # module logic
 
 def main():
 
     module = AnsibleModule(
         argument_spec=dict(
-            user=dict(required=True, aliases=['name']),
+            user=dict(default=None, aliases=['name']),
+            users=dict(default=None, type='list'),
             profile=dict(default=None),
             resource_pool=dict(default=None),
             password=dict(default=None),
@@ -308,36 +367,35 @@ def main():
             port=dict(default='5433'),
             login_user=dict(default='dbadmin'),
             login_password=dict(default=None),
-        ), supports_check_mode = True)
+            limit_facts=dict(type='bool', default=False),
+        ),
+        required_one_of=[['user', 'users']],
+        mutually_exclusive=[['user', 'users']],
+        supports_check_mode = True)
 
     if not pyodbc_found:
         module.fail_json(msg="The python pyodbc module is required.")
 
-    user = module.params['user']
-    profile = module.params['profile']
-    if profile:
-        profile = profile.lower()
-    resource_pool = module.params['resource_pool']
-    if resource_pool:
-        resource_pool = resource_pool.lower()
-    password = module.params['password']
-    expired = module.params['expired']
-    ldap = module.params['ldap']
-    roles = []
-    if module.params['roles']:
-        roles = module.params['roles'].split(',')
-        roles = filter(None, roles)
-    state = module.params['state']
-    if state == 'locked':
-        locked = True
+    if module.params['users']:
+        users = []
+        for entry in module.params['users']:
+            if not isinstance(entry, dict) or not entry.get('name'):
+                module.fail_json(msg="Every entry of users must be a hash with a name, got {0}.".format(entry))
+            if entry['name'].lower() in [settings['user'].lower() for settings in users]:
+                module.fail_json(msg="User {0} is listed more than once in users.".format(entry['name']))
+            users.append(user_settings(entry))
+            for key in ['expired', 'ldap']:
+                if users[-1][key] is not None:
+                    users[-1][key] = module.boolean(users[-1][key])
+            if users[-1]['state'] not in ['absent', 'present', 'locked']:
+                module.fail_json(msg="Invalid state {0} for user {1}.".format(users[-1]['state'], entry['name']))
     else:
-        locked = False
+        users = [user_settings(module.params)]
+
     db = ''
     if module.params['db']:
         db = module.params['db']
 
-    changed = False
-
     try:
         dsn = (
             "Driver=Vertica;"
@@ -354,33 +412,54 @@ def main():
     except Exception, e:
         module.fail_json(msg="Unable to connect to database: {0}.".format(e))
 
+    results = []
+    user_facts = {}
     try:
-        user_facts = get_user_facts(cursor)
-        if module.check_mode:
-            changed = not check(user_facts, user, profile, resource_pool,
-                locked, password, expired, ldap, roles)
-        elif state == 'absent':
-            try:
-                changed = absent(user_facts, cursor, user, roles)
-            except pyodbc.Error, e:
-                module.fail_json(msg=str(e))
-        elif state in ['present', 'locked']:
-            try:
-                changed = present(user_facts, cursor, user, profile, resource_pool,
-                    locked, password, expired, ldap, roles)
-            except pyodbc.Error, e:
-                module.fail_json(msg=str(e))
+        # one query for all the users handled, kept up to date as they change
+        if module.params['limit_facts']:
+            user_facts = get_user_facts(cursor, [settings['user'] for settings in users])
+        else:
+            user_facts = get_user_facts(cursor)
+        changed_users = []
+        for settings in users:
+            user = settings['user']
+            locked = settings['state'] == 'locked'
+            if module.check_mode:
+                if settings['state'] == 'absent':
+                    user_changed = user.lower() in user_facts
+                else:
+                    user_changed = not check(user_facts, user, settings['profile'], settings['resource_pool'],
+                        locked, settings['password'], settings['expired'], settings['ldap'], settings['roles'])
+            elif settings['state'] == 'absent':
+                try:
+                    user_changed = absent(user_facts, cursor, user, settings['roles'])
+                except pyodbc.Error, e:
+                    module.fail_json(msg=str(e), users=results)
+            else:
+                try:
+                    user_changed = present(user_facts, cursor, user, settings['profile'], settings['resource_pool'],
+                        locked, settings['password'], settings['expired'], settings['ldap'], settings['roles'])
+                except pyodbc.Error, e:
+                    module.fail_json(msg=str(e), users=results)
+                if user_changed:
+                    changed_users.append(user)
+            results.append({'user': user, 'changed': user_changed})
+        if changed_users:
+            user_facts.update(get_user_facts(cursor, changed_users))
     except NotSupportedError, e:
-        module.fail_json(msg=str(e), ansible_facts={'vertica_users': user_facts})
+        module.fail_json(msg=str(e), users=results, ansible_facts={'vertica_users': user_facts})
     except CannotDropError, e:
-        module.fail_json(msg=str(e), ansible_facts={'vertica_users': user_facts})
+        module.fail_json(msg=str(e), users=results, ansible_facts={'vertica_users': user_facts})
     except SystemExit:
         # avoid catching this on python 2.4
         raise
     except Exception, e:
         module.fail_json(msg=e)
 
-    module.exit_json(changed=changed, user=user, ansible_facts={'vertica_users': user_facts})
+    changed = len([result for result in results if result['changed']]) > 0
+    if module.params['users']:
+        module.exit_json(changed=changed, users=results, ansible_facts={'vertica_users': user_facts})
+    module.exit_json(changed=changed, user=users[0]['user'], ansible_facts={'vertica_users': user_facts})
 
 # import ansible utilities
 from ansible.module_utils.basic import *
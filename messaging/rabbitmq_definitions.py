@@ -0,0 +1,359 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+DOCUMENTATION = '''
+---
+module: rabbitmq_definitions
+author:
+    - "Chris Hoffman (@chrishoffman)"
+    - "John Dewey (@retr0h)"
+version_added: "2.1"
+
+short_description: Manage many RabbitMQ users, vhosts, permissions, policies and parameters at once
+description:
+  - This module uses the RabbitMQ management HTTP API to converge lists of
+    users, vhosts, permissions, policies and parameters in one invocation.
+  - The current definitions are fetched once from C(/api/definitions), the
+    desired objects are compared in memory and only the objects that differ
+    are created, updated or deleted. Unlike M(rabbitmq_user),
+    M(rabbitmq_vhost), M(rabbitmq_policy) and M(rabbitmq_parameter) no
+    C(rabbitmqctl) process is spawned.
+requirements: [ python requests ]
+options:
+    login_user:
+        description:
+            - rabbitMQ user for connection
+        required: false
+        default: guest
+    login_password:
+        description:
+            - rabbitMQ password for connection
+        required: false
+        default: guest
+    login_host:
+        description:
+            - rabbitMQ host for connection
+        required: false
+        default: localhost
+    login_port:
+        description:
+            - rabbitMQ management api port
+        required: false
+        default: 15672
+    vhosts:
+        description:
+            - list of vhosts, each a hash with C(name) and optional C(tracing)
+              and C(state) (present or absent) keys.
+        required: false
+        default: []
+    users:
+        description:
+            - list of users, each a hash with C(name) and optional C(password),
+              C(tags) (list or comma separated string), C(force) and C(state)
+              keys. The password of an existing user is only changed when
+              C(force) is set, as the API does not allow comparing it.
+        required: false
+        default: []
+    permissions:
+        description:
+            - list of permissions, each a hash with C(user) and optional
+              C(vhost) (default /), C(configure_priv), C(write_priv),
+              C(read_priv) (default ^$) and C(state) keys.
+        required: false
+        default: []
+    policies:
+        description:
+            - list of policies, each a hash with C(name), C(pattern),
+              C(definition) (alias C(tags)) and optional C(vhost), C(priority),
+              C(apply_to) and C(state) keys.
+        required: false
+        default: []
+    parameters:
+        description:
+            - list of parameters, each a hash with C(component), C(name),
+              C(value) (a JSON term or a structure) and optional C(vhost) and
+              C(state) keys.
+        required: false
+        default: []
+notes:
+    - Plugins can not be enabled through the management API, use
+      M(rabbitmq_plugin) for them.
+'''
+
+EXAMPLES = '''
+# Create an application vhost with its user, permissions and HA policy
+- rabbitmq_definitions:
+    login_user: admin
+    login_password: secret
+    vhosts:
+      - name: /app
+    users:
+      - name: app
+        password: changeme
+        tags: monitoring
+      - name: olduser
+        state: absent
+    permissions:
+      - user: app
+        vhost: /app
+        configure_priv: .*
+        read_priv: .*
+        write_priv: .*
+    policies:
+      - name: HA
+        vhost: /app
+        pattern: .*
+        definition:
+          ha-mode: all
+    parameters:
+      - component: federation-upstream
+        name: origin
+        vhost: /app
+        value: '{"uri": "amqp://origin.example.com"}'
+'''
+
+import requests
+import urllib
+import json
+
+
+class RabbitMqDefinitions(object):
+    def __init__(self, module):
+        self.module = module
+        self.base_url = "http://%s:%s/api" % (module.params['login_host'], module.params['login_port'])
+        # one keep-alive session for the read and all following changes
+        self.session = requests.Session()
+        self.session.auth = (module.params['login_user'], module.params['login_password'])
+        self.session.headers.update({"content-type": "application/json"})
+        self.changes = []
+        self._vhost_tracing = None
+
+    def _url(self, *parts):
+        return '/'.join([self.base_url] + [urllib.quote(part, '') for part in parts])
+
+    def _request(self, method, url, data=None):
+        if data is not None:
+            data = json.dumps(data)
+        r = self.session.request(method, url, data=data)
+        if r.status_code not in (200, 201, 204):
+            self.module.fail_json(
+                msg = "Invalid response from RESTAPI for %s %s" % (method, url),
+                status = r.status_code,
+                details = r.text
+            )
+        return r
+
+    def get_definitions(self):
+        definitions = self._request('GET', self.base_url + '/definitions').json()
+        self.users = dict((u['name'], u) for u in definitions.get('users', []))
+        self.vhosts = dict((v['name'], v) for v in definitions.get('vhosts', []))
+        self.permissions = dict(((p['vhost'], p['user']), p) for p in definitions.get('permissions', []))
+        self.policies = dict(((p['vhost'], p['name']), p) for p in definitions.get('policies', []))
+        self.parameters = dict(((p['vhost'], p['component'], p['name']), p) for p in definitions.get('parameters', []))
+
+    def vhost_tracing(self, name):
+        # tracing is not part of the definitions, read it only when asked for
+        if self._vhost_tracing is None:
+            vhosts = self._request('GET', self.base_url + '/vhosts').json()
+            self._vhost_tracing = dict((v['name'], v.get('tracing', False)) for v in vhosts)
+        return self._vhost_tracing.get(name, False)
+
+    def _change(self, kind, name, action, method, url, data=None):
+        self.changes.append(dict(type=kind, name=name, action=action))
+        if not self.module.check_mode:
+            self._request(method, url, data)
+
+    def sync_vhosts(self, vhosts, state):
+        for vhost in vhosts:
+            name = vhost['name']
+            if vhost.get('state', 'present') != state:
+                continue
+            url = self._url('vhosts', name)
+            if state == 'absent':
+                if name in self.vhosts:
+                    self._change('vhost', name, 'delete', 'DELETE', url)
+                continue
+            tracing = self.module.boolean(vhost.get('tracing', False))
+            if name not in self.vhosts:
+                self._change('vhost', name, 'create', 'PUT', url, {'tracing': tracing})
+            elif 'tracing' in vhost and self.vhost_tracing(name) != tracing:
+                self._change('vhost', name, 'update', 'PUT', url, {'tracing': tracing})
+
+    def sync_users(self, users, state):
+        for user in users:
+            name = user['name']
+            if user.get('state', 'present') != state:
+                continue
+            url = self._url('users', name)
+            existing = self.users.get(name)
+            if state == 'absent':
+                if existing:
+                    self._change('user', name, 'delete', 'DELETE', url)
+                continue
+            tags = user.get('tags') or []
+            if not isinstance(tags, list):
+                tags = [tag for tag in tags.split(',') if tag]
+            data = {'tags': ','.join(tags)}
+            if existing is None or self.module.boolean(user.get('force', False)):
+                data['password'] = user.get('password') or ''
+                action = existing is None and 'create' or 'update'
+                self._change('user', name, action, 'PUT', url, data)
+                continue
+            existing_tags = existing.get('tags') or []
+            if not isinstance(existing_tags, list):
+                existing_tags = [tag for tag in existing_tags.split(',') if tag]
+            if set(existing_tags) != set(tags):
+                # keep the stored password, the API clears it when omitted
+                data['password_hash'] = existing.get('password_hash', '')
+                if 'hashing_algorithm' in existing:
+                    data['hashing_algorithm'] = existing['hashing_algorithm']
+                self._change('user', name, 'update', 'PUT', url, data)
+
+    def sync_permissions(self, permissions, state):
+        for permission in permissions:
+            user = permission['user']
+            vhost = permission.get('vhost', '/')
+            if permission.get('state', 'present') != state:
+                continue
+            url = self._url('permissions', vhost, user)
+            existing = self.permissions.get((vhost, user))
+            name = '%s@%s' % (user, vhost)
+            if state == 'absent':
+                if existing:
+                    self._change('permission', name, 'delete', 'DELETE', url)
+                continue
+            data = {
+                'configure': permission.get('configure_priv', '^$'),
+                'write': permission.get('write_priv', '^$'),
+                'read': permission.get('read_priv', '^$'),
+            }
+            if existing is None:
+                self._change('permission', name, 'create', 'PUT', url, data)
+            elif [k for k in data if existing.get(k) != data[k]]:
+                self._change('permission', name, 'update', 'PUT', url, data)
+
+    def sync_policies(self, policies, state):
+        for policy in policies:
+            name = policy['name']
+            vhost = policy.get('vhost', '/')
+            if policy.get('state', 'present') != state:
+                continue
+            url = self._url('policies', vhost, name)
+            existing = self.policies.get((vhost, name))
+            if state == 'absent':
+                if existing:
+                    self._change('policy', name, 'delete', 'DELETE', url)
+                continue
+            data = {
+                'pattern': policy['pattern'],
+                'definition': policy.get('definition', policy.get('tags', {})),
+                'priority': int(policy.get('priority', 0)),
+                'apply-to': policy.get('apply_to', 'all'),
+            }
+            if existing is None:
+                self._change('policy', name, 'create', 'PUT', url, data)
+            elif [k for k in data if existing.get(k) != data[k]]:
+                self._change('policy', name, 'update', 'PUT', url, data)
+
+    def sync_parameters(self, parameters, state):
+        for parameter in parameters:
+            component = parameter['component']
+            name = parameter['name']
+            vhost = parameter.get('vhost', '/')
+            if parameter.get('state', 'present') != state:
+                continue
+            url = self._url('parameters', component, vhost, name)
+            existing = self.parameters.get((vhost, component, name))
+            if state == 'absent':
+                if existing:
+                    self._change('parameter', name, 'delete', 'DELETE', url)
+                continue
+            value = parameter.get('value')
+            if isinstance(value, basestring):
+                try:
+                    value = json.loads(value)
+                except ValueError:
+                    self.module.fail_json(msg="value of parameter %s is not valid JSON" % name)
+            data = {'component': component, 'vhost': vhost, 'name': name, 'value': value}
+            if existing is None:
+                self._change('parameter', name, 'create', 'PUT', url, data)
+            elif existing.get('value') != value:
+                self._change('parameter', name, 'update', 'PUT', url, data)
+
+
+def check_entries(module, kind, entries, required):
+    for entry in entries:
+        if not isinstance(entry, dict):
+            module.fail_json(msg="every entry of %s must be a hash, got %s" % (kind, entry))
+        if entry.get('state', 'present') not in ('present', 'absent'):
+            module.fail_json(msg="state of %s entry %s must be present or absent" % (kind, entry))
+        for key in required:
+            if key not in entry:
+                module.fail_json(msg="%s entry %s is missing %s" % (kind, entry, key))
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec = dict(
+            login_user = dict(default='guest', type='str'),
+            login_password = dict(default='guest', type='str', no_log=True),
+            login_host = dict(default='localhost', type='str'),
+            login_port = dict(default='15672', type='str'),
+            vhosts = dict(default=[], type='list'),
+            users = dict(default=[], type='list'),
+            permissions = dict(default=[], type='list'),
+            policies = dict(default=[], type='list'),
+            parameters = dict(default=[], type='list'),
+        ),
+        supports_check_mode = True
+    )
+
+    check_entries(module, 'vhosts', module.params['vhosts'], ['name'])
+    check_entries(module, 'users', module.params['users'], ['name'])
+    check_entries(module, 'permissions', module.params['permissions'], ['user'])
+    check_entries(module, 'policies', module.params['policies'], ['name'])
+    check_entries(module, 'parameters', module.params['parameters'], ['component', 'name'])
+    for policy in module.params['policies']:
+        if policy.get('state', 'present') == 'present' and 'pattern' not in policy:
+            module.fail_json(msg="policies entry %s is missing pattern" % policy)
+
+    definitions = RabbitMqDefinitions(module)
+    definitions.get_definitions()
+
+    # create containers before their contents and delete in reverse order
+    definitions.sync_vhosts(module.params['vhosts'], 'present')
+    definitions.sync_users(module.params['users'], 'present')
+    definitions.sync_permissions(module.params['permissions'], 'present')
+    definitions.sync_policies(module.params['policies'], 'present')
+    definitions.sync_parameters(module.params['parameters'], 'present')
+
+    definitions.sync_parameters(module.params['parameters'], 'absent')
+    definitions.sync_policies(module.params['policies'], 'absent')
+    definitions.sync_permissions(module.params['permissions'], 'absent')
+    definitions.sync_users(module.params['users'], 'absent')
+    definitions.sync_vhosts(module.params['vhosts'], 'absent')
+
+    module.exit_json(
+        changed = len(definitions.changes) > 0,
+        changes = definitions.changes
+    )
+
+# import module snippets
+from ansible.module_utils.basic import *
+main()
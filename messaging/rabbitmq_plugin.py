@@ -97,11 +97,13 @@ class RabbitMqPlugins(object):
 
         return plugins
 
-    def enable(self, name):
-        self._exec(['enable', name])
+    def enable(self, names):
+        if names:
+            self._exec(['enable'] + names)
 
-    def disable(self, name):
-        self._exec(['disable', name])
+    def disable(self, names):
+        if names:
+            self._exec(['disable'] + names)
 
 
 def main():
@@ -123,25 +125,27 @@ def main():
     rabbitmq_plugins = RabbitMqPlugins(module)
     enabled_plugins = rabbitmq_plugins.get_all()
 
+    # each rabbitmq-plugins call starts an erlang vm, so all plugins are
+    # enabled or disabled with a single call
     enabled = []
     disabled = []
     if state == 'enabled':
         if not new_only:
             for plugin in enabled_plugins:
                 if plugin not in names:
-                    rabbitmq_plugins.disable(plugin)
                     disabled.append(plugin)
 
         for name in names:
             if name not in enabled_plugins:
-                rabbitmq_plugins.enable(name)
                 enabled.append(name)
     else:
         for plugin in enabled_plugins:
             if plugin in names:
-                rabbitmq_plugins.disable(plugin)
                 disabled.append(plugin)
 
+    rabbitmq_plugins.disable(disabled)
+    rabbitmq_plugins.enable(enabled)
+
     changed = len(enabled) > 0 or len(disabled) > 0
     module.exit_json(changed=changed, enabled=enabled, disabled=disabled)
 
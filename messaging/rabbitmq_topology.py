@@ -0,0 +1,354 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+DOCUMENTATION = '''
+---
+module: rabbitmq_topology
+author: "Manuel Sousa (@manuel-sousa)"
+version_added: "2.1"
+
+short_description: Manage many rabbitMQ exchanges, queues and bindings at once
+description:
+  - This module uses rabbitMQ Rest API to create/delete lists of exchanges,
+    queues and bindings of one virtual host in a single invocation.
+  - The existing exchanges, queues and bindings of the vhost are read with
+    one request each over a single keep-alive connection, and only the
+    missing or surplus objects are created or deleted, with a bounded
+    number of concurrent requests.
+requirements: [ python requests ]
+options:
+    login_user:
+        description:
+            - rabbitMQ user for connection
+        required: false
+        default: guest
+    login_password:
+        description:
+            - rabbitMQ password for connection
+        required: false
+        default: guest
+    login_host:
+        description:
+            - rabbitMQ host for connection
+        required: false
+        default: localhost
+    login_port:
+        description:
+            - rabbitMQ management api port
+        required: false
+        default: 15672
+    vhost:
+        description:
+            - rabbitMQ virtual host
+        required: false
+        default: "/"
+    exchanges:
+        description:
+            - list of exchanges, each a hash with C(name) and the optional
+              keys C(exchange_type) (alias C(type)), C(durable), C(auto_delete),
+              C(internal), C(arguments) and C(state), see M(rabbitmq_exchange).
+        required: false
+        default: []
+    queues:
+        description:
+            - list of queues, each a hash with C(name) and the optional keys
+              C(durable), C(auto_delete), C(message_ttl), C(auto_expires),
+              C(max_length), C(dead_letter_exchange),
+              C(dead_letter_routing_key), C(arguments) and C(state), see
+              M(rabbitmq_queue).
+        required: false
+        default: []
+    bindings:
+        description:
+            - list of bindings, each a hash with C(source), C(destination),
+              C(destination_type) and the optional keys C(routing_key),
+              C(arguments) and C(state), see M(rabbitmq_binding).
+        required: false
+        default: []
+    concurrency:
+        description:
+            - how many changes are sent to the management api in parallel
+        required: false
+        default: 8
+notes:
+    - As with M(rabbitmq_exchange) and M(rabbitmq_queue), attributes of
+      existing exchanges and queues can not be changed. The module fails
+      before applying any change if one of them differs.
+'''
+
+EXAMPLES = '''
+# Declare the topology of an application
+- rabbitmq_topology:
+    vhost: /app
+    exchanges:
+      - name: events
+        type: topic
+    queues:
+      - name: billing
+        message_ttl: 60000
+      - name: audit
+      - name: legacy
+        state: absent
+    bindings:
+      - source: events
+        destination: billing
+        destination_type: queue
+        routing_key: invoice.*
+      - source: events
+        destination: audit
+        destination_type: queue
+        routing_key: "#"
+'''
+
+import requests
+import urllib
+import json
+import threading
+import Queue
+
+QUEUE_ARGUMENTS = {
+    'message_ttl': 'x-message-ttl',
+    'auto_expires': 'x-expires',
+    'max_length': 'x-max-length',
+    'dead_letter_exchange': 'x-dead-letter-exchange',
+    'dead_letter_routing_key': 'x-dead-letter-routing-key'
+}
+
+
+class RabbitMqTopology(object):
+    def __init__(self, module):
+        self.module = module
+        self.vhost = module.params['vhost']
+        self.base_url = "http://%s:%s/api" % (module.params['login_host'], module.params['login_port'])
+        self.concurrency = max(1, module.params['concurrency'])
+        # one keep-alive connection pool shared by the reads and all workers
+        self.session = requests.Session()
+        self.session.auth = (module.params['login_user'], module.params['login_password'])
+        self.session.headers.update({"content-type": "application/json"})
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+        self.session.mount('http://', adapter)
+        self.changes = []
+
+    def _url(self, *parts):
+        return '/'.join([self.base_url] + [urllib.quote(part, '') for part in parts])
+
+    def _get(self, kind, columns):
+        r = self.session.get(self._url(kind, self.vhost), params={'columns': ','.join(columns)})
+        if r.status_code != 200:
+            self.module.fail_json(
+                msg = "Invalid response from RESTAPI when trying to list %s" % kind,
+                status = r.status_code,
+                details = r.text
+            )
+        return r.json()
+
+    def load(self):
+        self.exchanges = dict((e['name'], e) for e in self._get(
+            'exchanges', ['name', 'type', 'durable', 'auto_delete', 'internal']))
+        self.queues = dict((q['name'], q) for q in self._get(
+            'queues', ['name', 'durable', 'auto_delete', 'arguments']))
+        self.bindings = {}
+        for b in self._get('bindings', ['source', 'destination', 'destination_type',
+                                        'routing_key', 'properties_key']):
+            key = (b['source'], b['destination_type'], b['destination'], b['routing_key'])
+            self.bindings[key] = b
+
+    def plan_exchanges(self, exchanges, create, delete):
+        for exchange in exchanges:
+            name = exchange['name']
+            existing = self.exchanges.get(name)
+            url = self._url('exchanges', self.vhost, name)
+            if exchange.get('state', 'present') == 'absent':
+                if existing:
+                    delete.append(('exchange', name, 'DELETE', url, None))
+                continue
+            data = {
+                "durable": self.module.boolean(exchange.get('durable', True)),
+                "auto_delete": self.module.boolean(exchange.get('auto_delete', False)),
+                "internal": self.module.boolean(exchange.get('internal', False)),
+                "type": exchange.get('exchange_type', exchange.get('type', 'direct')),
+                "arguments": exchange.get('arguments', {})
+            }
+            if existing is None:
+                create.append(('exchange', name, 'PUT', url, data))
+            elif [k for k in ('durable', 'auto_delete', 'internal', 'type') if existing.get(k) != data[k]]:
+                self.module.fail_json(
+                    msg = "RabbitMQ RESTAPI doesn't support attribute changes for existing exchanges",
+                    name = name
+                )
+
+    def plan_queues(self, queues, create, delete):
+        for queue in queues:
+            name = queue['name']
+            existing = self.queues.get(name)
+            url = self._url('queues', self.vhost, name)
+            if queue.get('state', 'present') == 'absent':
+                if existing:
+                    delete.append(('queue', name, 'DELETE', url, None))
+                continue
+            arguments = dict(queue.get('arguments', {}))
+            for k, v in QUEUE_ARGUMENTS.items():
+                if queue.get(k) is not None:
+                    arguments[v] = queue[k]
+            data = {
+                "durable": self.module.boolean(queue.get('durable', True)),
+                "auto_delete": self.module.boolean(queue.get('auto_delete', False)),
+                "arguments": arguments
+            }
+            if existing is None:
+                create.append(('queue', name, 'PUT', url, data))
+            elif (existing.get('durable') != data['durable']
+                  or existing.get('auto_delete') != data['auto_delete']
+                  or [v for v in QUEUE_ARGUMENTS.values()
+                      if existing.get('arguments', {}).get(v) != arguments.get(v)]):
+                self.module.fail_json(
+                    msg = "RabbitMQ RESTAPI doesn't support attribute changes for existing queues",
+                    name = name
+                )
+
+    def plan_bindings(self, bindings, changes):
+        for binding in bindings:
+            source = binding['source']
+            destination = binding['destination']
+            destination_type = binding['destination_type']
+            routing_key = binding.get('routing_key', '#')
+            existing = self.bindings.get((source, destination_type, destination, routing_key))
+            dest_type = destination_type == 'queue' and 'q' or 'e'
+            name = '%s->%s:%s' % (source, destination, routing_key)
+            if binding.get('state', 'present') == 'absent':
+                if existing:
+                    url = self._url('bindings', self.vhost, 'e', source, dest_type, destination,
+                                    existing['properties_key'])
+                    changes.append(('binding', name, 'DELETE', url, None))
+                continue
+            if existing is None:
+                url = self._url('bindings', self.vhost, 'e', source, dest_type, destination)
+                changes.append(('binding', name, 'POST', url, {
+                    "routing_key": routing_key,
+                    "arguments": binding.get('arguments', {})
+                }))
+
+    def _apply(self, change):
+        kind, name, method, url, data = change
+        if data is not None:
+            data = json.dumps(data)
+        r = self.session.request(method, url, data=data)
+        if r.status_code not in (201, 204):
+            return dict(type=kind, name=name, status=r.status_code, details=r.text)
+        return None
+
+    def apply(self, changes):
+        """ Send the changes with at most concurrency requests in flight """
+        for kind, name, method, url, data in changes:
+            self.changes.append(dict(type=kind, name=name, action=method == 'DELETE' and 'delete' or 'create'))
+        if self.module.check_mode or not changes:
+            return
+
+        pending = Queue.Queue()
+        for change in changes:
+            pending.put(change)
+        errors = []
+        lock = threading.Lock()
+
+        def worker():
+            while True:
+                try:
+                    change = pending.get_nowait()
+                except Queue.Empty:
+                    return
+                try:
+                    error = self._apply(change)
+                except Exception, e:
+                    error = dict(type=change[0], name=change[1], details=str(e))
+                if error:
+                    lock.acquire()
+                    errors.append(error)
+                    lock.release()
+
+        threads = [threading.Thread(target=worker) for i in range(min(self.concurrency, len(changes)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if errors:
+            self.module.fail_json(msg = "Error applying topology changes", errors = errors,
+                                  changes = self.changes)
+
+
+def check_entries(module, kind, entries, required):
+    for entry in entries:
+        if not isinstance(entry, dict):
+            module.fail_json(msg="every entry of %s must be a hash, got %s" % (kind, entry))
+        if entry.get('state', 'present') not in ('present', 'absent'):
+            module.fail_json(msg="state of %s entry %s must be present or absent" % (kind, entry))
+        for key in required:
+            if key not in entry:
+                module.fail_json(msg="%s entry %s is missing %s" % (kind, entry, key))
+    if kind == 'bindings':
+        for entry in entries:
+            if entry['destination_type'] not in ('queue', 'exchange'):
+                module.fail_json(msg="destination_type of binding %s must be queue or exchange" % entry)
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec = dict(
+            login_user = dict(default='guest', type='str'),
+            login_password = dict(default='guest', type='str', no_log=True),
+            login_host = dict(default='localhost', type='str'),
+            login_port = dict(default='15672', type='str'),
+            vhost = dict(default='/', type='str'),
+            exchanges = dict(default=[], type='list'),
+            queues = dict(default=[], type='list'),
+            bindings = dict(default=[], type='list'),
+            concurrency = dict(default=8, type='int')
+        ),
+        supports_check_mode = True
+    )
+
+    check_entries(module, 'exchanges', module.params['exchanges'], ['name'])
+    check_entries(module, 'queues', module.params['queues'], ['name'])
+    check_entries(module, 'bindings', module.params['bindings'], ['source', 'destination', 'destination_type'])
+
+    topology = RabbitMqTopology(module)
+    topology.load()
+
+    # plan everything first so attribute conflicts fail before any change
+    create = []
+    delete = []
+    bindings = []
+    topology.plan_exchanges(module.params['exchanges'], create, delete)
+    topology.plan_queues(module.params['queues'], create, delete)
+    topology.plan_bindings(module.params['bindings'], bindings)
+
+    # bindings need their exchanges and queues, and go before deletions
+    topology.apply(create)
+    topology.apply(bindings)
+    topology.apply(delete)
+
+    module.exit_json(
+        changed = len(topology.changes) > 0,
+        vhost = module.params['vhost'],
+        changes = topology.changes
+    )
+
+# import module snippets
+from ansible.module_utils.basic import *
+main()
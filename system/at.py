@@ -57,6 +57,12 @@ options:
      - If a matching job is present a new job will not be added.
     required: false
     default: false
+notes:
+ - Queued jobs are read from the at spool directory when it is readable, and
+   then a job only matches if its whole script is the command or script file,
+   leading and trailing whitespace aside. Otherwise they are read with C(atq)
+   and C(at -c), and a job matches if its output contains the command or
+   script file.
 requirements:
  - at
 author: "Richard Isaacson (@risaacson)"
@@ -74,6 +80,7 @@ EXAMPLES = '''
 '''
 
 import os
+import re
 import tempfile
 
 
@@ -95,32 +102,117 @@ def delete_job(module, result, at_cmd, command, script_file):
     module.exit_json(**result)
 
 
-def get_matching_jobs(module, at_cmd, script_file):
-    matching_jobs = []
-
-    atq_cmd = module.get_bin_path('atq', True)
-
-    # Get list of job numbers for the user.
-    atq_command = "%s" % atq_cmd
-    rc, out, err = module.run_command(atq_command, check_rc=True)
-    current_jobs = out.splitlines()
-    if len(current_jobs) == 0:
+# Spool directories used by the common at implementations.
+AT_SPOOL_DIRS = ['/var/spool/cron/atjobs', '/var/spool/at', '/var/at/jobs']
+
+# Job files are named <queue><5 hex digit job number><8 hex digit minutes>.
+JOB_FILE_RE = re.compile(r'^[a-zA-Z=]([0-9a-f]{5})[0-9a-f]{8}$')
+
+# Newer at releases wrap the script in a quoted here document.
+HEREDOC_RE = re.compile(r"^\$\{SHELL:-/bin/sh\} << '(marcinDELIMITER[0-9a-f]+)'$")
+
+
+def extract_script(job_text):
+    """ Return the user script of an at job file without the environment
+    preamble at adds to it, or None if the preamble is not recognised. """
+    lines = job_text.splitlines()
+    for idx, line in enumerate(lines):
+        if line.startswith('cd ') and line.rstrip().endswith('|| {'):
+            break
+    else:
+        return None
+    for idx in range(idx + 1, len(lines)):
+        if lines[idx].strip() == '}':
+            break
+    else:
+        return None
+    body = lines[idx + 1:]
+    if body:
+        m = HEREDOC_RE.match(body[0])
+        if m:
+            delimiter = m.group(1)
+            body = body[1:]
+            if delimiter in body:
+                body = body[:body.index(delimiter)]
+    return '\n'.join(body)
+
+
+class AtJobIndex(object):
+    """ Queued at jobs indexed by their normalised script.
+
+    Jobs are read straight from the spool directory when it is readable.
+    Otherwise they are read through atq and at -c and, like the jobs whose
+    preamble can not be stripped, kept aside and matched by substring. """
+
+    def __init__(self, module, at_cmd):
+        self.module = module
+        self.at_cmd = at_cmd
+        self.by_script = {}
+        self.unparsed = []
+        jobs = self.read_spool()
+        if jobs is None:
+            self.unparsed = self.read_commands()
+            return
+        for job, text in jobs:
+            script = extract_script(text)
+            if script is None:
+                self.unparsed.append((job, text))
+            else:
+                self.by_script.setdefault(script.strip(), []).append(job)
+
+    def read_spool(self):
+        for spool_dir in AT_SPOOL_DIRS:
+            if os.path.isdir(spool_dir):
+                break
+        else:
+            return None
+        try:
+            names = os.listdir(spool_dir)
+        except OSError:
+            return None
+        uid = os.getuid()
+        jobs = []
+        for name in names:
+            m = JOB_FILE_RE.match(name)
+            if not m:
+                continue
+            path = os.path.join(spool_dir, name)
+            try:
+                # atq only lists the jobs of the calling user unless root
+                if uid != 0 and os.stat(path).st_uid != uid:
+                    continue
+                f = open(path)
+                try:
+                    jobs.append((str(int(m.group(1), 16)), f.read()))
+                finally:
+                    f.close()
+            except (IOError, OSError):
+                return None
+        return jobs
+
+    def read_commands(self):
+        atq_cmd = self.module.get_bin_path('atq', True)
+        rc, out, err = self.module.run_command(atq_cmd, check_rc=True)
+        jobs = []
+        for current_job in out.splitlines():
+            job = current_job.split()[0]
+            rc, out, err = self.module.run_command("%s -c %s" % (self.at_cmd, job), check_rc=True)
+            jobs.append((job, out))
+        return jobs
+
+    def find(self, script):
+        script = script.strip()
+        matching_jobs = list(self.by_script.get(script, []))
+        for job, text in self.unparsed:
+            if script in text:
+                matching_jobs.append(job)
         return matching_jobs
 
-    # Read script_file into a string.
-    script_file_string = open(script_file).read().strip()
-
-    # Loop through the jobs.
-    #   If the script text is contained in a job add job number to list.
-    for current_job in current_jobs:
-        split_current_job = current_job.split()
-        at_command = "%s -c %s" % (at_cmd, split_current_job[0])
-        rc, out, err = module.run_command(at_command, check_rc=True)
-        if script_file_string in out:
-            matching_jobs.append(split_current_job[0])
 
-    # Return the list.
-    return matching_jobs
+def get_matching_jobs(module, at_cmd, script_file):
+    # Read script_file into a string.
+    script_file_string = open(script_file).read()
+    return AtJobIndex(module, at_cmd).find(script_file_string)
 
 
 def create_tempfile(command):
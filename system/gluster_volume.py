@@ -102,6 +102,7 @@ options:
         Set force to true to override this behaviour
 notes:
   - "Requires cli tools for GlusterFS on servers"
+  - "Cluster state is read from the C(--xml) output of the gluster cli when available"
   - "Will add new bricks, but not remove them"
 author: "Taneli Leppä (@rosmo)"
 """
@@ -134,9 +135,15 @@ EXAMPLES = """
 import shutil
 import time
 import socket
+import xml.etree.ElementTree as ET
 
 glusterbin = ''
 
+# peer probe polling: start fast, back off exponentially up to the max delay
+PEER_WAIT_TIMEOUT = 30
+PEER_WAIT_MIN_DELAY = 0.1
+PEER_WAIT_MAX_DELAY = 4
+
 def run_gluster(gargs, **kwargs):
     global glusterbin
     global module
@@ -170,9 +177,27 @@ def run_gluster_yes(gargs):
         module.fail_json(msg='error running gluster (%s) command (rc=%d): %s' % (' '.join(args), rc, out or err))
     return out
 
-def get_peers():
-    out = run_gluster([ 'peer', 'status'])
-    i = 0
+def run_gluster_xml(gargs, nofail=False):
+    """ Run a gluster command with --xml and return the parsed cliOutput element """
+    global module
+    if nofail:
+        out = run_gluster_nofail(gargs + [ '--xml' ])
+    else:
+        out = run_gluster(gargs + [ '--xml' ])
+    if not out:
+        return None
+    try:
+        root = ET.fromstring(out)
+    except Exception:
+        return None
+    op_ret = root.findtext('opRet')
+    if op_ret is not None and op_ret.strip() not in ('0', ''):
+        if nofail:
+            return None
+        module.fail_json(msg='error running gluster (%s) command: %s' % (' '.join(gargs), root.findtext('opErrstr')))
+    return root
+
+def parse_peers_text(out):
     peers = {}
     hostname = None
     uuid = None
@@ -189,9 +214,30 @@ def get_peers():
                 peers[hostname] = [ uuid, state ]
     return peers
 
-def get_volumes():
-    out = run_gluster([ 'volume', 'info' ])
+def parse_peers_xml(root):
+    peers = {}
+    for peer in root.findall('peerStatus/peer'):
+        uuid = peer.findtext('uuid')
+        state = peer.findtext('stateStr') or ''
+        if peer.findtext('connected', '1').strip() == '0':
+            state = '%s (Disconnected)' % state
+        names = [ peer.findtext('hostname') ]
+        # gluster >= 3.6 lists every known address of a peer
+        for name in peer.findall('hostnames/hostname'):
+            if name.text not in names:
+                names.append(name.text)
+        for name in names:
+            if name:
+                peers[name.strip()] = [ uuid, state ]
+    return peers
 
+def get_peers():
+    root = run_gluster_xml([ 'peer', 'status' ], nofail=True)
+    if root is not None:
+        return parse_peers_xml(root)
+    return parse_peers_text(run_gluster([ 'peer', 'status' ]))
+
+def parse_volumes_text(out):
     volumes = {}
     volume = {}
     for row in out.split('\n'):
@@ -225,6 +271,39 @@ def get_volumes():
                 volume = {}
     return volumes
 
+XML_TRANSPORTS = { '0': 'tcp', '1': 'rdma', '2': 'tcp,rdma' }
+
+def parse_volumes_xml(root):
+    volumes = {}
+    for vol in root.findall('volInfo/volumes/volume'):
+        volume = {}
+        volume['name'] = vol.findtext('name')
+        volume['id'] = vol.findtext('id')
+        volume['status'] = vol.findtext('statusStr')
+        volume['transport'] = XML_TRANSPORTS.get(vol.findtext('transport'), vol.findtext('transport'))
+        volume['bricks'] = []
+        for brick in vol.findall('bricks/brick'):
+            # newer releases carry the brick in a <name> child, older ones as text
+            name = brick.findtext('name') or brick.text
+            if name:
+                volume['bricks'].append(name.strip())
+        volume['options'] = {}
+        volume['quota'] = False
+        for option in vol.findall('options/option'):
+            key = option.findtext('name')
+            value = option.findtext('value')
+            volume['options'][key] = value
+            if key == 'features.quota' and value == 'on':
+                volume['quota'] = True
+        volumes[volume['name']] = volume
+    return volumes
+
+def get_volumes():
+    root = run_gluster_xml([ 'volume', 'info' ], nofail=True)
+    if root is not None:
+        return parse_volumes_xml(root)
+    return parse_volumes_text(run_gluster([ 'volume', 'info' ]))
+
 def get_quotas(name, nofail):
     quotas = {}
     if nofail:
@@ -239,28 +318,42 @@ def get_quotas(name, nofail):
             quotas[q[0]] = q[1]
     return quotas
 
-def wait_for_peer(host):
-    for x in range(0, 4):
-        peers = get_peers()
-        if host in peers and peers[host][1].lower().find('peer in cluster') != -1:
-            return True
-        time.sleep(1)
-    return False
+def peer_in_cluster(peers, host):
+    return host in peers and peers[host][1].lower().find('peer in cluster') != -1
 
-def probe(host, myhostname):
-    global module
-    run_gluster([ 'peer', 'probe', host ])
-    if not wait_for_peer(host):
-        module.fail_json(msg='failed to probe peer %s on %s' % (host, myhostname))
-    changed = True
+def wait_for_peers(hosts, timeout=PEER_WAIT_TIMEOUT):
+    """ Wait until all hosts are in the cluster, polling with exponential backoff.
+
+    Returns the list of hosts that did not join before the timeout. """
+    pending = list(hosts)
+    delay = PEER_WAIT_MIN_DELAY
+    deadline = time.time() + timeout
+    while True:
+        peers = get_peers()
+        pending = [ host for host in pending if not peer_in_cluster(peers, host) ]
+        if not pending:
+            return pending
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return pending
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, PEER_WAIT_MAX_DELAY)
 
 def probe_all_peers(hosts, peers, myhostname):
+    global module
+    probed = []
     for host in hosts:
         host = host.strip() # Clean up any extra space for exact comparison
         if host not in peers:
             # dont probe ourselves
             if myhostname != host:
-                probe(host, myhostname)
+                run_gluster([ 'peer', 'probe', host ])
+                probed.append(host)
+    # probes are asynchronous, so fire them all before waiting on any of them
+    failed = wait_for_peers(probed)
+    if failed:
+        module.fail_json(msg='failed to probe peer(s) %s on %s' % (', '.join(failed), myhostname))
+    return len(probed) > 0
 
 def create_volume(name, stripe, replica, transport, hosts, bricks, force):
     args = [ 'volume', 'create' ]
@@ -289,6 +382,29 @@ def stop_volume(name):
 def set_volume_option(name, option, parameter):
     run_gluster([ 'volume', 'set', name, option, parameter ])
 
+def diff_volume_options(current, desired):
+    """ Return the (option, value) pairs of desired that differ from current """
+    changes = []
+    for option in sorted(desired.keys()):
+        value = str(desired[option])
+        if option not in current or current[option] != value:
+            changes.append((option, value))
+    return changes
+
+def set_volume_options(name, changes):
+    """ Apply all option changes, in a single volume set call where supported """
+    if not changes:
+        return
+    if len(changes) > 1:
+        args = [ 'volume', 'set', name ]
+        for option, value in changes:
+            args.extend([ option, value ])
+        if run_gluster_nofail(args) is not None:
+            return
+    # older glusterd only accepts one key/value pair per volume set
+    for option, value in changes:
+        set_volume_option(name, option, value)
+
 def add_brick(name, brick, force):
     args = [ 'volume', 'add-brick', name, brick ]
     if force:
@@ -379,7 +495,9 @@ def main():
             changed = True
 
     if action == 'present':
-        probe_all_peers(cluster, peers, myhostname)
+        if probe_all_peers(cluster, peers, myhostname):
+            peers = get_peers()
+            changed = True
 
         # create if it doesn't exist
         if volume_name not in volumes:
@@ -422,10 +540,10 @@ def main():
                     changed = True
 
             # set options
-            for option in options.keys():
-                if option not in volumes[volume_name]['options'] or volumes[volume_name]['options'][option] != options[option]:
-                    set_volume_option(volume_name, option, options[option])
-                    changed = True
+            option_changes = diff_volume_options(volumes[volume_name]['options'], options)
+            if option_changes:
+                set_volume_options(volume_name, option_changes)
+                changed = True
 
         else:
             module.fail_json(msg='failed to create volume %s' % volume_name)
@@ -61,6 +61,7 @@ options:
     required: false
 notes:
   - module does not modify PE size for already present volume group
+  - physical and volume group state is read with a single C(lvm fullreport) call on LVM releases that support JSON reports
 '''
 
 EXAMPLES = '''
@@ -111,6 +112,47 @@ def parse_pvs(module, data):
         })
     return pvs
 
+def get_fullreport(module):
+    """ Read pvs and vgs with a single 'lvm fullreport' call.
+
+    Returns None if this LVM release can not produce JSON reports. """
+    lvm_cmd = module.get_bin_path('lvm')
+    if not lvm_cmd:
+        return None
+    rc, out, err = module.run_command([lvm_cmd, 'fullreport', '--reportformat', 'json'])
+    if rc != 0:
+        return None
+    try:
+        report = json.loads(out)['report']
+    except (ValueError, KeyError, TypeError):
+        return None
+
+    pvs = []
+    vgs = []
+    dm_prefix = '/dev/dm-'
+    for entry in report:
+        for pv in entry.get('pv', []):
+            name = pv['pv_name']
+            if name.startswith(dm_prefix):
+                name = find_mapper_device_name(module, name)
+            pvs.append({
+                'name': name,
+                'vg_name': pv.get('vg_name', ''),
+            })
+        for this_vg in entry.get('vg', []):
+            vgs.append({
+                'name': this_vg['vg_name'],
+                'pv_count': int(this_vg['pv_count']),
+                'lv_count': int(this_vg['lv_count']),
+            })
+    return pvs, vgs
+
+def create_pvs(module, devs):
+    pvcreate_cmd = module.get_bin_path('pvcreate', True)
+    rc,_,err = module.run_command([pvcreate_cmd] + devs)
+    if rc != 0:
+        module.fail_json(msg="Creating physical volume(s) '%s' failed" % ' '.join(devs), rc=rc, err=err)
+
 def main():
     module = AnsibleModule(
         argument_spec = dict(
@@ -145,27 +187,35 @@ def main():
             if not os.path.exists(test_dev):
                 module.fail_json(msg="Device %s not found."%test_dev)
 
-        ### get pv list
-        pvs_cmd = module.get_bin_path('pvs', True)
-        rc,current_pvs,err = module.run_command("%s --noheadings -o pv_name,vg_name --separator ';'" % pvs_cmd)
-        if rc != 0:
-            module.fail_json(msg="Failed executing pvs command.",rc=rc, err=err)
+        ### get pv and vg lists in one pass where LVM supports it
+        report = get_fullreport(module)
+        if report is not None:
+            pvs, vgs = report
+        else:
+            pvs_cmd = module.get_bin_path('pvs', True)
+            rc,current_pvs,err = module.run_command("%s --noheadings -o pv_name,vg_name --separator ';'" % pvs_cmd)
+            if rc != 0:
+                module.fail_json(msg="Failed executing pvs command.",rc=rc, err=err)
+            pvs = parse_pvs(module, current_pvs)
+            vgs = None
 
         ### check pv for devices
-        pvs = parse_pvs(module, current_pvs)
         used_pvs = [ pv for pv in pvs if pv['name'] in dev_list and pv['vg_name'] and pv['vg_name'] != vg ]
         if used_pvs:
             module.fail_json(msg="Device %s is already in %s volume group."%(used_pvs[0]['name'],used_pvs[0]['vg_name']))
+    else:
+        vgs = None
 
-    vgs_cmd = module.get_bin_path('vgs', True)
-    rc,current_vgs,err = module.run_command("%s --noheadings -o vg_name,pv_count,lv_count --separator ';'" % vgs_cmd)
+    if vgs is None:
+        vgs_cmd = module.get_bin_path('vgs', True)
+        rc,current_vgs,err = module.run_command("%s --noheadings -o vg_name,pv_count,lv_count --separator ';'" % vgs_cmd)
 
-    if rc != 0:
-        module.fail_json(msg="Failed executing vgs command.",rc=rc, err=err)
+        if rc != 0:
+            module.fail_json(msg="Failed executing vgs command.",rc=rc, err=err)
 
-    changed = False
+        vgs = parse_vgs(current_vgs)
 
-    vgs = parse_vgs(current_vgs)
+    changed = False
 
     for test_vg in vgs:
         if test_vg['name'] == vg:
@@ -181,13 +231,8 @@ def main():
                 changed = True
             else:
                 ### create PV
-                pvcreate_cmd = module.get_bin_path('pvcreate', True)
-                for current_dev in dev_list:
-                    rc,_,err = module.run_command("%s %s" % (pvcreate_cmd,current_dev))
-                    if rc == 0:
-                        changed = True
-                    else:
-                        module.fail_json(msg="Creating physical volume '%s' failed" % current_dev, rc=rc, err=err)
+                create_pvs(module, dev_list)
+                changed = True
                 vgcreate_cmd = module.get_bin_path('vgcreate')
                 rc,_,err = module.run_command([vgcreate_cmd] + vgoptions + ['-s', str(pesize), vg] + dev_list)
                 if rc == 0:
@@ -222,13 +267,8 @@ def main():
                 if devs_to_add:
                     devs_to_add_string = ' '.join(devs_to_add)
                     ### create PV
-                    pvcreate_cmd = module.get_bin_path('pvcreate', True)
-                    for current_dev in devs_to_add:
-                        rc,_,err = module.run_command("%s %s" % (pvcreate_cmd, current_dev))
-                        if rc == 0:
-                            changed = True
-                        else:
-                            module.fail_json(msg="Creating physical volume '%s' failed"%current_dev, rc=rc, err=err)
+                    create_pvs(module, devs_to_add)
+                    changed = True
                     ### add PV to our VG
                     vgextend_cmd = module.get_bin_path('vgextend', True)
                     rc,_,err = module.run_command("%s %s %s" % (vgextend_cmd, vg, devs_to_add_string))
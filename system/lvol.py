@@ -35,8 +35,16 @@ options:
     required: true
   lv:
     description:
-    - The name of the logical volume.
-    required: true
+    - The name of the logical volume. Required unless C(lvs) is given.
+    required: false
+  lvs:
+    version_added: "2.1"
+    description:
+    - A list of logical volumes to manage in one run. Each entry is either a
+      name or a hash with an C(lv) key and optional C(size), C(opts), C(state)
+      and C(force) keys, which default to the module level options. The
+      volume group is only read once for all entries.
+    required: false
   size:
     description:
     - The size of the logical volume, according to lvcreate(8) --size, by
@@ -64,6 +72,7 @@ options:
     - Free-form options to be passed to the lvcreate command
 notes:
   - Filesystems on top of the volume are not resized.
+  - The volume group is read with a single C(lvm fullreport) call on LVM releases that support JSON reports.
 '''
 
 EXAMPLES = '''
@@ -87,6 +96,14 @@ EXAMPLES = '''
 
 # Remove the logical volume.
 - lvol: vg=firefly lv=test state=absent force=yes
+
+# Create or resize several logical volumes in one run.
+- lvol:
+    vg: firefly
+    lvs:
+      - { lv: data, size: 100g }
+      - { lv: logs, size: 20g, opts: "-r 16" }
+      - { lv: scratch, state: absent, force: yes }
 '''
 
 import re
@@ -119,41 +136,62 @@ def get_lvm_version(module):
     return mkversion(m.group(1), m.group(2), m.group(3))
 
 
-def main():
-    module = AnsibleModule(
-        argument_spec=dict(
-            vg=dict(required=True),
-            lv=dict(required=True),
-            size=dict(type='str'),
-            opts=dict(type='str'),
-            state=dict(choices=["absent", "present"], default='present'),
-            force=dict(type='bool', default='no'),
-        ),
-        supports_check_mode=True,
-    )
+# sizes reported in bytes are converted to the unit of the requested size
+UNIT_BYTES = {
+    'b': 1,
+    's': 512,
+    'k': 1024,
+    'm': 1024 ** 2,
+    'g': 1024 ** 3,
+    't': 1024 ** 4,
+    'p': 1024 ** 5,
+    'e': 1024 ** 6,
+}
 
-    # Determine if the "--yes" option should be used
-    version_found = get_lvm_version(module)
-    if version_found == None:
-        module.fail_json(msg="Failed to get LVM version number")
-    version_yesopt = mkversion(2, 2, 99) # First LVM with the "--yes" option
-    if version_found >= version_yesopt:
-        yesopt = "--yes"
-    else:
-        yesopt = ""
 
-    vg = module.params['vg']
-    lv = module.params['lv']
-    size = module.params['size']
-    opts = module.params['opts']
-    state = module.params['state']
-    force = module.boolean(module.params['force'])
+def get_lvs_report(module, vg):
+    """ Read all logical volumes of vg with a single 'lvm fullreport' call.
+
+    Sizes are returned in bytes. Returns None if this LVM release can not
+    produce JSON reports or the volume group could not be read. """
+    lvm_cmd = module.get_bin_path("lvm", required=True)
+    rc, out, err = module.run_command([lvm_cmd, 'fullreport', '--reportformat', 'json',
+                                       '--units', 'b', '--nosuffix', vg])
+    if rc != 0:
+        return None
+    try:
+        report = json.loads(out)['report']
+    except (ValueError, KeyError, TypeError):
+        return None
+    lvs = []
+    for entry in report:
+        for this_lv in entry.get('lv', []):
+            lvs.append({
+                'name': this_lv['lv_name'],
+                'bytes': int(decimal_point.split(this_lv['lv_size'])[0]),
+            })
+    return lvs
+
+
+def get_lvs(module, vg):
+    """ Return the logical volumes of vg with their size in bytes, or None
+    if the volume group does not exist. """
+    lvs = get_lvs_report(module, vg)
+    if lvs is not None:
+        return lvs
+    lvs_cmd = module.get_bin_path("lvs", required=True)
+    rc, current_lvs, err = module.run_command(
+        "%s --noheadings --nosuffix -o lv_name,size --units b --separator ';' %s" % (lvs_cmd, vg))
+    if rc != 0:
+        return None
+    return [dict(name=this_lv['name'], bytes=this_lv['size']) for this_lv in parse_lvs(current_lvs)]
+
+
+def parse_size(module, size):
+    """ Split a size specification into (size, size_opt, size_unit) """
     size_opt = 'L'
     size_unit = 'm'
 
-    if opts is None:
-        opts = ""
-
     if size:
         # LVCREATE(8) -l --extents option with percentage
         if '%' in size:
@@ -181,29 +219,27 @@ def main():
             except ValueError:
                module.fail_json(msg="Bad size specification of '%s'" % size)
 
+    return size, size_opt, size_unit
+
+
+def ensure_lv(module, vg, lvs, lv, size, opts, state, force, yesopt):
+    """ Converge a single logical volume against the already read lvs.
+
+    Returns a result dict; failures are reported through fail_json. """
+    size, size_opt, size_unit = parse_size(module, size)
+
     # when no unit, megabytes by default
     if size_opt == 'l':
         unit = 'm'
     else:
         unit = size_unit
 
-    lvs_cmd = module.get_bin_path("lvs", required=True)
-    rc, current_lvs, err = module.run_command(
-        "%s --noheadings --nosuffix -o lv_name,size --units %s --separator ';' %s" % (lvs_cmd, unit, vg))
-
-    if rc != 0:
-        if state == 'absent':
-            module.exit_json(changed=False, stdout="Volume group %s does not exist." % vg, stderr=False)
-        else:
-            module.fail_json(msg="Volume group %s does not exist." % vg, rc=rc, err=err)
-
-    changed = False
-
-    lvs = parse_lvs(current_lvs)
+    if opts is None:
+        opts = ""
 
     for test_lv in lvs:
         if test_lv['name'] == lv:
-            this_lv = test_lv
+            this_lv = dict(name=test_lv['name'], size=int(test_lv['bytes'] // UNIT_BYTES[unit]))
             break
     else:
         this_lv = None
@@ -212,9 +248,9 @@ def main():
         if this_lv is None:
             module.fail_json(msg="No size given.")
         else:
-            module.exit_json(changed=False, vg=vg, lv=this_lv['name'], size=this_lv['size'])
+            return dict(changed=False, vg=vg, lv=this_lv['name'], size=this_lv['size'])
 
-    msg = ''
+    changed = False
     if this_lv is None:
         if state == 'present':
             ### create LV
@@ -232,24 +268,24 @@ def main():
         if state == 'absent':
             ### remove LV
             if module.check_mode:
-                module.exit_json(changed=True)
+                return dict(changed=True)
             if not force:
                 module.fail_json(msg="Sorry, no removal of logical volume %s without force=yes." % (this_lv['name']))
             lvremove_cmd = module.get_bin_path("lvremove", required=True)
             rc, _, err = module.run_command("%s --force %s/%s" % (lvremove_cmd, vg, this_lv['name']))
             if rc == 0:
-                module.exit_json(changed=True)
+                return dict(changed=True)
             else:
                 module.fail_json(msg="Failed to remove logical volume %s" % (lv), rc=rc, err=err)
 
         elif size_opt == 'l':
-            module.exit_json(changed=False, msg="Resizing extents with percentage not supported.")
+            return dict(changed=False, msg="Resizing extents with percentage not supported.")
         else:
             ### resize LV
             tool = None
-            if size > this_lv['size']:
+            if float(size) > this_lv['size']:
                 tool = module.get_bin_path("lvextend", required=True)
-            elif size < this_lv['size']:
+            elif float(size) < this_lv['size']:
                 if not force:
                     module.fail_json(msg="Sorry, no shrinking of %s without force=yes." % (this_lv['name']))
                 tool = module.get_bin_path("lvreduce", required=True)
@@ -263,11 +299,85 @@ def main():
                     if rc == 0:
                         changed = True
                     elif "matches existing size" in err:
-                        module.exit_json(changed=False, vg=vg, lv=this_lv['name'], size=this_lv['size'])
+                        return dict(changed=False, vg=vg, lv=this_lv['name'], size=this_lv['size'])
                     else:
                         module.fail_json(msg="Unable to resize %s to %s%s" % (lv, size, size_unit), rc=rc, err=err)
 
-    module.exit_json(changed=changed, msg=msg)
+    return dict(changed=changed, msg='')
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec=dict(
+            vg=dict(required=True),
+            lv=dict(),
+            lvs=dict(type='list'),
+            size=dict(type='str'),
+            opts=dict(type='str'),
+            state=dict(choices=["absent", "present"], default='present'),
+            force=dict(type='bool', default='no'),
+        ),
+        mutually_exclusive=[['lv', 'lvs']],
+        required_one_of=[['lv', 'lvs']],
+        supports_check_mode=True,
+    )
+
+    # Determine if the "--yes" option should be used
+    version_found = get_lvm_version(module)
+    if version_found == None:
+        module.fail_json(msg="Failed to get LVM version number")
+    version_yesopt = mkversion(2, 2, 99) # First LVM with the "--yes" option
+    if version_found >= version_yesopt:
+        yesopt = "--yes"
+    else:
+        yesopt = ""
+
+    vg = module.params['vg']
+    state = module.params['state']
+    force = module.boolean(module.params['force'])
+
+    if module.params['lvs']:
+        volumes = []
+        for item in module.params['lvs']:
+            if isinstance(item, dict):
+                if 'lv' not in item:
+                    module.fail_json(msg="Every entry of lvs needs an 'lv' key.")
+                volumes.append(item)
+            else:
+                volumes.append(dict(lv=item))
+    else:
+        volumes = [dict(lv=module.params['lv'])]
+
+    lvs = get_lvs(module, vg)
+
+    if lvs is None:
+        if state == 'absent' and not [v for v in volumes if v.get('state', state) != 'absent']:
+            module.exit_json(changed=False, stdout="Volume group %s does not exist." % vg, stderr=False)
+        else:
+            module.fail_json(msg="Volume group %s does not exist." % vg)
+
+    results = []
+    for volume in volumes:
+        if volume.get('size') is not None:
+            size = str(volume['size'])
+        else:
+            size = module.params['size']
+        result = ensure_lv(module, vg, lvs, volume['lv'], size,
+                           volume.get('opts', module.params['opts']),
+                           volume.get('state', state),
+                           module.boolean(volume.get('force', force)),
+                           yesopt)
+        result.setdefault('lv', volume['lv'])
+        results.append(result)
+
+    if not module.params['lvs']:
+        result = results[0]
+        if 'vg' not in result:
+            del result['lv']
+        module.exit_json(**result)
+
+    changed = len([r for r in results if r['changed']]) > 0
+    module.exit_json(changed=changed, vg=vg, results=results)
 
 # import module snippets
 from ansible.module_utils.basic import *
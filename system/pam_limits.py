@@ -35,21 +35,34 @@ options:
   domain:
     description:
       - A username, @groupname, wildcard, uid/gid range.
-    required: true
+        Required unless C(limits) is given.
+    required: false
   limit_type:
     description:
-      - Limit type, see C(man limits) for an explanation
-    required: true
-    choices: [ "hard", "soft" ]
+      - Limit type, see C(man limits) for an explanation.
+        Required unless C(limits) is given.
+    required: false
+    choices: [ "hard", "soft", "-" ]
   limit_item:
     description:
       - The limit to be set
-    required: true
+        Required unless C(limits) is given.
+    required: false
     choices: [ "core", "data", "fsize", "memlock", "nofile", "rss", "stack", "cpu", "nproc", "as", "maxlogins", "maxsyslogins", "priority", "locks", "sigpending", "msgqueue", "nice", "rtprio", "chroot" ]
   value:
     description:
       - The value of the limit.
-    required: true
+        Required unless C(limits) is given.
+    required: false
+  limits:
+    description:
+      - A list of limits to set in one pass. Each entry is a hash with
+        C(domain), C(limit_type), C(limit_item) and C(value) keys and
+        optional C(use_max), C(use_min) and C(comment) keys, which default
+        to the module level options. The file is read once and only
+        rewritten if at least one limit changed.
+    required: false
+    version_added: "2.1"
   backup:
     description:
       - Create a backup file including the timestamp information so you can get
@@ -86,8 +99,91 @@ EXAMPLES = '''
 
 # Add or modify limits for the user joe. Keep or set the maximal value
 - pam_limits: domain=joe limit_type=soft limit_item=nofile value=1000000
+
+# Set several limits with a single rewrite of limits.conf
+- pam_limits:
+    use_max: yes
+    limits:
+      - { domain: joe, limit_type: soft, limit_item: nofile, value: 64000 }
+      - { domain: joe, limit_type: hard, limit_item: nofile, value: 128000 }
+      - { domain: '@dba', limit_type: '-', limit_item: memlock, value: 1048576, comment: oracle }
 '''
 
+def limit_to_number(value):
+    """ Convert a limits.conf value for use_max/use_min comparisons """
+    if str(value) in ('unlimited', 'infinity', '-1'):
+        return float('inf')
+    return int(value)
+
+
+class LimitsFile(object):
+    """ limits.conf parsed once, keeping comments and ordering.
+
+    Lines are kept verbatim unless a limit on them is changed; limits are
+    indexed by (domain, type, item) so every entry is looked up directly. """
+
+    def __init__(self, path):
+        self.path = path
+        self.lines = []
+        self.index = {}
+        self.changed = False
+        space_pattern = re.compile(r'\s+')
+        f = open(path, 'r')
+        for line in f:
+            self.lines.append(line)
+            if line.startswith('#'):
+                continue
+            fields = re.sub(space_pattern, ' ', line.split('#', 1)[0]).strip().split(' ')
+            if len(fields) != 4:
+                continue
+            self.index[(fields[0], fields[1], fields[2])] = len(self.lines) - 1
+        f.close()
+
+    def apply(self, domain, limit_type, limit_item, value, use_max=False, use_min=False, comment=''):
+        """ Set one limit in memory and return the resulting line """
+        key = (domain, limit_type, limit_item)
+        new_value = value
+        if key in self.index:
+            line = self.lines[self.index[key]]
+            actual_value = re.split(r'\s+', line.split('#', 1)[0].strip())[3]
+            if str(value) == actual_value:
+                return line
+            try:
+                if use_max:
+                    if limit_to_number(actual_value) > limit_to_number(value):
+                        new_value = actual_value
+                if use_min:
+                    if limit_to_number(actual_value) < limit_to_number(value):
+                        new_value = actual_value
+            except ValueError:
+                pass
+            if str(new_value) == actual_value:
+                return line
+            if not comment and '#' in line:
+                comment = line.split('#', 1)[1].strip()
+        new_limit = domain + "\t" + limit_type + "\t" + limit_item + "\t" + str(new_value)
+        if comment:
+            new_limit += "\t#" + comment
+        new_limit += "\n"
+        if key in self.index:
+            self.lines[self.index[key]] = new_limit
+        else:
+            if self.lines and not self.lines[-1].endswith('\n'):
+                self.lines[-1] += '\n'
+            self.lines.append(new_limit)
+            self.index[key] = len(self.lines) - 1
+        self.changed = True
+        return new_limit
+
+    def write(self, module):
+        """ Replace the file atomically with the edited lines """
+        fd, tmpfile = tempfile.mkstemp(dir=os.path.dirname(self.path))
+        f = os.fdopen(fd, 'w')
+        f.writelines(self.lines)
+        f.close()
+        module.atomic_move(tmpfile, self.path)
+
+
 def main():
 
     pam_items = [ 'core', 'data', 'fsize', 'memlock', 'nofile', 'rss', 'stack', 'cpu', 'nproc', 'as', 'maxlogins', 'maxsyslogins', 'priority', 'locks', 'sigpending', 'msgqueue', 'nice', 'rtprio', 'chroot' ]
@@ -99,29 +195,36 @@ def main():
     module = AnsibleModule(
         # not checking because of daisy chain to file module
         argument_spec = dict(
-            domain            = dict(required=True, type='str'),
-            limit_type        = dict(required=True, type='str', choices=pam_types),
-            limit_item        = dict(required=True, type='str', choices=pam_items),
-            value             = dict(required=True, type='int'),
+            domain            = dict(required=False, type='str'),
+            limit_type        = dict(required=False, type='str', choices=pam_types),
+            limit_item        = dict(required=False, type='str', choices=pam_items),
+            value             = dict(required=False, type='int'),
+            limits            = dict(required=False, type='list'),
             use_max           = dict(default=False, type='bool'),
             use_min           = dict(default=False, type='bool'),
             backup            = dict(default=False, type='bool'),
             dest              = dict(default=limits_conf, type='str'),
             comment           = dict(required=False, default='', type='str')
-        )
+        ),
+        mutually_exclusive = [ ['limits', 'domain'] ],
     )
 
-    domain      =       module.params['domain']
-    limit_type  =       module.params['limit_type']
-    limit_item  =       module.params['limit_item']
-    value       =       module.params['value']
+    limits      =       module.params['limits']
     use_max     =       module.params['use_max']
     use_min     =       module.params['use_min']
     backup      =       module.params['backup']
     limits_conf =       module.params['dest']
-    new_comment =       module.params['comment']
 
-    changed = False
+    if limits is None:
+        for param in ('domain', 'limit_type', 'limit_item', 'value'):
+            if module.params[param] is None:
+                module.fail_json(msg="missing required arguments: %s" % param)
+        limits = [ dict(domain=module.params['domain'], limit_type=module.params['limit_type'],
+                        limit_item=module.params['limit_item'], value=module.params['value'],
+                        comment=module.params['comment']) ]
+        single = True
+    else:
+        single = False
 
     if os.path.isfile(limits_conf):
         if not os.access(limits_conf, os.W_OK):
@@ -129,101 +232,52 @@ def main():
     else:
         module.fail_json(msg="%s is not visible (check presence, access rights, use sudo)" % (limits_conf) )
 
-    if use_max and use_min:
-        module.fail_json(msg="Cannot use use_min and use_max at the same time." )
-
-    # Backup
-    if backup:
-        backup_file = module.backup_local(limits_conf)
-
-    space_pattern = re.compile(r'\s+')
-
-    message = ''
-    f = open (limits_conf, 'r')
-    # Tempfile
-    nf = tempfile.NamedTemporaryFile(delete = False)
-
-    found = False
-    new_value = value
-
-    for line in f:
-
-        if line.startswith('#'):
-            nf.write(line)
-            continue
-
-        newline = re.sub(space_pattern, ' ', line).strip()
-        if not newline:
-            nf.write(line)
-            continue
-
-        # Remove comment in line
-        newline = newline.split('#',1)[0]
+    # validate every entry before touching the file
+    for limit in limits:
+        if not isinstance(limit, dict):
+            module.fail_json(msg="Every entry of limits must be a hash, got %s" % limit)
+        for param in ('domain', 'limit_type', 'limit_item', 'value'):
+            if limit.get(param) is None:
+                module.fail_json(msg="Entry %s of limits is missing %s" % (limit, param))
+        if limit['limit_type'] not in pam_types:
+            module.fail_json(msg="Entry %s of limits: limit_type must be one of %s" % (limit, ', '.join(pam_types)))
+        if limit['limit_item'] not in pam_items:
+            module.fail_json(msg="Entry %s of limits: limit_item must be one of %s" % (limit, ', '.join(pam_items)))
         try:
-            old_comment = line.split('#',1)[1]
-        except:
-            old_comment = ''
-
-        newline = newline.rstrip()
-
-        if not new_comment:
-            new_comment = old_comment
-
-        if new_comment:
-            new_comment = "\t#"+new_comment
-
-        line_fields = newline.split(' ')
-
-        if len(line_fields) != 4:
-            nf.write(line)
-            continue
+            limit['value'] = int(limit['value'])
+        except ValueError:
+            module.fail_json(msg="Entry %s of limits: value must be an integer" % limit)
+        limit['use_max'] = module.boolean(limit.get('use_max', use_max))
+        limit['use_min'] = module.boolean(limit.get('use_min', use_min))
+        if limit['use_max'] and limit['use_min']:
+            module.fail_json(msg="Cannot use use_min and use_max at the same time." )
 
-        line_domain     = line_fields[0]
-        line_type       = line_fields[1]
-        line_item       = line_fields[2]
-        actual_value    = int(line_fields[3])
+    limits_file = LimitsFile(limits_conf)
 
-        # Found the line
-        if line_domain == domain and line_type == limit_type and line_item == limit_item:
-            found = True
-            if value == actual_value:
-                message = line
-                nf.write(line)
-                continue
-
-            if use_max:
-                new_value = max(value, actual_value)
-
-            if use_min:
-                new_value = min(value,actual_value)
-
-            # Change line only if value has changed
-            if new_value != actual_value:
-                changed = True
-                new_limit = domain + "\t" + limit_type + "\t" + limit_item + "\t" + str(new_value) + new_comment + "\n"
-                message = new_limit
-                nf.write(new_limit)
-            else:
-                message = line
-                nf.write(line)
-        else:
-            nf.write(line)
+    results = []
+    for limit in limits:
+        line = limits_file.apply(limit['domain'], limit['limit_type'], limit['limit_item'], limit['value'],
+                                 use_max=limit['use_max'], use_min=limit['use_min'],
+                                 comment=limit.get('comment', module.params['comment']))
+        results.append(line)
 
-    if not found:
-        changed = True
-        new_limit = domain + "\t" + limit_type + "\t" + limit_item + "\t" + str(new_value) + new_comment + "\n"
-        message = new_limit
-        nf.write(new_limit)
+    changed = limits_file.changed
 
-    f.close()
-    nf.close()
+    # Backup
+    if backup:
+        backup_file = module.backup_local(limits_conf)
 
-    # Copy tempfile to newfile
-    module.atomic_move(nf.name, f.name)
+    if changed:
+        limits_file.write(module)
 
-    res_args = dict(
-        changed = changed, msg = message
-    )
+    if single:
+        res_args = dict(
+            changed = changed, msg = results[0]
+        )
+    else:
+        res_args = dict(
+            changed = changed, msg = ''.join(results)
+        )
 
     if backup:
         res_args['backup_file'] = backup_file
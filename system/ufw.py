@@ -121,6 +121,17 @@ options:
       - Apply the rule to routed/forwarded packets.
     required: false
     choices: ['yes', 'no']
+  rules:
+    description:
+      - A list of rules to apply in one run. Each entry is a hash using the
+        rule related options of this module (C(rule), C(direction),
+        C(interface), C(from_ip), C(from_port), C(to_ip), C(to_port),
+        C(proto), C(app), C(log), C(delete), C(route), C(insert)).
+      - The user rules files are read once and rules that are already
+        present are not passed to ufw. The change status of every rule is
+        returned in C(rules).
+    required: false
+    version_added: "2.1"
 '''
 
 EXAMPLES = '''
@@ -174,9 +185,182 @@ ufw: rule=deny proto=tcp src=2001:db8::/32 port=25
 # Deny forwarded/routed traffic from subnet 1.2.3.0/24 to subnet 4.5.6.0/24.
 # Can be used to further restrict a global FORWARD policy set to allow
 ufw: rule=deny route=yes src=1.2.3.0/24 dest=4.5.6.0/24
+
+# Apply a set of rules in one task
+- ufw:
+    rules:
+      - { rule: allow, port: 22, proto: tcp }
+      - { rule: allow, port: 443, proto: tcp, src: 10.0.0.0/8 }
+      - { rule: deny, port: 23, delete: yes }
 '''
 
 from operator import itemgetter
+import glob
+import re
+
+# ufw keeps the rules added through the cli as '### tuple ###' comments
+UFW_USER_RULES = '/lib/ufw/user*.rules'
+UFW_DEFAULTS = '/etc/default/ufw'
+
+# ufw reports an unchanged rule with one of these messages
+UFW_UNCHANGED_MESSAGES = ['Skipping', 'Could not delete non-existent rule']
+
+RULE_KEYS = ['rule', 'direction', 'interface', 'from_ip', 'from_port', 'to_ip',
+             'to_port', 'proto', 'app', 'log', 'delete', 'route', 'insert']
+
+RULE_ALIASES = {'src': 'from_ip', 'from': 'from_ip', 'dest': 'to_ip', 'to': 'to_ip',
+                'port': 'to_port', 'protocol': 'proto', 'name': 'app', 'if': 'interface'}
+
+PORT_RE = re.compile(r'^[0-9]+([:,][0-9]+)*$')
+ADDRESS_RE = re.compile(r'^[0-9a-fA-F:.]+$')
+
+
+def read_user_tuples():
+    """ Return the set of rule tuples of the user rules files, keyed by
+    address family """
+    tuples = set()
+    for path in glob.glob(UFW_USER_RULES):
+        family = path.endswith('6.rules') and 'v6' or 'v4'
+        f = open(path)
+        try:
+            for line in f:
+                if line.startswith('### tuple ###'):
+                    tuples.add((family, ' '.join(line.split()[3:])))
+        finally:
+            f.close()
+    return tuples
+
+
+def ipv6_enabled():
+    try:
+        f = open(UFW_DEFAULTS)
+    except IOError:
+        return False
+    try:
+        for line in f:
+            if line.strip().replace('"', '').lower() == 'ipv6=yes':
+                return True
+    finally:
+        f.close()
+    return False
+
+
+def rule_tuples(rule, ipv6):
+    """ Compute the '### tuple ###' entries ufw would write for rule.
+
+    Returns None for rules whose stored form can not be predicted safely
+    (applications, named ports, routed or positioned rules); those are
+    always handed to ufw. """
+    if rule['app'] or rule['route'] or rule['insert']:
+        return None
+    for key in ('from_port', 'to_port'):
+        if rule[key] and not PORT_RE.match(str(rule[key])):
+            return None
+    for key in ('from_ip', 'to_ip'):
+        if rule[key] != 'any' and not ADDRESS_RE.match(rule[key].split('/')[0]):
+            return None
+
+    action = rule['rule']
+    if rule['log']:
+        action += '_log'
+    direction = {'incoming': 'in', 'outgoing': 'out'}.get(rule['direction'], rule['direction'] or 'in')
+    if rule['interface']:
+        direction = '%s_%s' % (direction, rule['interface'])
+
+    addresses = [rule['from_ip'], rule['to_ip']]
+    if [a for a in addresses if ':' in a and a != 'any']:
+        families = ['v6']
+    elif [a for a in addresses if a != 'any']:
+        families = ['v4']
+    elif ipv6:
+        families = ['v4', 'v6']
+    else:
+        families = ['v4']
+
+    tuples = []
+    for family in families:
+        anywhere = family == 'v6' and '::/0' or '0.0.0.0/0'
+        src = rule['from_ip'] == 'any' and anywhere or rule['from_ip']
+        dst = rule['to_ip'] == 'any' and anywhere or rule['to_ip']
+        tuples.append((family, ' '.join([action, rule['proto'] or 'any', str(rule['to_port'] or 'any'),
+                                         dst, str(rule['from_port'] or 'any'), src, direction])))
+    return tuples
+
+
+def normalize_rule(module, entry):
+    if not isinstance(entry, dict):
+        module.fail_json(msg="Every entry of rules must be a hash, got %s" % entry)
+    rule = dict(from_ip='any', to_ip='any')
+    for key, value in entry.items():
+        key = RULE_ALIASES.get(key, key)
+        if key not in RULE_KEYS:
+            module.fail_json(msg="Unsupported key %s in rule %s" % (key, entry))
+        rule[key] = value
+    for key in RULE_KEYS:
+        rule.setdefault(key, None)
+    for key in ('log', 'delete', 'route'):
+        rule[key] = module.boolean(rule[key] or False)
+    if rule['rule'] not in ['allow', 'deny', 'reject', 'limit']:
+        module.fail_json(msg="rule must be one of allow, deny, reject, limit in %s" % entry)
+    if rule['interface'] and not rule['direction']:
+        module.fail_json(msg="Direction must be specified when creating a rule on an interface")
+    return rule
+
+
+def rule_command(module, ufw_bin, rule):
+    # Rules are constructed according to the long format
+    #
+    # ufw [--dry-run] [delete] [insert NUM] [route] allow|deny|reject|limit [in|out on INTERFACE] [log|log-all] \
+    #     [from ADDRESS [port PORT]] [to ADDRESS [port PORT]] \
+    #     [proto protocol] [app application]
+    cmd = [[ufw_bin], [module.check_mode, '--dry-run']]
+    cmd.append([module.boolean(rule['delete']), 'delete'])
+    cmd.append([module.boolean(rule['route']), 'route'])
+    cmd.append([rule['insert'], "insert %s" % rule['insert']])
+    cmd.append([rule['rule']])
+    cmd.append([module.boolean(rule['log']), 'log'])
+
+    for (key, template) in [('direction', "%s"      ), ('interface', "on %s"   ),
+                            ('from_ip',   "from %s" ), ('from_port', "port %s" ),
+                            ('to_ip',     "to %s"   ), ('to_port',   "port %s" ),
+                            ('proto',     "proto %s"), ('app',       "app '%s'")]:
+
+        value = rule[key]
+        cmd.append([value, template % (value)])
+
+    return cmd
+
+
+def output_changed(out):
+    """ ufw prints one line per address family, the rule changed unless
+    every line reports it was skipped """
+    lines = [line for line in out.splitlines() if line.strip()]
+    if not lines:
+        return True
+    for line in lines:
+        if not [m for m in UFW_UNCHANGED_MESSAGES if m in line]:
+            return True
+    return False
+
+
+def apply_rules(module, ufw_bin, entries, execute):
+    """ Apply a list of rules, skipping the ones the user rules files
+    already satisfy.  Returns the per-rule results. """
+    rules = [normalize_rule(module, entry) for entry in entries]
+    existing = read_user_tuples()
+    ipv6 = ipv6_enabled()
+
+    results = []
+    for entry, rule in zip(entries, rules):
+        tuples = rule_tuples(rule, ipv6)
+        # only additions are decided from the tuples, deletes always go to
+        # ufw since a stored rule may be spelled differently
+        if tuples is not None and not rule['delete'] and not [t for t in tuples if t not in existing]:
+            results.append(dict(rule=entry, changed=False))
+            continue
+        out = execute(rule_command(module, ufw_bin, rule))
+        results.append(dict(rule=entry, changed=output_changed(out)))
+    return results
 
 
 def main():
@@ -197,10 +381,11 @@ def main():
             to_ip     = dict(default='any', aliases=['dest', 'to']),
             to_port   = dict(default=None,  aliases=['port']),
             proto     = dict(default=None,  aliases=['protocol'], choices=['any', 'tcp', 'udp', 'ipv6', 'esp', 'ah']),
-            app       = dict(default=None,  aliases=['name'])
+            app       = dict(default=None,  aliases=['name']),
+            rules     = dict(default=None,  type='list')
         ),
         supports_check_mode = True,
-        mutually_exclusive = [['app', 'proto', 'logging']]
+        mutually_exclusive = [['app', 'proto', 'logging'], ['rule', 'rules']]
     )
 
     cmds = []
@@ -213,11 +398,12 @@ def main():
 
         if rc != 0:
             module.fail_json(msg=err or out)
+        return out
 
     params = module.params
 
     # Ensure at least one of the command arguments are given
-    command_keys = ['state', 'default', 'rule', 'logging']
+    command_keys = ['state', 'default', 'rule', 'logging', 'rules']
     commands = dict((key, params[key]) for key in command_keys if params[key])
 
     if len(commands) < 1:
@@ -229,9 +415,17 @@ def main():
     # Ensure ufw is available
     ufw_bin = module.get_bin_path('ufw', True)
 
+    # Rules given as a list are diffed against the user rules files and
+    # report their own changes, no full status scan is needed for them
+    rules = commands.pop('rules', None)
+    if not commands:
+        results = apply_rules(module, ufw_bin, rules, execute)
+        changed = len([r for r in results if r['changed']]) > 0
+        return module.exit_json(changed=changed, commands=cmds, rules=results)
+
     # Save the pre state and rules in order to recognize changes
     (_, pre_state, _) = module.run_command(ufw_bin + ' status verbose')
-    (_, pre_rules, _) = module.run_command("grep '^### tuple' /lib/ufw/user*.rules")
+    pre_rules = read_user_tuples()
 
     # Execute commands
     for (command, value) in commands.iteritems():
@@ -249,32 +443,19 @@ def main():
             execute(cmd + [[command], [value], [params['direction']]])
 
         elif command == 'rule':
-            # Rules are constructed according to the long format
-            #
-            # ufw [--dry-run] [delete] [insert NUM] [route] allow|deny|reject|limit [in|out on INTERFACE] [log|log-all] \
-            #     [from ADDRESS [port PORT]] [to ADDRESS [port PORT]] \
-            #     [proto protocol] [app application]
-            cmd.append([module.boolean(params['delete']), 'delete'])
-            cmd.append([module.boolean(params['route']), 'route'])
-            cmd.append([params['insert'], "insert %s" % params['insert']])
-            cmd.append([value])
-            cmd.append([module.boolean(params['log']), 'log'])
-
-            for (key, template) in [('direction', "%s"      ), ('interface', "on %s"   ),
-                                    ('from_ip',   "from %s" ), ('from_port', "port %s" ),
-                                    ('to_ip',     "to %s"   ), ('to_port',   "port %s" ),
-                                    ('proto',     "proto %s"), ('app',       "app '%s'")]:
-
-                value = params[key]
-                cmd.append([value, template % (value)])
-
-            execute(cmd)
+            execute(rule_command(module, ufw_bin, params))
+
+    if rules is not None:
+        results = apply_rules(module, ufw_bin, rules, execute)
 
     # Get the new state
     (_, post_state, _) = module.run_command(ufw_bin + ' status verbose')
-    (_, post_rules, _) = module.run_command("grep '^### tuple' /lib/ufw/user*.rules")
+    post_rules = read_user_tuples()
     changed = (pre_state != post_state) or (pre_rules != post_rules)
 
+    if rules is not None:
+        return module.exit_json(changed=changed, commands=cmds, rules=results, msg=post_state.rstrip())
+
     return module.exit_json(changed=changed, commands=cmds, msg=post_state.rstrip())
 
 # import module snippets